@@ -1,11 +1,15 @@
-from flask import Flask, redirect, url_for, session, request, flash
+from flask import Flask, redirect, url_for, session, request, flash, g
 from flask_session import Session
 from datetime import timedelta, datetime
+import os
 
 def create_app():
     app = Flask(__name__)
     app.secret_key = "super-secret-key"  # TODO: change in production / move to env
     app.config["SESSION_TYPE"] = "filesystem"
+    # Resolved here rather than when flask_session is first imported, so the
+    # session files land next to data/ in the directory the app runs from
+    app.config["SESSION_FILE_DIR"] = os.path.join(os.getcwd(), "flask_session")
 
     # Idle timeout window (30 minutes)
     app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(minutes=30)
@@ -19,6 +23,9 @@ def create_app():
     from app.routes.medium_risk_loans import medium_risk_bp
     from app.routes.high_risk_loans import high_risk_bp
     from app.routes.take_action import take_action_bp
+    from app.routes.api import api_bp
+    from app.routes.export import export_bp
+    from app.caching import NO_STORE
 
     app.register_blueprint(login_bp)
     app.register_blueprint(dashboard_bp)
@@ -26,6 +33,8 @@ def create_app():
     app.register_blueprint(medium_risk_bp)
     app.register_blueprint(high_risk_bp)
     app.register_blueprint(take_action_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(export_bp)
 
     @app.before_request
     def require_login_and_enforce_timeout():
@@ -55,9 +64,16 @@ def create_app():
     @app.after_request
     def add_no_cache_headers(response):
         """Prevent cached pages from appearing after logout/back button."""
-        response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
+        # Static assets keep Flask's own ETag/Last-Modified revalidation
+        if request.path.startswith("/static"):
+            return response
+
+        # @data_etag views may relax this so their 304s can happen (app/caching.py)
+        cache_control = g.get("cache_control", NO_STORE)
+        response.headers["Cache-Control"] = cache_control
+        if cache_control == NO_STORE:
+            response.headers["Pragma"] = "no-cache"
+            response.headers["Expires"] = "0"
         return response
 
     return app
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+app/caching.py
+
+HTTP revalidation for responses derived from the loan data.
+
+Views decorated with @data_etag carry a strong ETag built from the loan-data
+version (sha256 of data/latest_loans.xlsx), the user's show_amounts permission
+and a tag of the deployed code/templates, and answer 304 when a client
+revalidates with a matching If-None-Match. A 304 only happens when the browser
+kept a copy, so the Cache-Control each view sends is a trade-off:
+
+  - HTML pages keep NO_STORE, like every other page (set in create_app). They
+    are reachable from back/forward history, and no-store keeps a page with
+    balances from showing again after logout or idle expiry. Their ETag then
+    only helps clients that revalidate by hand.
+  - /api/loans sends PRIVATE_REVALIDATE ("private, no-cache"). The browser may
+    keep the JSON in its own cache (never a shared proxy) but must revalidate
+    on every use, so paging back and forth in the drill-down tables costs a
+    304 instead of a full page of rows. JSON fetched by the tables is not in
+    history, so logout still hides it. The copy does stay in that browser's
+    cache until evicted.
+
+@cached_page keeps each page's rendered HTML in RenderCache, keyed by (data
+version, show_amounts, endpoint + query string). The data behind the pages
+(stats, top-10 lists, chart aggregates) is already computed once per data
+version by the segment index and the dashboard snapshot; this saves the
+template render on top. RenderCache is an LRU bounded by
+entry count and total bytes, counts hits/misses/evictions (GET /api/render-cache),
+and drops every entry from an older data version as soon as a newer Bryt
+export is promoted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, g, make_response, request, session
+
+from utils import loans_data_version
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _build_tag() -> str:
+    """Newest mtime under app/ (code, templates, static) so a deploy changes every ETag."""
+    newest = 0.0
+    for root, dirs, files in os.walk(_APP_DIR):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        for name in files:
+            try:
+                newest = max(newest, os.stat(os.path.join(root, name)).st_mtime)
+            except OSError:
+                continue
+    return f"{newest:.6f}"
+
+
+BUILD_TAG = _build_tag()
+
+# Cache-Control for pages: nothing stored, nothing shown from history
+NO_STORE = "no-store, no-cache, must-revalidate, max-age=0"
+# Cache-Control for data fetched by scripts: kept per browser, revalidated on every use
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def data_etag_value(show_amounts: bool) -> str | None:
+    """ETag for data-derived responses, or None when there is no loan data to version."""
+    version = loans_data_version()
+    if version is None:
+        return None
+    key = f"{version}:{int(bool(show_amounts))}:{BUILD_TAG}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def data_etag(view=None, *, cache_control: str = NO_STORE):
+    """
+    Answer 304 when If-None-Match carries the current data ETag; tag 200 responses.
+    `cache_control` is sent on both (see the module docstring):
+    @data_etag for pages, @data_etag(cache_control=PRIVATE_REVALIDATE) for JSON.
+    """
+    if view is None:
+        return lambda v: data_etag(v, cache_control=cache_control)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.cache_control = cache_control  # applied by create_app's after_request hook
+        etag = data_etag_value(session.get("show_amounts", False))
+        if etag is None:
+            return view(*args, **kwargs)
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        return response
+    return wrapper
+
+
+# ========== Render cache ==========
+RENDER_CACHE_CFG = {
+    "ENABLED": os.getenv("RENDER_CACHE_ENABLED", "1") != "0",
+    "MAX_BYTES": int(os.getenv("RENDER_CACHE_MAX_BYTES", 32 * 1024 * 1024)),
+    "MAX_ENTRIES": 512,
+}
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered pages keyed by (version, show_amounts, endpoint?query)."""
+
+    def __init__(self, max_bytes: int, max_entries: int):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (html, size)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            self._sync_version(key[0])
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, html: str) -> None:
+        size = len(html.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._sync_version(key[0])
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (html, size)
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def _sync_version(self, version) -> None:
+        # A new data version makes every older entry unreachable; free them at once
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self._bytes = 0
+                self.invalidations += 1
+            self._version = version
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": RENDER_CACHE_CFG["ENABLED"],
+                "version": self._version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+render_cache = RenderCache(RENDER_CACHE_CFG["MAX_BYTES"], RENDER_CACHE_CFG["MAX_ENTRIES"])
+
+
+def cached_page(view):
+    """
+    Serve a view's rendered HTML from the render cache, keyed by data version,
+    the user's show_amounts, endpoint and query string; render only on a miss.
+    Uncached when there is no loan data.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        version = loans_data_version()
+        if not RENDER_CACHE_CFG["ENABLED"] or version is None:
+            return view(*args, **kwargs)
+
+        key = (version, bool(session.get("show_amounts", False)),
+               f"{request.endpoint}?{request.query_string.decode()}")
+        html = render_cache.get(key)
+        if html is None:
+            html = view(*args, **kwargs)
+            if isinstance(html, str):  # redirects and other responses pass through uncached
+                render_cache.put(key, html)
+        return html
+    return wrapper
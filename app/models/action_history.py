@@ -0,0 +1,97 @@
+"""
+app/models/action_history.py
+
+Take Action history (app/models/action_ledger.py) indexed by loan.
+
+Loans are identified by loan_id() = "Borrower|Loan Name", which does not move
+when the balance changes between weekly pulls (the old "Borrower|Balance" key
+did). The index is a dict of the newest ledger entry per loan, rebuilt only
+when the ledger revision changes, so requests pay for one indexed lookup of
+the revision counter until someone saves.
+
+Entries written before loan_id existed carry no loan name; they are indexed
+by borrower and only used when no entry matches the loan_id.
+
+The Take Action form is pre-filled by for_week(): the loan's entry for the
+current week as saved (contacted or not), otherwise an older entry that still
+needs follow-up. It also carries the record version the page must send back
+(see action_ledger.upsert_actions).
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+from app.models import action_ledger as ledger
+
+
+def loan_id(borrower, loan_name) -> str:
+    """Stable loan identity used as the Take Action form key."""
+    return f"{str(borrower).strip()}|{str(loan_name).strip()}"
+
+
+def loan_ids(df) -> list[str]:
+    """loan_id() for every row of a loan frame (vectorized)."""
+    borrower = df["Borrower"].astype(str).str.strip()
+    name = df["Loan Name"].astype(str).str.strip()
+    return (borrower + "|" + name).tolist()
+
+
+def is_incomplete(entry: dict) -> bool:
+    """Still needs follow-up: not contacted, or contacted without a note."""
+    return not entry.get("contacted") or not entry.get("note")
+
+
+class ActionIndex:
+    """Latest history entry per loan_id, plus a borrower fallback for legacy entries."""
+
+    def __init__(self, by_loan: dict, by_borrower: dict):
+        self.by_loan = by_loan
+        self.by_borrower = by_borrower
+
+    @classmethod
+    def build(cls, entries) -> "ActionIndex":
+        by_loan, by_borrower = {}, {}
+        for entry in entries:  # oldest week first: later entries overwrite earlier ones
+            if entry.get("loan_name") is not None:
+                by_loan[loan_id(entry.get("borrower", ""), entry["loan_name"])] = entry
+            else:
+                by_borrower[str(entry.get("borrower", "")).strip()] = entry
+        return cls(by_loan, by_borrower)
+
+    def latest(self, key: str, borrower) -> dict | None:
+        entry = self.by_loan.get(key)
+        if entry is None:
+            entry = self.by_borrower.get(str(borrower).strip())
+        return entry
+
+    def pending(self, key: str, borrower) -> dict:
+        """Latest entry for the loan if it still needs follow-up, else {}."""
+        entry = self.latest(key, borrower)
+        return entry if entry is not None and is_incomplete(entry) else {}
+
+    def for_week(self, key: str, borrower, week: str) -> tuple[dict, int]:
+        """
+        (entry to pre-fill, version to save against) for the loan in `week`:
+        the week's own entry and its version, else pending() and 0 (no record yet).
+        """
+        entry = self.latest(key, borrower)
+        if entry is not None and entry.get("week") == week:
+            return entry, entry.get("version", 0)
+        return self.pending(key, borrower), 0
+
+
+_INDEX = {"version": None, "index": None}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_action_index(path: str = ledger.LEDGER_PATH) -> ActionIndex:
+    """The ActionIndex for the current ledger contents, rebuilt when the ledger changes."""
+    with ledger.connect(path) as conn:
+        version = (os.path.abspath(path), ledger.revision(conn))
+        with _INDEX_LOCK:
+            if _INDEX["index"] is None or _INDEX["version"] != version:
+                _INDEX["index"] = ActionIndex.build(ledger.latest_entries(conn))
+                _INDEX["version"] = version
+            return _INDEX["index"]
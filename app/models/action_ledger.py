@@ -0,0 +1,365 @@
+"""
+app/models/action_ledger.py
+
+Take Action ledger: one SQLite database (data/actions.db) instead of one JSON
+file per week under data/weekly_actions/.
+
+    actions(week, loan_key, borrower, loan_name, balance, days_late, category,
+            contacted, note, ceo_escalation, position, updated_at, version)
+    UNIQUE (week, loan_key); indexes on week, (loan_key, week),
+    (contacted, note) and (ceo_escalation, week)
+
+The database runs in WAL mode, so Gunicorn workers, the scheduler and the
+report generator can read while one of them writes. Writers take the lock up
+front with BEGIN IMMEDIATE. `position` keeps each week's original order,
+which the Take Action report relies on: High Risk first, then Critical.
+`ledger_meta.revision` is bumped by triggers on every change, so in-process
+caches (see app/models/action_history.py) can tell whether anything moved
+without re-reading the table.
+
+Each row's `version` starts at 1 and goes up on every write. The Take Action
+page sends back the version it rendered (0 when the week had no row for the
+loan), and upsert_actions() only overwrites a record that holds a contact or
+a note when that version still matches. A stale or blank save therefore comes
+back as a conflict instead of wiping a colleague's work.
+
+The first connection to an empty ledger imports the legacy JSON files once.
+To re-run the import by hand:
+    python -m app.models.action_ledger import [data/weekly_actions] [data/actions.db]
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+log = logging.getLogger("samxtrack.actions")
+
+LEDGER_PATH = os.path.join("data", "actions.db")
+LEGACY_ACTIONS_DIR = os.path.join("data", "weekly_actions")
+
+# Exact dropdown phrase for CEO escalations (enforced on the Take Action page)
+EXPECTED_NOTE = "move to BAD, needs to contacted by MIKE/SAIPI"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id             INTEGER PRIMARY KEY,
+    week           TEXT    NOT NULL,              -- Friday tag, YYYY-MM-DD
+    loan_key       TEXT    NOT NULL,              -- action_history.loan_id() (legacy: Borrower|Balance)
+    borrower       TEXT    NOT NULL DEFAULT '',
+    loan_name      TEXT,                          -- NULL for entries imported from old JSON
+    balance        REAL    NOT NULL DEFAULT 0,
+    days_late      INTEGER,
+    category       TEXT,
+    contacted      INTEGER NOT NULL DEFAULT 0,
+    note           TEXT    NOT NULL DEFAULT '',
+    ceo_escalation INTEGER NOT NULL DEFAULT 0,    -- note matches EXPECTED_NOTE
+    position       INTEGER NOT NULL DEFAULT 0,    -- order within the week
+    updated_at     TEXT    NOT NULL,
+    version        INTEGER NOT NULL DEFAULT 1,    -- bumped on every write (optimistic lock)
+    UNIQUE (week, loan_key)
+);
+CREATE INDEX IF NOT EXISTS idx_actions_week ON actions (week, position);
+CREATE INDEX IF NOT EXISTS idx_actions_loan ON actions (loan_key, week);
+CREATE INDEX IF NOT EXISTS idx_actions_state ON actions (contacted, note);
+CREATE INDEX IF NOT EXISTS idx_actions_ceo ON actions (ceo_escalation, week);
+
+CREATE TABLE IF NOT EXISTS ledger_meta (
+    id       INTEGER PRIMARY KEY CHECK (id = 1),
+    revision INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO ledger_meta (id, revision) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS actions_revision_ins AFTER INSERT ON actions
+BEGIN UPDATE ledger_meta SET revision = revision + 1 WHERE id = 1; END;
+CREATE TRIGGER IF NOT EXISTS actions_revision_upd AFTER UPDATE ON actions
+BEGIN UPDATE ledger_meta SET revision = revision + 1 WHERE id = 1; END;
+CREATE TRIGGER IF NOT EXISTS actions_revision_del AFTER DELETE ON actions
+BEGIN UPDATE ledger_meta SET revision = revision + 1 WHERE id = 1; END;
+"""
+
+_COLUMNS = ("week", "loan_key", "borrower", "loan_name", "balance", "days_late",
+            "category", "contacted", "note", "ceo_escalation", "position", "updated_at")
+
+# Ledger paths whose schema (and legacy import) is already in place in this process
+_READY = set()
+_READY_LOCK = threading.Lock()
+
+
+# ========== CEO note matching ==========
+def _normalize_note(s: str) -> str:
+    """Trim, collapse internal whitespace, and uppercase for stable comparison."""
+    return " ".join(s.strip().split()).upper()
+
+_EXPECTED_NOTE_NORM = _normalize_note(EXPECTED_NOTE)
+
+def note_matches(note: str) -> bool:
+    """Match the dropdown phrase robustly (ignores case / extra spaces)."""
+    return isinstance(note, str) and _normalize_note(note) == _EXPECTED_NOTE_NORM
+
+
+# ========== Connections ==========
+def _open(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+@contextmanager
+def connect(path: str = LEDGER_PATH, legacy_dir: str | None = LEGACY_ACTIONS_DIR):
+    """
+    Connection to the ledger with the schema in place. On the first connection
+    to an empty ledger, the legacy JSON files in `legacy_dir` are imported.
+    """
+    conn = _open(path)
+    try:
+        key = os.path.abspath(path)
+        if key not in _READY:
+            with _READY_LOCK:
+                if key not in _READY:
+                    conn.executescript(SCHEMA)
+                    empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM actions)").fetchone()[0]
+                    if empty and legacy_dir and os.path.isdir(legacy_dir):
+                        imported = import_json_history(conn, legacy_dir)
+                        if imported:
+                            log.info("Imported %d legacy action entries from %s", imported, legacy_dir)
+                    _READY.add(key)
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def write_transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT: take the write lock up front, roll back on error."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def revision(conn: sqlite3.Connection) -> int:
+    """Change counter, bumped on every insert/update/delete."""
+    return conn.execute("SELECT revision FROM ledger_meta WHERE id = 1").fetchone()[0]
+
+
+# ========== Rows ==========
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _record(entry: dict, week: str, position: int, stamp: str) -> tuple:
+    """Column tuple (in _COLUMNS order) for one entry dict."""
+    borrower = str(entry.get("borrower", "") or "").strip()
+    balance = float(entry.get("balance", 0) or 0.0)
+    loan_key = entry.get("loan_key") or f"{borrower}|{balance}"
+    note = str(entry.get("note", "") or "")
+    days = entry.get("days_late")
+    return (
+        week,
+        loan_key,
+        borrower,
+        entry.get("loan_name"),
+        balance,
+        int(days) if days not in (None, "") else None,
+        entry.get("category"),
+        1 if entry.get("contacted") else 0,
+        note,
+        1 if note_matches(note) else 0,
+        position,
+        entry.get("updated_at") or stamp,
+    )
+
+
+def row_to_entry(row: sqlite3.Row) -> dict:
+    """Ledger row -> the entry dict shape the views and reports use."""
+    entry = dict(row)
+    entry["contacted"] = bool(entry["contacted"])
+    entry["ceo_escalation"] = bool(entry["ceo_escalation"])
+    return entry
+
+
+def is_blank(entry: dict) -> bool:
+    """Nothing recorded yet: not contacted and no note."""
+    return not entry.get("contacted") and not str(entry.get("note") or "").strip()
+
+
+def _insert(conn, records) -> None:
+    placeholders = ", ".join("?" for _ in _COLUMNS)
+    updates = ", ".join(
+        # Keep a known lateness (seeded by the scheduler) when an update does not carry one
+        "days_late = COALESCE(excluded.days_late, days_late)" if c == "days_late" else f"{c} = excluded.{c}"
+        for c in _COLUMNS if c not in ("week", "loan_key")
+    )
+    conn.executemany(
+        f"INSERT INTO actions ({', '.join(_COLUMNS)}) VALUES ({placeholders}) "
+        f"ON CONFLICT (week, loan_key) DO UPDATE SET {updates}, version = version + 1",
+        records,
+    )
+
+
+# ========== Writes ==========
+def upsert_actions(conn, week: str, entries: list[dict]) -> tuple[list[dict], list[dict]]:
+    """
+    Insert or update one record per entry (keyed by loan_key) for `week`, all in
+    one write transaction. Records for loans not yet in the week are appended
+    after its last position; blank entries (not contacted, no note) only update
+    records that already exist.
+
+    An entry's "version" is the record version its sender last saw (0: no
+    record). A record that is not blank is only overwritten when that version
+    matches; otherwise (stale, or no version given) the entry is left out.
+    Returns (stored records, current records of the conflicting entries).
+    """
+    stamp = _now()
+    saved, conflicts = [], []
+    with write_transaction(conn):
+        next_position = conn.execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM actions WHERE week = ?", (week,)
+        ).fetchone()[0]
+        for entry in entries:
+            existing = conn.execute(
+                "SELECT * FROM actions WHERE week = ? AND loan_key = ?", (week, entry["loan_key"])
+            ).fetchone()
+            if existing is not None:
+                current = row_to_entry(existing)
+                if not is_blank(current) and entry.get("version") != current["version"]:
+                    conflicts.append(current)
+                    continue
+                position = existing["position"]
+            elif not is_blank(entry):
+                position = next_position
+                next_position += 1
+            else:
+                continue
+            _insert(conn, [_record({**entry, "updated_at": None}, week, position, stamp)])
+            row = conn.execute(
+                "SELECT * FROM actions WHERE week = ? AND loan_key = ?", (week, entry["loan_key"])
+            ).fetchone()
+            saved.append(row_to_entry(row))
+    return saved, conflicts
+
+
+def add_week_if_missing(conn, week: str, entries: list[dict]) -> bool:
+    """Seed `week` with `entries` unless it already has rows. True if seeded."""
+    stamp = _now()
+    with write_transaction(conn):
+        if conn.execute("SELECT 1 FROM actions WHERE week = ? LIMIT 1", (week,)).fetchone():
+            return False
+        _insert(conn, [_record(e, week, i, stamp) for i, e in enumerate(entries)])
+    return True
+
+
+def import_json_history(conn, actions_dir: str = LEGACY_ACTIONS_DIR) -> int:
+    """Upsert every data/weekly_actions/<week>.json entry; the file name is the week."""
+    stamp = _now()
+    total = 0
+    names = sorted(n for n in os.listdir(actions_dir) if n.endswith(".json"))
+    with write_transaction(conn):
+        for name in names:
+            week = name[: -len(".json")]
+            try:
+                with open(os.path.join(actions_dir, name), "r", encoding="utf-8") as f:
+                    entries = json.load(f)
+            except (OSError, ValueError) as e:
+                log.warning("Skipping unreadable action file %s: %s", name, e)
+                continue
+            _insert(conn, [_record(e, e.get("week") or week, i, stamp) for i, e in enumerate(entries)])
+            total += len(entries)
+    return total
+
+
+# ========== Reads ==========
+def latest_week(conn) -> str | None:
+    return conn.execute("SELECT MAX(week) FROM actions").fetchone()[0]
+
+
+def weeks(conn, start: str | None = None, end: str | None = None) -> list[str]:
+    """Week tags present in the ledger, oldest first; start/end are inclusive bounds."""
+    sql, params = "SELECT DISTINCT week FROM actions WHERE 1 = 1", []
+    if start:
+        sql += " AND week >= ?"
+        params.append(start)
+    if end:
+        sql += " AND week <= ?"
+        params.append(end)
+    return [row[0] for row in conn.execute(sql + " ORDER BY week", params)]
+
+
+def week_entries(conn, week: str, ceo_only: bool = False) -> list[dict]:
+    """Entries of one week in their original order (optionally CEO escalations only)."""
+    sql = "SELECT * FROM actions WHERE week = ?"
+    if ceo_only:
+        sql += " AND ceo_escalation = 1"
+    rows = conn.execute(sql + " ORDER BY position, id", (week,)).fetchall()
+    return [row_to_entry(r) for r in rows]
+
+
+def latest_entries(conn) -> list[dict]:
+    """Newest entry per loan_key (by week)."""
+    rows = conn.execute(
+        """
+        SELECT a.* FROM actions a
+        JOIN (SELECT loan_key, MAX(week) AS week FROM actions GROUP BY loan_key) latest
+          ON latest.loan_key = a.loan_key AND latest.week = a.week
+        ORDER BY a.week, a.position, a.id
+        """
+    ).fetchall()
+    return [row_to_entry(r) for r in rows]
+
+
+def query_history(conn, start: str | None = None, end: str | None = None, borrower: str | None = None,
+                  uncontacted: bool = False, ceo_only: bool = False,
+                  limit: int = 50, offset: int = 0) -> tuple[list[dict], int]:
+    """
+    One page of history, newest week first, and the total number of matching rows.
+    start/end are inclusive week tags (YYYY-MM-DD); borrower is a case-insensitive
+    substring match.
+    """
+    where, params = [], []
+    if start:
+        where.append("week >= ?")
+        params.append(start)
+    if end:
+        where.append("week <= ?")
+        params.append(end)
+    if borrower:
+        escaped = borrower.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("borrower LIKE ? ESCAPE '\\'")
+        params.append(f"%{escaped}%")
+    if uncontacted:
+        where.append("contacted = 0")
+    if ceo_only:
+        where.append("ceo_escalation = 1")
+    clause = f" WHERE {' AND '.join(where)}" if where else ""
+
+    total = conn.execute(f"SELECT COUNT(*) FROM actions{clause}", params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT * FROM actions{clause} ORDER BY week DESC, position, id LIMIT ? OFFSET ?",
+        [*params, limit, offset],
+    ).fetchall()
+    return [row_to_entry(r) for r in rows], total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "import":
+        print("usage: python -m app.models.action_ledger import [actions_dir] [ledger_path]")
+        sys.exit(2)
+    src = sys.argv[2] if len(sys.argv) > 2 else LEGACY_ACTIONS_DIR
+    dst = sys.argv[3] if len(sys.argv) > 3 else LEDGER_PATH
+    with connect(dst, legacy_dir=None) as conn:
+        count = import_json_history(conn, src)
+    print(f"Imported {count} action entries from {src} into {dst}")
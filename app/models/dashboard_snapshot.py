@@ -0,0 +1,208 @@
+"""
+app/models/dashboard_snapshot.py
+
+Dashboard aggregates (cards, charts, dollar breakdown) computed once per loan
+data version and persisted next to the data as data/dashboard_snapshot.json:
+
+    {"version": <sha256 of latest_loans.xlsx>, "format": 1,
+     "classification": <utils.CLASSIFICATION_TAG>, "built_at": ...,
+     "loan_stats": {...LoanStats...}}
+
+bryt_downloader writes it right after promoting a new export. The dashboard
+serves it from an in-process memo, then from the file, and only recomputes
+(and rewrites the file) when the stored version does not match the data, or
+when the classification (sidecar format or RISK_CFG thresholds) has changed.
+
+Rebuild on demand:
+    python -m app.models.dashboard_snapshot [path/to/latest_loans.xlsx]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from datetime import datetime
+
+import msgspec
+
+from app.models.segments import get_segment_index
+from app.models.stats import LoanStats, compute_loan_stats
+from utils import CLASSIFICATION_TAG, LATEST_LOANS_PATH, loans_data_version, read_loans_file
+
+SNAPSHOT_NAME = "dashboard_snapshot.json"
+# Bump when LoanStats changes shape so older snapshot files are rebuilt
+SNAPSHOT_FORMAT = 1
+
+# version -> LoanStats, per process
+_MEMO = {"version": None, "stats": None}
+_MEMO_LOCK = threading.Lock()
+
+
+def snapshot_path_for(xlsx_path=LATEST_LOANS_PATH):
+    """data/latest_loans.xlsx -> data/dashboard_snapshot.json"""
+    return os.path.join(os.path.dirname(str(xlsx_path)), SNAPSHOT_NAME)
+
+
+def dashboard_aggregates(stats: LoanStats) -> dict:
+    """Shape a LoanStats into the dicts dashboard.html expects."""
+    total_loans = stats.total_loans
+    stats_dict = {
+        "total_loans": total_loans,
+        "critical_loans": stats.critical_loans,
+        "active_borrowers": stats.active_borrowers,
+        "inactive_borrowers": stats.inactive_borrowers,
+        "title_loans": stats.title_loans,
+        "missing_contract": stats.missing_contract,
+        "with_guarantor": stats.with_guarantor,
+        "no_title_guarantor": stats.no_title_guarantor,
+    }
+
+    # Charts breakdown
+    charts_data = {
+        "loan_status": {
+            "Paid Off": stats.paid_off,
+            "Remaining": stats.remaining
+        },
+        "risk_distribution": {
+            "Critical": stats.critical_loans,
+            "Non-Critical": total_loans - stats.critical_loans
+        },
+        "borrower_activity": {
+            "Active": stats.active_borrowers,
+            "Inactive": stats.inactive_borrowers
+        },
+        "payment_status": stats.payment_status,
+        "collateral": {
+            "Has Title": stats.title_loans,
+            "No Title": total_loans - stats.title_loans
+        }
+    }
+
+    paid_off_amt = stats.paid_off_amt
+    paid_off_base = stats.total_outstanding + paid_off_amt
+
+    stats_dict.update({
+        "total_outstanding": stats.total_outstanding,
+        "total_weekly_due": stats.total_weekly_due,
+        "avg_weekly_payment": stats.avg_weekly_payment,
+        "avg_weeks_remaining": stats.avg_weeks_remaining,
+        "past_due_count": stats.past_due_count,
+        "critical_late_count": stats.critical_late_count,
+        "unsecured_loans": stats.unsecured_loans,
+        "unique_borrowers": stats.unique_borrowers,
+        "percent_paid_off": round(paid_off_amt / paid_off_base * 100, 1) if paid_off_base else 0,
+        "paid_off": stats.paid_off,
+        "loans_past_due": stats.past_due_count,
+    })
+
+    stats_block3 = {
+        "Outstanding Principal": f"${stats_dict['total_outstanding']:,.2f}",
+        "Loans Past Due": stats_dict["past_due_count"],
+        "3+ Weeks Late": stats_dict["critical_late_count"],
+        "No Contract / Title": stats_dict["unsecured_loans"],
+        "% Paid Off": f"{stats_dict['percent_paid_off']}%"
+    }
+
+    good_amt = stats.good_amt
+    past_due_amt = stats.past_due_amt
+    total_active_loans_amt = good_amt + past_due_amt
+    total_loan_amt = total_active_loans_amt + paid_off_amt
+
+    amount_breakdown = {
+        "Paid Off": float(paid_off_amt),
+        "In Good Standing": float(good_amt),
+        "Past Due": float(past_due_amt),
+        "Total Active Loans": float(total_active_loans_amt),
+        "Total Loan Amount": float(total_loan_amt)
+    }
+
+    # Percentage version of amount breakdown for users without dollar access
+    denom = total_loan_amt if total_loan_amt else 1.0
+    amount_breakdown_pct = {
+        "Paid Off": round((paid_off_amt / denom) * 100, 1),
+        "In Good Standing": round((good_amt / denom) * 100, 1),
+        "Past Due": round((past_due_amt / denom) * 100, 1),
+        "Total Active Loans": round((total_active_loans_amt / denom) * 100, 1),
+        "Total Loan Amount": 100.0,
+    }
+
+    return {
+        "stats": stats_dict,
+        "charts_data": charts_data,
+        "stats_block3": stats_block3,
+        "amount_breakdown": amount_breakdown,
+        "amount_breakdown_pct": amount_breakdown_pct,
+    }
+
+
+# ========== Persistence ==========
+def write_snapshot(stats: LoanStats, version: str, path: str) -> str:
+    payload = {
+        "version": version,
+        "format": SNAPSHOT_FORMAT,
+        "classification": CLASSIFICATION_TAG,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "loan_stats": stats,
+    }
+    # unique per thread: concurrent first requests may all rebuild the snapshot
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(msgspec.json.encode(payload))
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path: str, version: str | None) -> LoanStats | None:
+    """The stored LoanStats if the file exists, matches `version` and the classification, and decodes cleanly."""
+    if version is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            payload = msgspec.json.decode(f.read())
+        if (payload.get("version") != version or payload.get("format") != SNAPSHOT_FORMAT
+                or payload.get("classification") != CLASSIFICATION_TAG):
+            return None
+        return msgspec.convert(payload["loan_stats"], LoanStats)
+    except (OSError, msgspec.DecodeError, msgspec.ValidationError, AttributeError, KeyError):
+        return None
+
+
+def build_dashboard_snapshot(xlsx_path=LATEST_LOANS_PATH) -> str:
+    """Recompute the stats for `xlsx_path` and write the snapshot beside it."""
+    df, version = read_loans_file(xlsx_path)
+    return write_snapshot(compute_loan_stats(df), version, snapshot_path_for(xlsx_path))
+
+
+def get_loan_stats() -> LoanStats:
+    """LoanStats for the current loan data: memo -> snapshot file -> recompute."""
+    version = loans_data_version()
+    with _MEMO_LOCK:
+        if version is not None and _MEMO["version"] == version:
+            return _MEMO["stats"]
+
+    path = snapshot_path_for()
+    stats = read_snapshot(path, version)
+    if stats is None:
+        # same frame and segment masks as the drill-down lists (app/models/segments.py)
+        index = get_segment_index()
+        version = index.version  # the data the index was built from
+        stats = compute_loan_stats(index.frame, index.masks)
+        if version is not None:
+            try:
+                write_snapshot(stats, version, path)
+            except OSError as e:
+                print("[DashboardSnapshot] write failed:", e)
+
+    with _MEMO_LOCK:
+        _MEMO.update(version=version, stats=stats)
+    return stats
+
+
+def get_dashboard_aggregates() -> dict:
+    return dashboard_aggregates(get_loan_stats())
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else LATEST_LOANS_PATH
+    print("Dashboard snapshot written:", build_dashboard_snapshot(target))
@@ -0,0 +1,102 @@
+"""
+app/models/ingest.py
+
+Column-projected Excel ingestion for Bryt exports.
+
+Each consumer declares the columns it needs and only those are materialized.
+Without a native engine the workbook is opened with openpyxl in read-only
+mode and rows are streamed in bounded chunks, so peak memory tracks the chunk
+size rather than the size of the export. When python-calamine is installed
+(pandas >= 2.2) it is used instead; it is much faster at parsing but reads the
+projected columns in one go.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Iterator
+
+import pandas as pd
+from openpyxl import load_workbook
+
+try:
+    import python_calamine  # noqa: F401  (only probing for the pandas engine)
+    NATIVE_ENGINE = "calamine"
+except ImportError:
+    NATIVE_ENGINE = None
+
+# Rows per streamed chunk
+CHUNK_ROWS = 5_000
+
+# Cell text treated as missing, same as pandas.read_excel's default na_values
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+# Columns utils.load_latest_loans needs (routes, templates and derived flags)
+LOANS_COLUMNS = (
+    "Loan Name",
+    "Borrower",
+    "Status",
+    "State",
+    "Group",
+    "Principal Balance",
+    "Days Late",
+    "Next Payment Amount",
+    "Remaining Payments",
+    "Contract",
+    "Guarantor",
+    "Title Ownership",
+)
+
+# Columns bryt_downloader._extract_max_week_tag looks for (header spelling varies)
+WEEK_TAG_COLUMNS = ("Last W Collected", "Last W collected", "LastWCollected", "Last_W_Collected")
+
+
+def iter_excel_chunks(source, columns: Iterable[str], chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Stream the first sheet of `source` (path or binary file object) as DataFrames of
+    at most `chunk_rows` rows, holding only the requested columns that exist.
+    Fully blank rows are skipped and NA_STRINGS cells become missing values.
+    """
+    wanted = set(columns)
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        picks = [(i, str(name)) for i, name in enumerate(header) if name is not None and str(name) in wanted]
+        names = [name for _, name in picks]
+        if not picks:
+            return
+
+        buf = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            values = [row[i] if i < len(row) else None for i, _ in picks]
+            buf.append([None if isinstance(v, str) and v in NA_STRINGS else v for v in values])
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame.from_records(buf, columns=names).infer_objects()
+                buf = []
+        if buf:
+            yield pd.DataFrame.from_records(buf, columns=names).infer_objects()
+    finally:
+        wb.close()
+
+
+def read_excel_columns(source, columns: Iterable[str], chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Read only `columns` from the first sheet, via the native engine when available."""
+    wanted = list(dict.fromkeys(columns))
+    if NATIVE_ENGINE:
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return pd.read_excel(source, engine=NATIVE_ENGINE, usecols=lambda c: str(c) in wanted)
+
+    chunks = list(iter_excel_chunks(source, wanted, chunk_rows))
+    if not chunks:
+        return pd.DataFrame()
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,129 @@
+"""
+app/models/risk.py
+
+Single risk-classification engine shared by utils, the dashboard, the loan
+summary, Take Action and the scheduler.
+
+Each named rule set is an ordered list of (label, condition) pairs evaluated
+with np.select: the first matching rule wins, otherwise the rule set's default
+label applies. Conditions are small dicts over the precomputed loan flags:
+
+    {"days_late_gt": 21}                      Days Late > 21
+    {"days_late_gte": 7}                      Days Late >= 7
+    {"has_title": False}                      flag equals value
+    {"any": [{...}, {...}]}                   OR of sub-conditions
+
+Keys inside one dict are AND-ed. All rule sets are computed in one pass over
+the same NumPy arrays, so there is no per-row Python work.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+# ---- Config (thresholds live here, not in the routes) ----
+RISK_CFG = {
+    # Collections view: utils, Take Action, scheduler, High / Medium Risk pages
+    "collections": {
+        "column": "Risk Level",
+        "default": "Healthy",
+        "rules": [
+            ("Critical",  {"days_late_gt": 21, "has_title": False, "has_guarantor": False}),
+            ("High Risk", {"days_late_gt": 21}),
+            ("At Risk",   {"days_late_gt": 14}),
+            ("Low Risk",  {"days_late_gt": 7}),
+        ],
+    },
+    # Dashboard view: dashboard cards and the loan summary
+    "dashboard": {
+        "column": "Dashboard Risk",
+        "default": "Low",
+        "rules": [
+            ("Critical", {"days_late_gte": 21}),
+            ("Medium",   {"days_late_gte": 7}),
+            ("Medium",   {"any": [{"has_title": False}, {"has_contract": False}]}),
+        ],
+    },
+}
+
+# Loan-frame column backing each condition field
+_FIELDS = {
+    "days_late": "Days Late",
+    "has_title": "Has Title",
+    "has_guarantor": "Has Guarantor",
+    "has_contract": "Has Contract",
+}
+
+
+def _field_arrays(df: pd.DataFrame) -> dict:
+    """Pull every condition field out of the frame once, as plain NumPy arrays."""
+    n = len(df)
+    arrays = {}
+    for name, col in _FIELDS.items():
+        if name == "days_late":
+            src = df[col] if col in df.columns else pd.Series(0, index=df.index)
+            arrays[name] = pd.to_numeric(src, errors="coerce").fillna(0).to_numpy()
+        else:
+            arrays[name] = (df[col].fillna(False).astype(bool).to_numpy()
+                            if col in df.columns else np.zeros(n, dtype=bool))
+    return arrays
+
+
+def _mask(arrays: dict, cond: dict, n: int) -> np.ndarray:
+    m = np.ones(n, dtype=bool)
+    for key, val in cond.items():
+        if key == "any":
+            m &= np.logical_or.reduce([_mask(arrays, c, n) for c in val])
+        elif key.endswith("_gte"):
+            m &= arrays[key[:-4]] >= val
+        elif key.endswith("_gt"):
+            m &= arrays[key[:-3]] > val
+        else:
+            m &= arrays[key] == val
+    return m
+
+
+def _categories(rule_set: dict) -> list[str]:
+    labels = [label for label, _ in rule_set["rules"]] + [rule_set["default"]]
+    return list(dict.fromkeys(labels))
+
+
+def classify(df: pd.DataFrame, rule_sets: list[str] | None = None) -> dict[str, pd.Series]:
+    """
+    Evaluate the named rule sets (default: all of RISK_CFG) against `df`.
+    Returns {rule_set_name: categorical Series aligned to df.index}.
+    """
+    names = rule_sets or list(RISK_CFG)
+    n = len(df)
+    arrays = _field_arrays(df)
+
+    out = {}
+    for name in names:
+        rule_set = RISK_CFG[name]
+        conditions = [_mask(arrays, cond, n) for _, cond in rule_set["rules"]]
+        choices = [label for label, _ in rule_set["rules"]]
+        labels = np.select(conditions, choices, default=rule_set["default"]) if conditions \
+            else np.full(n, rule_set["default"], dtype=object)
+        out[name] = pd.Series(
+            pd.Categorical(labels, categories=_categories(rule_set)),
+            index=df.index,
+            name=rule_set["column"],
+        )
+    return out
+
+
+def apply_risk_levels(df: pd.DataFrame, rule_sets: list[str] | None = None) -> pd.DataFrame:
+    """Write each rule set's labels into its configured column and return `df`."""
+    for name, labels in classify(df, rule_sets).items():
+        df[RISK_CFG[name]["column"]] = labels
+    return df
+
+
+def rules_digest() -> str:
+    """Short hash of RISK_CFG; stored with anything derived from the labels so a threshold change invalidates it."""
+    payload = json.dumps(RISK_CFG, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
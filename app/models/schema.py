@@ -0,0 +1,69 @@
+"""
+app/models/schema.py
+
+Compact dtypes for the loan frame. Every Gunicorn worker keeps a cached copy
+(see utils.load_latest_loans), so low-cardinality strings become `category`,
+the derived flags become real `bool`, and whole-number columns are downcast to
+the smallest integer type that holds them. Money columns stay float64.
+"""
+
+from __future__ import annotations
+
+import logging
+
+import pandas as pd
+
+log = logging.getLogger("samxtrack.loans")
+
+# Dollar amounts: kept float64 here, currency-formatted by tables and exports
+MONEY_COLUMNS = ("Principal Balance", "Next Payment Amount")
+
+# column -> target kind ("category" | "bool" | "int")
+LOAN_SCHEMA = {
+    "Status": "category",
+    "State": "category",
+    "Group": "category",
+    "Activity Status": "category",
+    "Risk Level": "category",
+    "Dashboard Risk": "category",
+    "Has Contract": "bool",
+    "Has Guarantor": "bool",
+    "Has Title": "bool",
+    "Days Late": "int",
+    "Remaining Payments": "int",
+}
+
+
+def memory_footprint(df: pd.DataFrame) -> int:
+    """Deep memory usage of the frame in bytes (object/str payloads included)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def _to_kind(s: pd.Series, kind: str) -> pd.Series:
+    if kind == "category":
+        return s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    if kind == "bool":
+        return s.fillna(False).astype(bool)
+    if kind == "int":
+        num = pd.to_numeric(s, errors="coerce")
+        if num.isna().any() or (num % 1 != 0).any():
+            return num  # leave gaps / fractions as float rather than inventing values
+        return pd.to_numeric(num.astype("int64"), downcast="integer")
+    raise ValueError(f"Unknown schema kind: {kind}")
+
+
+def normalize_dtypes(df: pd.DataFrame, schema: dict | None = None) -> pd.DataFrame:
+    """Coerce the columns named in `schema` (default LOAN_SCHEMA) in place and log the saving."""
+    schema = LOAN_SCHEMA if schema is None else schema
+    before = memory_footprint(df)
+
+    for col, kind in schema.items():
+        if col in df.columns:
+            df[col] = _to_kind(df[col], kind)
+
+    after = memory_footprint(df)
+    log.info(
+        "Loan frame memory: %.1f KiB -> %.1f KiB (%d rows)",
+        before / 1024, after / 1024, len(df),
+    )
+    return df
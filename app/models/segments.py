@@ -0,0 +1,110 @@
+"""
+app/models/segments.py
+
+Named loan segments behind the drill-down pages and /api/loans. Each entry maps
+a URL-friendly name to a vectorized boolean mask over the loan frame.
+
+SegmentIndex evaluates every mask once per loan-data version and keeps, per
+segment, the boolean bitmap and its row positions, plus lazily cached sort
+orders and top-N lists. get_segment_index() hands out the shared instance.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from utils import load_latest_loans, loans_data_version
+
+
+def _eq(col: str, value: str):
+    return lambda df: (df[col] == value).to_numpy(dtype=bool)
+
+
+def _flag(col: str, expected: bool = True):
+    return lambda df: df[col].to_numpy(dtype=bool) == expected
+
+
+LIST_SEGMENTS = {
+    "all": lambda df: np.ones(len(df), dtype=bool),
+    "active": _eq("Activity Status", "Active"),
+    "inactive": _eq("Activity Status", "Inactive"),
+    "missing-contracts": _flag("Has Contract", False),
+    "critical": _eq("Dashboard Risk", "Critical"),
+    "no-title-guarantor": lambda df: ~df["Has Title"].to_numpy(dtype=bool) & ~df["Has Guarantor"].to_numpy(dtype=bool),
+    "with-guarantor": _flag("Has Guarantor"),
+    "with-title": _flag("Has Title"),
+    "high-risk": _eq("Risk Level", "High Risk"),
+    "medium-risk": _eq("Risk Level", "At Risk"),
+}
+
+
+class SegmentIndex:
+    """Per-version segment bitmaps, row positions, sort orders and top-N lists."""
+
+    def __init__(self, df: pd.DataFrame, version: str | None):
+        self.frame = df
+        self.version = version
+        if df.empty:
+            self.masks = {name: np.zeros(len(df), dtype=bool) for name in LIST_SEGMENTS}
+        else:
+            self.masks = {name: fn(df) for name, fn in LIST_SEGMENTS.items()}
+        self.positions = {name: np.flatnonzero(mask) for name, mask in self.masks.items()}
+        self._orders = {}
+        self._top = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str) -> int:
+        return len(self.positions[name])
+
+    def positions_for(self, names: list[str], sort: str | None = None, ascending: bool = True) -> np.ndarray:
+        """Row positions in every segment of `names`, in frame order or sorted by `sort`."""
+        if len(names) == 1:
+            mask = self.masks[names[0]]
+            if sort is None:
+                return self.positions[names[0]]
+        else:
+            mask = np.logical_and.reduce([self.masks[name] for name in names])
+            if sort is None:
+                return np.flatnonzero(mask)
+        # Filter the cached whole-frame order through the bitmap: O(rows), no re-sort
+        order = self.order(sort, ascending)
+        return order[mask[order]]
+
+    def order(self, column: str, ascending: bool = True) -> np.ndarray:
+        """Stable sort order of all rows by `column` (missing values last), cached."""
+        key = (column, ascending)
+        with self._lock:
+            if key not in self._orders:
+                ranked = self.frame[column].reset_index(drop=True).sort_values(
+                    ascending=ascending, kind="stable", na_position="last")
+                self._orders[key] = ranked.index.to_numpy()
+            return self._orders[key]
+
+    def top(self, name: str, n: int = 10, column: str = "Principal Balance") -> list[dict]:
+        """Largest `n` loans of a segment by `column`, as records (cached)."""
+        key = (name, n, column)
+        with self._lock:
+            if key not in self._top:
+                rows = self.frame.iloc[self.positions[name]]
+                if rows.empty:
+                    return []
+                self._top[key] = rows.nlargest(n, column).to_dict(orient="records")
+            return self._top[key]
+
+
+_INDEX = {"index": None}
+_INDEX_LOCK = threading.Lock()
+
+
+def get_segment_index() -> SegmentIndex:
+    """The SegmentIndex for the current loan data, rebuilt when the data version changes."""
+    version = loans_data_version()
+    with _INDEX_LOCK:
+        index = _INDEX["index"]
+        if index is None or version is None or index.version != version:
+            index = SegmentIndex(load_latest_loans(), version)
+            _INDEX["index"] = index
+        return index
@@ -0,0 +1,170 @@
+"""
+app/models/stats.py
+
+Single-pass aggregation for the dashboard and loan-summary views.
+
+Every segment is a boolean NumPy array derived once from the precomputed
+loan columns (Has *, Activity Status, Dashboard Risk, ...). The segments that
+have a drill-down page come from app/models/segments.LIST_SEGMENTS (or the
+SegmentIndex's already evaluated masks), so a card's count and the list
+behind it use the same definition. The arrays are
+stacked into one (segments x rows) matrix; counts come from a single
+count_nonzero over it and dollar sums from one matrix-vector product. No
+filtered DataFrame copies are made. The result is a typed LoanStats object
+that both views (and the dashboard snapshot) consume.
+"""
+
+from __future__ import annotations
+
+import msgspec
+import numpy as np
+import pandas as pd
+
+from app.models.segments import LIST_SEGMENTS
+
+# Order matters only for the stacked matrix; names are what callers use.
+SEGMENTS = (
+    "critical",            # Dashboard Risk == Critical
+    "active",              # Activity Status == Active
+    "inactive",            # Activity Status == Inactive
+    "with_title",
+    "missing_contract",
+    "with_guarantor",
+    "no_title_guarantor",
+    "paid_off",            # Principal Balance == 0
+    "remaining",           # Principal Balance > 0
+    "past_due",            # Days Late > 0
+    "critical_late",       # Days Late > 21
+    "unsecured",           # no contract or no title
+    "paid_off_state",      # State == Paid Off
+    "past_due_amount",     # Status 3+W Critical or Days Late > 21
+    "good_standing",       # Status 1W Behind / Ongoing
+    "weekly_payers",       # Next Payment Amount > 0
+)
+
+# Stats segment -> the drill-down segment (LIST_SEGMENTS) it counts
+LISTED = {
+    "critical": "critical",
+    "active": "active",
+    "inactive": "inactive",
+    "with_title": "with-title",
+    "missing_contract": "missing-contracts",
+    "with_guarantor": "with-guarantor",
+    "no_title_guarantor": "no-title-guarantor",
+}
+
+# Segments whose Principal Balance is summed
+_SUMMED = ("past_due_amount", "good_standing")
+
+
+class LoanStats(msgspec.Struct):
+    total_loans: int
+    critical_loans: int
+    active_borrowers: int
+    inactive_borrowers: int
+    title_loans: int
+    missing_contract: int
+    with_guarantor: int
+    no_title_guarantor: int
+    paid_off: int
+    remaining: int
+    past_due_count: int
+    critical_late_count: int
+    unsecured_loans: int
+    unique_borrowers: int
+    total_outstanding: float
+    total_weekly_due: float
+    avg_weekly_payment: float | None
+    avg_weeks_remaining: int
+    paid_off_amt: float
+    good_amt: float
+    past_due_amt: float
+    payment_status: dict[str, int]
+
+
+def _flag(df: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[name].fillna(False).to_numpy(dtype=bool)
+
+
+def segment_masks(df: pd.DataFrame, list_masks: dict[str, np.ndarray] | None = None) -> dict[str, np.ndarray]:
+    """
+    One boolean array per name in SEGMENTS, aligned to df's rows. `list_masks`
+    (SegmentIndex.masks) supplies the LISTED segments already evaluated.
+    """
+    balance = pd.to_numeric(df["Principal Balance"], errors="coerce").to_numpy(dtype=float)
+    days = pd.to_numeric(df["Days Late"], errors="coerce").to_numpy(dtype=float)
+    next_pay = pd.to_numeric(df["Next Payment Amount"], errors="coerce").to_numpy(dtype=float)
+    status = df["Status"].astype(str).to_numpy()
+
+    has_title = _flag(df, "Has Title")
+    has_contract = _flag(df, "Has Contract")
+    if list_masks is None:
+        list_masks = {name: LIST_SEGMENTS[name](df) for name in LISTED.values()}
+
+    with np.errstate(invalid="ignore"):
+        return {
+            **{name: list_masks[listed] for name, listed in LISTED.items()},
+            "paid_off": balance == 0,
+            "remaining": balance > 0,
+            "past_due": days > 0,
+            "critical_late": days > 21,
+            "unsecured": ~has_contract | ~has_title,
+            "paid_off_state": (df["State"] == "Paid Off").to_numpy(dtype=bool),
+            "past_due_amount": (status == "3+W Critical") | (days > 21),
+            "good_standing": np.isin(status, ["1W Behind", "Ongoing"]),
+            "weekly_payers": next_pay > 0,
+        }
+
+
+def _paid_off_amount(df: pd.DataFrame, mask: np.ndarray) -> float:
+    """Sum of the original amount in 'Loan Name' ("... - $20,000") over `mask` rows."""
+    if not mask.any():
+        return 0.0
+    names = df["Loan Name"].to_numpy()[mask]
+    amounts = pd.Series(names, dtype=object).astype(str).str.extract(r"\$\s*([\d,\.]+)", expand=False)
+    amounts = pd.to_numeric(amounts.str.replace(",", "", regex=False), errors="coerce")
+    return float(amounts.fillna(0).sum())
+
+
+def compute_loan_stats(df: pd.DataFrame, list_masks: dict[str, np.ndarray] | None = None) -> LoanStats:
+    masks = segment_masks(df, list_masks)
+    matrix = np.vstack([masks[name] for name in SEGMENTS]) if len(df) else np.zeros((len(SEGMENTS), 0), dtype=bool)
+    counts = dict(zip(SEGMENTS, np.count_nonzero(matrix, axis=1).tolist()))
+
+    balance = np.nan_to_num(pd.to_numeric(df["Principal Balance"], errors="coerce").to_numpy(dtype=float))
+    summed_rows = [SEGMENTS.index(name) for name in _SUMMED]
+    sums = dict(zip(_SUMMED, (matrix[summed_rows] @ balance).tolist()))
+
+    next_pay = np.nan_to_num(pd.to_numeric(df["Next Payment Amount"], errors="coerce").to_numpy(dtype=float))
+    remaining_payments = pd.to_numeric(df["Remaining Payments"], errors="coerce")
+    weekly_payers = counts["weekly_payers"]
+
+    status_counts = df["Status"].value_counts()
+    paid_off_amt = _paid_off_amount(df, masks["paid_off_state"])
+
+    return LoanStats(
+        total_loans=len(df),
+        critical_loans=counts["critical"],
+        active_borrowers=counts["active"],
+        inactive_borrowers=counts["inactive"],
+        title_loans=counts["with_title"],
+        missing_contract=counts["missing_contract"],
+        with_guarantor=counts["with_guarantor"],
+        no_title_guarantor=counts["no_title_guarantor"],
+        paid_off=counts["paid_off"],
+        remaining=counts["remaining"],
+        past_due_count=counts["past_due"],
+        critical_late_count=counts["critical_late"],
+        unsecured_loans=counts["unsecured"],
+        unique_borrowers=int(df["Group"].nunique()),
+        total_outstanding=round(float(balance.sum()), 2),
+        total_weekly_due=round(float(next_pay.sum()), 2),
+        avg_weekly_payment=round(float(next_pay[masks["weekly_payers"]].sum()) / weekly_payers, 2) if weekly_payers else None,
+        avg_weeks_remaining=int(remaining_payments.mean()) if remaining_payments.notna().any() else 0,
+        paid_off_amt=paid_off_amt,
+        good_amt=sums["good_standing"],
+        past_due_amt=sums["past_due_amount"],
+        payment_status={str(k): int(v) for k, v in status_counts.items() if v},
+    )
@@ -0,0 +1,197 @@
+"""
+app/reports/backfill.py
+
+Rebuild the weekly PDFs for a range of past weeks.
+
+Every ledger week between --start and --end (Friday tags, inclusive) gets its
+Take Action and CEO reports rendered from that week's ledger entries. The CEO
+report is enriched from the week's loan snapshot,
+data/weekly_backups/<Monday>-Wxx.xlsx, written by bryt_downloader on the
+Friday. If that file is missing, the newest earlier snapshot is used. If
+there is no snapshot at all, the ledger's own Days Late is used and the week
+is reported with snapshot=None.
+
+Weeks render in a pool of spawned worker processes, each reusing a warm
+ReportEngine (app/reports/engine.py). The build manifest
+(app/reports/manifest.py) turns weeks whose inputs are unchanged into skips,
+so re-running a backfill only pays for what changed; --force rebuilds
+everything. Notifications are never sent.
+
+    python -m app.reports.backfill --start 2025-05-02 --end 2025-07-18 [--workers 4] [--force]
+        [--report take_action] [--report ceo_must_contact] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import msgspec
+
+from app.models import action_ledger as ledger
+from app.reports import manifest
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+BACKFILL_CFG = {
+    "BACKUPS_DIR": os.path.join(_ROOT, "data", "weekly_backups"),
+    "MAX_WORKERS": int(os.getenv("REPORT_BACKFILL_WORKERS", min(4, os.cpu_count() or 1))),
+}
+
+REPORT_NAMES = ("take_action", "ceo_must_contact")
+
+_SNAPSHOT_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})-W\d+\.xlsx$")
+
+
+class WeekResult(msgspec.Struct):
+    week: str
+    status: str  # built | skipped | failed
+    snapshot: str | None = None
+    reports: dict = {}  # report name -> built | skipped | empty | failed
+    seconds: float = 0.0
+    error: str | None = None
+
+
+def snapshots(backups_dir: str | None = None) -> dict[str, str]:
+    """Weekly backup date (the Monday in its file name) -> path."""
+    backups_dir = backups_dir or BACKFILL_CFG["BACKUPS_DIR"]
+    try:
+        names = os.listdir(backups_dir)
+    except FileNotFoundError:
+        return {}
+    found = {}
+    for name in sorted(names):
+        m = _SNAPSHOT_RE.match(name)
+        if m:
+            found[m.group(1)] = os.path.join(backups_dir, name)
+    return found
+
+
+def snapshot_for(week: str, available: dict[str, str]) -> str | None:
+    """The backup taken in `week` (saved under that week's Monday), else the newest earlier one."""
+    friday = date.fromisoformat(week)
+    monday = (friday - timedelta(days=friday.weekday())).isoformat()
+    if monday in available:
+        return available[monday]
+    earlier = [d for d in available if d <= week]
+    return available[max(earlier)] if earlier else None
+
+
+def _report_status(report: str, week: str, path: str | None) -> str:
+    """built / skipped from the decision the manifest just stored for this run, empty if nothing to report."""
+    if path is None:
+        return "empty"
+    from app.reports.generate_report import _reports_dir
+
+    entry = manifest.load_entry(_reports_dir(), report, week) or {}
+    return "skipped" if entry.get("last_decision", {}).get("rebuild") is False else "built"
+
+
+def _build_week(week: str, snapshot: str | None, reports: tuple, force: bool) -> WeekResult:
+    """Worker: render `reports` for one week. Never raises."""
+    from app.reports import generate_report as gr
+
+    started = time.monotonic()
+    builders = {
+        "take_action": lambda: gr.generate_take_action_report(force=force, week=week),
+        "ceo_must_contact": lambda: gr.generate_ceo_must_contact_report(
+            send_notifications=False, force=force, week=week, loans_path=snapshot or "",
+        ),
+    }
+    statuses, errors = {}, []
+    for report in reports:
+        try:  # one failing report must not hide the other
+            statuses[report] = _report_status(report, week, builders[report]())
+        except Exception as e:
+            statuses[report] = "failed"
+            errors.append(f"{report}: {type(e).__name__}: {e}")
+    error = "; ".join(errors) or None
+
+    if "failed" in statuses.values():
+        status = "failed"
+    elif "built" in statuses.values():
+        status = "built"
+    else:
+        status = "skipped"
+    return WeekResult(week=week, status=status, snapshot=snapshot, reports=statuses,
+                      seconds=round(time.monotonic() - started, 2), error=error)
+
+
+def _worker_init() -> None:
+    # generator chatter goes to stderr; stdout carries progress (or --json)
+    sys.stdout = sys.stderr
+
+
+def _crashed(week: str, snapshot: str | None, error: BaseException) -> WeekResult:
+    return WeekResult(week=week, status="failed", snapshot=snapshot, error=f"{type(error).__name__}: {error}")
+
+
+def backfill(start: str | None = None, end: str | None = None, reports=REPORT_NAMES,
+             force: bool = False, max_workers: int | None = None,
+             backups_dir: str | None = None, progress=print) -> list[WeekResult]:
+    """Render `reports` for every ledger week in [start, end]; results in week order."""
+    with ledger.connect(os.path.join(_ROOT, ledger.LEDGER_PATH),
+                        legacy_dir=os.path.join(_ROOT, ledger.LEGACY_ACTIONS_DIR)) as conn:
+        weeks = ledger.weeks(conn, start, end)
+    if not weeks:
+        progress(f"[Backfill] No ledger weeks between {start or 'the start'} and {end or 'the end'}.")
+        return []
+
+    available = snapshots(backups_dir)
+    plan = {week: snapshot_for(week, available) for week in weeks}
+    reports = tuple(reports)
+    workers = max(1, min(max_workers or BACKFILL_CFG["MAX_WORKERS"], len(weeks)))
+    progress(f"[Backfill] {len(weeks)} weeks ({weeks[0]} .. {weeks[-1]}), {workers} workers, "
+             f"reports: {', '.join(reports)}{' (forced)' if force else ''}")
+
+    results = {}
+    with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"), initializer=_worker_init) as pool:
+        futures = {pool.submit(_build_week, week, snapshot, reports, force): week
+                   for week, snapshot in plan.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            week = futures[future]
+            try:
+                res = future.result()
+            except Exception as e:  # worker died (BrokenProcessPool, MemoryError, ...)
+                res = _crashed(week, plan[week], e)
+            results[week] = res
+            detail = ", ".join(f"{k}: {v}" for k, v in res.reports.items()) or res.error or ""
+            progress(f"[Backfill] {done}/{len(weeks)} {week} {res.status:<7} {res.seconds:>6.1f}s  {detail}")
+
+    ordered = [results[week] for week in weeks]
+    summary = {s: [r.week for r in ordered if r.status == s] for s in ("built", "skipped", "failed")}
+    progress(f"[Backfill] done: {len(summary['built'])} built, {len(summary['skipped'])} skipped, "
+             f"{len(summary['failed'])} failed")
+    if summary["failed"]:
+        progress(f"[Backfill] failed weeks: {', '.join(summary['failed'])}")
+    no_snapshot = [r.week for r in ordered if r.snapshot is None]
+    if no_snapshot and "ceo_must_contact" in reports:
+        progress(f"[Backfill] no weekly_backups snapshot (ledger Days Late used): {', '.join(no_snapshot)}")
+    return ordered
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild weekly report PDFs for a range of past weeks.")
+    parser.add_argument("--start", help="first week (Friday tag, YYYY-MM-DD), inclusive")
+    parser.add_argument("--end", help="last week (Friday tag, YYYY-MM-DD), inclusive")
+    parser.add_argument("--report", action="append", choices=REPORT_NAMES,
+                        help="report to build (repeatable; default: all)")
+    parser.add_argument("--workers", type=int, help=f"worker processes (default {BACKFILL_CFG['MAX_WORKERS']})")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the manifest says unchanged")
+    parser.add_argument("--backups-dir", help="weekly snapshot folder (default data/weekly_backups)")
+    parser.add_argument("--json", action="store_true", help="print the per-week results as JSON")
+    args = parser.parse_args()
+
+    out = backfill(args.start, args.end, args.report or REPORT_NAMES, force=args.force,
+                   max_workers=args.workers, backups_dir=args.backups_dir,
+                   progress=(lambda msg: print(msg, file=sys.stderr)) if args.json else print)
+    if args.json:
+        print(json.dumps(msgspec.to_builtins(out), indent=2))
+    sys.exit(1 if any(r.status == "failed" for r in out) else 0)
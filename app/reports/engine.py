@@ -0,0 +1,107 @@
+"""
+app/reports/engine.py
+
+Long-lived report renderer shared by every PDF built in a process.
+
+The old path built a new Jinja Environment for every report, so each template
+was recompiled. WeasyPrint then re-parsed the <style> block and rebuilt its
+font configuration for each PDF. ReportEngine keeps all of that warm:
+
+- one Jinja Environment with an on-disk bytecode cache (ENGINE_CFG["BYTECODE_DIR"]),
+  so even a fresh process (each runner child, each backfill worker) skips
+  compilation; templates still reload when their source changes
+- stylesheets from app/reports/styles/ parsed once into weasyprint.CSS and
+  reparsed only when the file's mtime changes
+- a single FontConfiguration shared by all stylesheets and renders
+
+    engine = get_engine()
+    engine.render_pdf("ceo_must_contact.html", "ceo_must_contact.css", pdf_path, week=...)
+
+benchmarks/bench_report_engine.py compares per-PDF time against the cold path.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+ENGINE_CFG = {
+    "TEMPLATES_DIR": os.path.join(_ROOT, "app", "templates"),
+    "STYLES_DIR": os.path.join(os.path.dirname(os.path.abspath(__file__)), "styles"),
+    "BYTECODE_DIR": os.getenv("REPORT_BYTECODE_DIR", os.path.join(_ROOT, "data", ".jinja_cache")),
+}
+
+
+class ReportEngine:
+    """Jinja environment, parsed stylesheets and fonts reused across renders."""
+
+    def __init__(self, templates_dir: str | None = None, styles_dir: str | None = None,
+                 bytecode_dir: str | None = None):
+        self.templates_dir = templates_dir or ENGINE_CFG["TEMPLATES_DIR"]
+        self.styles_dir = styles_dir or ENGINE_CFG["STYLES_DIR"]
+        bytecode_dir = bytecode_dir or ENGINE_CFG["BYTECODE_DIR"]
+        os.makedirs(bytecode_dir, exist_ok=True)
+
+        self.env = Environment(
+            loader=FileSystemLoader(self.templates_dir),
+            autoescape=select_autoescape(["html", "xml"]),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_dir),
+            auto_reload=True,
+        )
+        self.font_config = FontConfiguration()
+        self._styles = {}  # name -> (mtime, CSS)
+        self._lock = threading.Lock()
+
+    def template(self, name: str):
+        return self.env.get_template(name)
+
+    def template_source(self, name: str) -> str:
+        source, _, _ = self.env.loader.get_source(self.env, name)
+        return source
+
+    def stylesheet_path(self, name: str) -> str:
+        return os.path.join(self.styles_dir, name)
+
+    def stylesheet(self, name: str) -> CSS:
+        """Parsed stylesheet `name` from styles_dir; reparsed only when the file changes."""
+        path = self.stylesheet_path(name)
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._styles.get(name)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, CSS(filename=path, font_config=self.font_config))
+                self._styles[name] = cached
+            return cached[1]
+
+    def render_html(self, template_name: str, **context) -> str:
+        return self.template(template_name).render(**context)
+
+    def write_pdf(self, html: str, stylesheet: str | None, pdf_path: str) -> str:
+        """Lay out `html` with the shared fonts and the parsed `stylesheet` into `pdf_path`."""
+        stylesheets = [self.stylesheet(stylesheet)] if stylesheet else []
+        HTML(string=html, base_url=self.templates_dir).write_pdf(
+            pdf_path, stylesheets=stylesheets, font_config=self.font_config,
+        )
+        return pdf_path
+
+    def render_pdf(self, template_name: str, stylesheet: str | None, pdf_path: str, **context) -> str:
+        return self.write_pdf(self.render_html(template_name, **context), stylesheet, pdf_path)
+
+
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_engine() -> ReportEngine:
+    """The process-wide ReportEngine, created on first use."""
+    global _ENGINE
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = ReportEngine()
+        return _ENGINE
@@ -1,25 +1,28 @@
 import os
 import re
-import json
+import sys
 import pandas as pd
 import matplotlib
 
 matplotlib.use("Agg")
 from matplotlib import pyplot as plt  # kept for backward-compat
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from weasyprint import HTML
 import base64
 
 # --- utils import (works whether you run as module or file) ---
 try:
     # Running as a module: python -m app.reports.generate_report
-    from app.utils import load_latest_loans
+    from app.utils import load_latest_loans, loans_data_version, read_loans_file
 except ImportError:
     # Running the file directly: python app/reports/generate_report.py
     import sys
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-    from utils import load_latest_loans
+    from utils import load_latest_loans, loans_data_version, read_loans_file
+
+from app.models import action_ledger as ledger
+from app.reports import manifest
+from app.reports import sections
+from app.reports.engine import get_engine
 
 # --- optional notifications ---
 try:
@@ -40,23 +43,8 @@ def _project_root():
     return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
 
 def _get_env():
-    try:
-        return Environment(
-            loader=FileSystemLoader(os.path.join(_project_root(), "app", "templates")),
-            autoescape=select_autoescape(["html", "xml"]),
-        )
-    except Exception as e:
-        print("Template environment init failed:", e)
-        return None
-
-def _safe_get_template(env, template_path):
-    if env is None:
-        return None
-    try:
-        return env.get_template(template_path)
-    except Exception as e:
-        print(f"Template not found or failed to load: {template_path} ->", e)
-        return None
+    """Jinja environment of the shared ReportEngine (compiled templates are reused)."""
+    return get_engine().env
 
 
 # ========== Path helpers ==========
@@ -66,23 +54,63 @@ def _reports_dir():
     os.makedirs(path, exist_ok=True)
     return path
 
-def _weekly_actions_dir():
+def _ledger_path():
+    return os.path.join(_project_root(), "data", "actions.db")
+
+def _latest_week_entries(ceo_only=False, week=None):
+    """
+    Return (entries, week_tag) for `week` (default: the newest week in the action
+    ledger), or (None, None) if the ledger has no such week.
+    """
     root = _project_root()
-    return os.path.join(root, "data", "weekly_actions")
+    with ledger.connect(_ledger_path(), legacy_dir=os.path.join(root, "data", "weekly_actions")) as conn:
+        if week is None:
+            week = ledger.latest_week(conn)
+        if week is None or week not in ledger.weeks(conn, week, week):
+            return None, None
+        return ledger.week_entries(conn, week, ceo_only=ceo_only), week
+
+def _load_loans(loans_path=None):
+    """
+    (loan frame, data version): the live workbook when loans_path is None, a
+    weekly backup when it is a path, and no loans at all when it is "".
+    """
+    if loans_path is None:
+        return load_latest_loans(), loans_data_version()
+    if not loans_path:
+        return pd.DataFrame(), None
+    return read_loans_file(loans_path)
+
 
-def _latest_week_json():
-    """Return (json_path, week_tag) for the newest weekly_actions file, or (None, None) if none."""
-    folder = _weekly_actions_dir()
-    if not os.path.exists(folder):
-        return None, None
-    files = sorted(f for f in os.listdir(folder) if f.endswith(".json"))
-    if not files:
-        return None, None
-    last = files[-1]
-    return os.path.join(folder, last), last.replace(".json", "")
+# ========== Build manifest inputs ==========
+# Modules whose changes alter the rendered PDFs
+_CODE_FILES = [os.path.abspath(__file__), os.path.abspath(sections.__file__)]
+# Ledger bookkeeping that does not change what a report shows
+_VOLATILE_FIELDS = ("id", "updated_at", "version")
+
+def _actions_digest(entries):
+    return manifest.digest([{k: v for k, v in e.items() if k not in _VOLATILE_FIELDS} for e in entries])
+
+def _template_digest(env, template_path):
+    try:
+        source, _, _ = env.loader.get_source(env, template_path)
+        return manifest.text_digest(source)
+    except Exception:
+        return None
+
+def _report_inputs(env, template_path, stylesheet, **extra):
+    """Hashes of everything a report's PDF depends on (see app/reports/manifest.py)."""
+    return {
+        "template": _template_digest(env, template_path),
+        "styles": manifest.file_digest(get_engine().stylesheet_path(stylesheet)),
+        "code": manifest.digest([manifest.file_digest(path) for path in _CODE_FILES]),
+        **extra,
+    }
 
 
 # ========== Take Action Report ==========
+TAKE_ACTION_CSS = "take_action_report.css"  # app/reports/styles/
+
 def render_split_table_data(borrowers):
     contacted = []
     not_contacted = []
@@ -100,217 +128,228 @@ def render_split_table_data(borrowers):
             not_contacted.append(entry)
     return {"contacted": contacted, "not_contacted": not_contacted}
 
-def generate_take_action_report():
-    """Generate the weekly Take Action PDF from the newest JSON. Never raise."""
-    try:
-        json_path, week = _latest_week_json()
-        if not json_path:
-            print("[TakeAction] No JSON files found. Skipping.")
-            return None
-
-        with open(json_path) as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
-
-        if df.empty:
-            print("[TakeAction] Data is empty. Skipping.")
-            return None
-
-        # Split into halves (your current convention)
-        mid = len(df) // 2
-        high_risk_df = df.iloc[:mid]
-        critical_df = df.iloc[mid:]
-
-        high_risk_data = render_split_table_data(high_risk_df.to_dict(orient="records"))
-        critical_data = render_split_table_data(critical_df.to_dict(orient="records"))
-
-        contacted_counts = df.get("contacted", pd.Series(dtype=int)).value_counts()
-        total = int(len(df))
-        contacted_n = int(contacted_counts.get(True, 0)) if not contacted_counts.empty else 0
-        not_contacted_n = int(contacted_counts.get(False, 0)) if not contacted_counts.empty else 0
-
-        # Percentages as strings with % for width attributes in the template
-        contacted_pct = f"{round((contacted_n / total) * 100) if total else 0}%"
-        not_contacted_pct = f"{100 - int(contacted_pct.rstrip('%')) if total else 0}%"
-
-        env = _get_env()
-        template = _safe_get_template(env, "dashboardsidebar/takeaction/take_action_report.html")
-        if template is None:
-            print("[TakeAction] Template missing. Skipping PDF render.")
-            return None
-
-        html_content = template.render(
-            week=week,
-            total=len(df),
-            contacted=contacted_n,
-            not_contacted=not_contacted_n,
-            chart_data="",  # no pie image
-            high_risk=high_risk_data,
-            critical=critical_data,
-            contacted_pct=contacted_pct,
-            not_contacted_pct=not_contacted_pct,
-        )
+def generate_take_action_report(force: bool = False, week: str | None = None):
+    """
+    Generate the Take Action PDF for `week` (default: the newest ledger week).
+    Skips rendering (returning the existing PDF) when the build manifest shows the
+    week's actions, template and code are unchanged, unless force=True.
+    Returns the PDF path, or None when there is nothing to report; template and
+    render errors raise.
+    """
+    data, week = _latest_week_entries(week=week)
+    if data is None:
+        print("[TakeAction] No weekly actions found. Skipping.")
+        return None
 
-        report_dir = _reports_dir()
-        pdf_path = os.path.join(report_dir, f"TakeAction_Report_{week}.pdf")
-        try:
-            HTML(string=html_content).write_pdf(pdf_path)
-            print(f"[TakeAction] PDF generated at {pdf_path}")
-            return pdf_path
-        except Exception as e:
-            print("[TakeAction] PDF render failed:", e)
-            return None
-    except Exception as e:
-        print("[TakeAction] Unexpected error:", e)
+    df = pd.DataFrame(data)
+
+    if df.empty:
+        print("[TakeAction] Data is empty. Skipping.")
         return None
 
+    # Split into halves (your current convention)
+    mid = len(df) // 2
+    high_risk_df = df.iloc[:mid]
+    critical_df = df.iloc[mid:]
+
+    high_risk_data = render_split_table_data(high_risk_df.to_dict(orient="records"))
+    critical_data = render_split_table_data(critical_df.to_dict(orient="records"))
+
+    contacted_counts = df.get("contacted", pd.Series(dtype=int)).value_counts()
+    total = int(len(df))
+    contacted_n = int(contacted_counts.get(True, 0)) if not contacted_counts.empty else 0
+    not_contacted_n = int(contacted_counts.get(False, 0)) if not contacted_counts.empty else 0
+
+    # Percentages as strings with % for width attributes in the template
+    contacted_pct = f"{round((contacted_n / total) * 100) if total else 0}%"
+    not_contacted_pct = f"{100 - int(contacted_pct.rstrip('%')) if total else 0}%"
+
+    env = _get_env()
+    template_path = "dashboardsidebar/takeaction/take_action_report.html"
+    env.get_template(template_path)  # fail before the manifest check if it is missing
+
+    report_dir = _reports_dir()
+    pdf_path = os.path.join(report_dir, f"TakeAction_Report_{week}.pdf")
+    inputs = _report_inputs(env, template_path, TAKE_ACTION_CSS, actions=_actions_digest(data))
+    decision = manifest.check(report_dir, "take_action", week, inputs, pdf_path, force=force)
+    if not decision.rebuild:
+        print(f"[TakeAction] Up to date ({decision.reason}): {pdf_path}")
+        return pdf_path
+
+    context = dict(
+        week=week,
+        total=len(df),
+        contacted=contacted_n,
+        not_contacted=not_contacted_n,
+        chart_data="",  # no pie image
+        high_risk=high_risk_data,
+        critical=critical_data,
+        contacted_pct=contacted_pct,
+        not_contacted_pct=not_contacted_pct,
+    )
+
+    # Large weeks render as parallel sections merged into one PDF (app/reports/sections.py)
+    sections.render_report(template_path, TAKE_ACTION_CSS, pdf_path, context,
+                           sections.take_action_parts, rows=total)
+    print(f"[TakeAction] PDF generated at {pdf_path} ({decision.reason})")
+    manifest.record(report_dir, "take_action", week, inputs, pdf_path, decision)
+    return pdf_path
+
 
 ## ========== CEO “Must Contact” Report ==========
 
-# Exact dropdown phrase (this is what you’ll enforce on the Take Action page)
-EXPECTED_NOTE = "move to BAD, needs to contacted by MIKE/SAIPI"
+# Exact dropdown phrase (this is what you’ll enforce on the Take Action page).
+# Matching lives with the ledger, which flags escalations as they are saved.
+EXPECTED_NOTE = ledger.EXPECTED_NOTE
+_note_matches = ledger.note_matches
+
+def _borrower_flags(loans_df):
+    """One row per borrower: max Days Late, any Has Title, any Has Guarantor."""
+    loans = pd.DataFrame({
+        "borrower": loans_df["Borrower"].astype(str).str.strip(),
+        "loan_days": pd.to_numeric(loans_df["Days Late"], errors="coerce").fillna(0),
+        "has_title": loans_df["Has Title"].fillna(False).astype(bool),
+        "has_guarantor": loans_df["Has Guarantor"].fillna(False).astype(bool),
+    })
+    return loans.groupby("borrower", sort=False).agg(
+        loan_days=("loan_days", "max"),
+        has_title=("has_title", "any"),
+        has_guarantor=("has_guarantor", "any"),
+    )
+
+def _bucket_ceo_cases(actions, loans_df=None):
+    """
+    Enrich CEO cases with their borrower's loans (one groupby + one merge) and split them:
+      - Critical: >21 days late, no title and no guarantor
+      - High Risk: >21 days late otherwise
+    Cases 21 days late or less are left out. Each bucket is sorted by lateness.
+    Returns (high_rows, critical_rows) as template payloads.
+    """
+    cases = pd.DataFrame(list(actions)).reindex(columns=["borrower", "balance", "days_late", "note"])
+    borrower = cases["borrower"].fillna("").astype(str).str.strip()
+    # Days late: prefer the action record, raised to the borrower's worst loan
+    days = pd.to_numeric(cases["days_late"], errors="coerce").fillna(0)
+    has_title = pd.Series(False, index=cases.index)
+    has_guarantor = pd.Series(False, index=cases.index)
+
+    if loans_df is not None:
+        flags = pd.DataFrame({"borrower": borrower}).merge(
+            _borrower_flags(loans_df), how="left", left_on="borrower", right_index=True
+        )
+        known = flags["loan_days"].notna() & (borrower != "")
+        days = pd.concat([days, flags["loan_days"].where(known)], axis=1).max(axis=1)
+        has_title = flags["has_title"].where(known, False).astype(bool)
+        has_guarantor = flags["has_guarantor"].where(known, False).astype(bool)
+
+    days = days.astype(int)
+    late = days > 21
+    critical = late & ~has_title & ~has_guarantor
+    high = late & ~critical
 
-def _normalize_note(s: str) -> str:
-    """Trim, collapse internal whitespace, and uppercase for stable comparison."""
-    return " ".join(s.strip().split()).upper()
+    payload = pd.DataFrame({
+        "borrower": borrower,
+        "balance_fmt": pd.to_numeric(cases["balance"], errors="coerce").fillna(0.0).map("${:,.2f}".format),
+        "days_late": days,
+        "note": cases["note"].fillna(""),
+    })
 
-_EXPECTED_NOTE_NORM = _normalize_note(EXPECTED_NOTE)
+    def bucket(mask):
+        rows = payload[mask].sort_values("days_late", ascending=False, kind="stable")
+        return rows.to_dict(orient="records")
 
-def _note_matches(note: str) -> bool:
-    """Match the dropdown phrase robustly (ignores case / extra spaces)."""
-    return isinstance(note, str) and _normalize_note(note) == _EXPECTED_NOTE_NORM
+    return bucket(high), bucket(critical)
 
-def generate_ceo_must_contact_report(send_notifications: bool = False):
+CEO_CSS = "ceo_must_contact.css"  # app/reports/styles/
+
+def generate_ceo_must_contact_report(send_notifications: bool = False, force: bool = False,
+                                     week: str | None = None, loans_path: str | None = None):
     """
-    Create CEO report from the latest weekly_actions JSON.
-    Criteria: note matches EXPECTED_NOTE.
+    Create CEO report from `week` of the action ledger (default: the latest week),
+    enriched from `loans_path` (default: the live latest_loans.xlsx; backfills pass
+    that week's data/weekly_backups snapshot, or "" to use the ledger's Days Late).
+    Criteria: note matches EXPECTED_NOTE (the ledger's ceo_escalation flag).
     We classify into two buckets:
       - High Risk (21+ days late)
       - Critical (No Title & No Guarantor, and >21 days late)
-    Saves to sam_xtrack/reports/CEO_MustContact_<week>.pdf
-    Never raises; returns pdf path or None.
+    Saves to sam_xtrack/reports/CEO_MustContact_<week>.pdf, unless the build
+    manifest shows the CEO cases, loan data, template and code are unchanged
+    (force=True renders anyway).
+    Returns the PDF path, or None when there is nothing to report; template and
+    render errors raise. Notification failures are only logged.
     """
+    filtered, week = _latest_week_entries(ceo_only=True, week=week)
+    if filtered is None:
+        print("[CEO] No weekly actions found. Skipping CEO report.")
+        return None
+
+    if not filtered:
+        # helpful debug of notes seen
+        actions, _ = _latest_week_entries(week=week)
+        seen = sorted({repr(a.get("note", "")) for a in actions})
+        print("[CEO] No matching CEO contact cases found. Notes seen:", seen)
+        return None
+
+    # Pull loans file to enrich with Days Late / Has Title / Has Guarantor
     try:
-        json_path, week = _latest_week_json()
-        if not json_path:
-            print("[CEO] No weekly_actions JSON found. Skipping CEO report.")
-            return None
-
-        with open(json_path, "r") as f:
-            actions = json.load(f)
-
-        # Filter by note
-        filtered = [a for a in actions if _note_matches(a.get("note", ""))]
-        if not filtered:
-            # helpful debug of notes seen
-            seen = sorted({repr(a.get("note", "")) for a in actions})
-            print("[CEO] No matching CEO contact cases found. Notes seen:", seen)
-            return None
-
-        # Pull loans file to enrich with Days Late / Has Title / Has Guarantor
-        try:
-            loans_df = load_latest_loans()
-        except Exception as e:
-            print("[CEO] load_latest_loans failed:", e)
-            loans_df = pd.DataFrame()
-
-        have_loans = (not loans_df.empty and
-                      all(col in loans_df.columns for col in ["Borrower", "Days Late", "Has Title", "Has Guarantor"]))
-
-        high_rows = []
-        critical_rows = []
-
-        for a in filtered:
-            borrower = str(a.get("borrower", "")).strip()
-            bal = float(a.get("balance", 0) or 0.0)
-
-            # Days late: prefer JSON, else from loans
-            try:
-                days = int(a.get("days_late") or 0)
-            except Exception:
-                days = 0
-
-            has_title = False
-            has_guarantor = False
-
-            if have_loans and borrower:
-                matches = loans_df[loans_df["Borrower"] == borrower]
-                if not matches.empty:
-                    try:
-                        # if multiple rows, use the max lateness / any flags
-                        days = max(days, int(matches["Days Late"].fillna(0).astype(float).max()))
-                    except Exception:
-                        pass
-                    has_title = bool(matches["Has Title"].fillna(False).astype(bool).any())
-                    has_guarantor = bool(matches["Has Guarantor"].fillna(False).astype(bool).any())
-
-            row_payload = {
-                "borrower": borrower,
-                "balance_fmt": f"${bal:,.2f}",
-                "days_late": int(days),
-                "note": a.get("note", ""),
-            }
-
-            # Bucket logic
-            if int(days) > 21 and (not has_title) and (not has_guarantor):
-                critical_rows.append(row_payload)
-            elif int(days) > 21:
-                high_rows.append(row_payload)
-            else:
-                # If the note is set but <22 days late, we leave it out.
-                # (You can move it to high_rows if you want to still show it.)
-                pass
-
-        # Sort within each bucket by lateness
-        critical_rows.sort(key=lambda r: r["days_late"], reverse=True)
-        high_rows.sort(key=lambda r: r["days_late"], reverse=True)
-
-        # Render
-        env = _get_env()
-        template = _safe_get_template(env, "ceo_must_contact.html")
-        if template is None:
-            print("[CEO] Template missing. Skipping PDF render.")
-            return None
-
-        html_string = template.render(
+        loans_df, loans_version = _load_loans(loans_path)
+    except Exception as e:
+        print(f"[CEO] loading loans ({loans_path or 'latest'}) failed:", e)
+        loans_df, loans_version = pd.DataFrame(), None
+
+    have_loans = (not loans_df.empty and
+                  all(col in loans_df.columns for col in ["Borrower", "Days Late", "Has Title", "Has Guarantor"]))
+
+    high_rows, critical_rows = _bucket_ceo_cases(filtered, loans_df if have_loans else None)
+
+    # Render
+    env = _get_env()
+    template_path = "ceo_must_contact.html"
+    env.get_template(template_path)  # fail before the manifest check if it is missing
+
+    out_dir = _reports_dir()
+    pdf_path = os.path.join(out_dir, f"CEO_MustContact_{week}.pdf")
+    inputs = _report_inputs(
+        env, template_path, CEO_CSS,
+        actions=_actions_digest(filtered),
+        loans=loans_version if have_loans else None,
+    )
+    decision = manifest.check(out_dir, "ceo_must_contact", week, inputs, pdf_path, force=force)
+    if decision.rebuild:
+        context = dict(
             week=week,
             expected_note=EXPECTED_NOTE,
             high_rows=high_rows,
             critical_rows=critical_rows
         )
-
-        out_dir = _reports_dir()
-        pdf_path = os.path.join(out_dir, f"CEO_MustContact_{week}.pdf")
+        sections.render_report(template_path, CEO_CSS, pdf_path, context,
+                               sections.ceo_parts, rows=len(high_rows) + len(critical_rows))
+        print(f"[CEO] PDF generated at {pdf_path} ({decision.reason})")
+        manifest.record(out_dir, "ceo_must_contact", week, inputs, pdf_path, decision)
+    else:
+        print(f"[CEO] Up to date ({decision.reason}): {pdf_path}")
+
+    if send_notifications:
+        try:
+            send_email_with_attachment(pdf_path)
+        except Exception as e:
+            print("[CEO] Email send failed:", e)
         try:
-            HTML(string=html_string).write_pdf(pdf_path)
-            print(f"[CEO] PDF generated at {pdf_path}")
+            send_telegram_document(pdf_path)
         except Exception as e:
-            print("[CEO] PDF render failed:", e)
-            return None
-
-        if send_notifications:
-            try:
-                send_email_with_attachment(pdf_path)
-            except Exception as e:
-                print("[CEO] Email send failed:", e)
-            try:
-                send_telegram_document(pdf_path)
-            except Exception as e:
-                print("[CEO] Telegram send failed:", e)
+            print("[CEO] Telegram send failed:", e)
 
-        return pdf_path
-    except Exception as e:
-        print("[CEO] Unexpected error:", e)
-        return None
+    return pdf_path
 
 
 # ========== script entry ==========
 if __name__ == "__main__":
+    # --force: re-render even when the build manifest says inputs are unchanged
+    force = "--force" in sys.argv[1:]
     try:
-        generate_take_action_report()
+        generate_take_action_report(force=force)
     except Exception as e:
         print("[Main] TakeAction crashed:", e)
     try:
-        generate_ceo_must_contact_report(send_notifications=False)
+        generate_ceo_must_contact_report(send_notifications=False, force=force)
     except Exception as e:
         print("[Main] CEO report crashed:", e)
\ No newline at end of file
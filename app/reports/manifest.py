@@ -0,0 +1,160 @@
+"""
+app/reports/manifest.py
+
+Build manifest for the weekly PDFs: skip re-rendering a report whose inputs
+have not changed since it was last built.
+
+Each report build records one small JSON file,
+reports/.manifest/<report>_<week>.json:
+
+    {"report": "take_action", "week": "2025-07-18", "output": ".../TakeAction_Report_2025-07-18.pdf",
+     "inputs": {"actions": <sha256>, "template": <sha256>, "code": <sha256>, ...},
+     "built_at": ..., "last_decision": {"rebuild": false, "reason": "...", "changed": [], "at": ...}}
+
+check() compares the current input hashes with the recorded ones (and that
+the PDF still exists) and stores its decision, so "why was / wasn't this
+rebuilt?" can always be answered:
+
+    python -m app.reports.manifest [--report take_action] [--week 2025-07-18]
+
+One file per (report, week) keeps parallel renders (app/reports/runner.py)
+from racing on a shared manifest; every write is tmp + os.replace.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import msgspec
+
+MANIFEST_DIRNAME = ".manifest"
+
+
+class Decision(msgspec.Struct):
+    rebuild: bool
+    reason: str
+    changed: list[str] = []
+
+
+def digest(obj) -> str:
+    """sha256 of a JSON-able value, independent of dict ordering."""
+    payload = json.dumps(obj, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def text_digest(text: str | bytes) -> str:
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+def file_digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _entry_path(reports_dir: str, report: str, week: str) -> str:
+    return os.path.join(reports_dir, MANIFEST_DIRNAME, f"{report}_{week}.json")
+
+
+def load_entry(reports_dir: str, report: str, week: str) -> dict | None:
+    try:
+        with open(_entry_path(reports_dir, report, week), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_entry(reports_dir: str, report: str, week: str, entry: dict) -> None:
+    path = _entry_path(reports_dir, report, week)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entry, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _stamp(decision: Decision) -> dict:
+    return {**msgspec.to_builtins(decision), "at": datetime.now().isoformat(timespec="seconds")}
+
+
+def check(reports_dir: str, report: str, week: str, inputs: dict, output_path: str,
+          force: bool = False) -> Decision:
+    """Decide whether `report` for `week` must be rendered, and remember why."""
+    entry = load_entry(reports_dir, report, week)
+    if force:
+        decision = Decision(True, "forced")
+    elif entry is None:
+        decision = Decision(True, "never built")
+    elif not os.path.exists(output_path):
+        decision = Decision(True, "output missing")
+    else:
+        recorded = entry.get("inputs", {})
+        changed = sorted(k for k in set(inputs) | set(recorded) if inputs.get(k) != recorded.get(k))
+        if changed:
+            decision = Decision(True, f"inputs changed: {', '.join(changed)}", changed)
+        else:
+            decision = Decision(False, "inputs unchanged since last build")
+
+    if entry is not None and not decision.rebuild:
+        entry["last_decision"] = _stamp(decision)
+        _write_entry(reports_dir, report, week, entry)
+    return decision
+
+
+def record(reports_dir: str, report: str, week: str, inputs: dict, output_path: str,
+           decision: Decision) -> None:
+    """Store the inputs of a successful build."""
+    _write_entry(reports_dir, report, week, {
+        "report": report,
+        "week": week,
+        "output": output_path,
+        "inputs": inputs,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "last_decision": _stamp(decision),
+    })
+
+
+def explain(reports_dir: str, report: str | None = None, week: str | None = None) -> list[dict]:
+    """Manifest entries (newest week first), optionally for one report and/or week."""
+    folder = os.path.join(reports_dir, MANIFEST_DIRNAME)
+    try:
+        names = os.listdir(folder)
+    except FileNotFoundError:
+        return []
+    entries = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, name), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if (report is None or entry.get("report") == report) and (week is None or entry.get("week") == week):
+            entries.append(entry)
+    return sorted(entries, key=lambda e: (e.get("week", ""), e.get("report", "")), reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show why weekly reports were or were not rebuilt.")
+    parser.add_argument("--report", help="take_action or ceo_must_contact")
+    parser.add_argument("--week", help="Friday tag, YYYY-MM-DD")
+    parser.add_argument("--dir", default=os.path.join(os.path.dirname(__file__), "..", "..", "reports"))
+    args = parser.parse_args()
+
+    rows = explain(os.path.abspath(args.dir), args.report, args.week)
+    if not rows:
+        print("No manifest entries.")
+    for e in rows:
+        d = e.get("last_decision", {})
+        action = "rebuilt" if d.get("rebuild") else "skipped"
+        print(f"{e.get('week')}  {e.get('report'):<18} {action:<8} {d.get('at', '')}  {d.get('reason', '')}")
+        print(f"    built_at={e.get('built_at')}  output={e.get('output')}")
@@ -0,0 +1,223 @@
+"""
+app/reports/runner.py
+
+Isolated, parallel report rendering.
+
+Each report runs in its own spawned child process, at most MAX_WORKERS at a
+time. Every child leads its own process group; the parent kills that group
+(the child plus any section workers it started, see app/reports/sections.py)
+if it overruns its timeout.
+The caller, usually the long-lived scheduler, therefore never imports
+WeasyPrint itself. A render that hangs or balloons costs one child, not the
+scheduler. Every job ends as a ReportResult with its status, output path,
+wall time, peak RSS and error. A report with nothing to render (no ledger
+week, no CEO cases) is "skipped"; any exception it raises is "failed".
+
+REPORT_MEMORY_LIMIT_MB caps each child with RLIMIT_AS (default 8192, 0 turns
+it off). That limit is on virtual address space, not resident memory:
+numpy/OpenBLAS thread arenas and pyarrow's allocator reserve far more than
+they touch, especially on many-core hosts, so a limit near the real footprint
+fails normal reports with MemoryError. The default only stops a runaway
+render; when lowering it, stay several times above the peak RSS the results
+report.
+
+    python -m app.reports.runner [--force] [take_action] [ceo_must_contact]
+
+Reports whose inputs are unchanged since their last build come back "ok"
+without re-rendering (app/reports/manifest.py); --force renders anyway.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import signal
+import sys
+import time
+from multiprocessing.connection import wait
+
+import msgspec
+
+try:
+    import resource
+except ImportError:  # not available on Windows; memory limits are skipped there
+    resource = None
+
+log = logging.getLogger("samxtrack.reports")
+
+RUNNER_CFG = {
+    "TIMEOUT_S": int(os.getenv("REPORT_TIMEOUT_S", 300)),
+    "MEMORY_LIMIT_MB": int(os.getenv("REPORT_MEMORY_LIMIT_MB", 8192)),  # RLIMIT_AS (virtual), 0 = unlimited
+    "MAX_WORKERS": int(os.getenv("REPORT_MAX_WORKERS", min(4, os.cpu_count() or 1))),
+}
+
+# name -> "module:function"; the function returns the PDF path, None when there is
+# nothing to report, and raises on errors
+REPORTS = {
+    "take_action": "app.reports.generate_report:generate_take_action_report",
+    "ceo_must_contact": "app.reports.generate_report:generate_ceo_must_contact_report",
+}
+
+
+class ReportJob(msgspec.Struct):
+    name: str
+    target: str
+    kwargs: dict = {}
+    timeout_s: float | None = None
+
+
+class ReportResult(msgspec.Struct):
+    name: str
+    status: str  # ok | skipped | failed | timeout | crashed
+    path: str | None = None
+    seconds: float = 0.0
+    max_rss_mb: float | None = None
+    error: str | None = None
+    exitcode: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+def job(name: str, **kwargs) -> ReportJob:
+    """ReportJob for a name in REPORTS."""
+    return ReportJob(name=name, target=REPORTS[name], kwargs=kwargs)
+
+
+def _resolve(target: str):
+    module_name, func_name = target.split(":", 1)
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _limit_memory(memory_limit_mb: int) -> None:
+    if resource is None or not memory_limit_mb:
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _child(target: str, kwargs: dict, conn, memory_limit_mb: int) -> None:
+    """Child entry point: render one report and send (status, path, error, max_rss_mb)."""
+    try:
+        if hasattr(os, "setpgrp"):
+            os.setpgrp()  # own process group: _stop() takes section workers down too
+        # SIGTERM from _stop() unwinds normally, so temp files are cleaned up
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+        _limit_memory(memory_limit_mb)
+        path = _resolve(target)(**kwargs)
+        message = ("ok" if path else "skipped", path, None)
+    except MemoryError:
+        limit = f" (RLIMIT_AS {memory_limit_mb} MB)" if memory_limit_mb else ""
+        message = ("failed", None, f"MemoryError: out of memory{limit}")
+    except BaseException as e:  # report everything to the parent, including SystemExit
+        message = ("failed", None, f"{type(e).__name__}: {e}")
+    try:
+        conn.send((*message, _max_rss_mb()))
+    finally:
+        conn.close()
+
+
+def _signal_group(proc, sig) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except (AttributeError, OSError):  # no process groups, or the child has not set one up yet
+        if sig == getattr(signal, "SIGKILL", None):
+            proc.kill()
+        else:
+            proc.terminate()
+
+
+def _stop(proc) -> None:
+    _signal_group(proc, signal.SIGTERM)
+    proc.join(5)
+    if proc.is_alive():
+        _signal_group(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+        proc.join()
+
+
+def run_reports(jobs, max_workers: int | None = None, timeout_s: float | None = None,
+                memory_limit_mb: int | None = None) -> list[ReportResult]:
+    """
+    Render `jobs` (ReportJob or REPORTS names) in child processes, at most
+    `max_workers` at once. Returns one ReportResult per job, in input order.
+    """
+    cfg_timeout = RUNNER_CFG["TIMEOUT_S"] if timeout_s is None else timeout_s
+    memory_limit_mb = RUNNER_CFG["MEMORY_LIMIT_MB"] if memory_limit_mb is None else memory_limit_mb
+    max_workers = max(1, max_workers or RUNNER_CFG["MAX_WORKERS"])
+    jobs = [job(j) if isinstance(j, str) else j for j in jobs]
+
+    # spawn: a clean interpreter per report, safe even when the caller has threads
+    ctx = mp.get_context("spawn")
+    pending = list(enumerate(jobs))
+    running = {}  # reader conn -> (index, job, process, started)
+    results = [None] * len(jobs)
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            index, report = pending.pop(0)
+            reader, writer = ctx.Pipe(duplex=False)
+            proc = ctx.Process(
+                target=_child,
+                args=(report.target, report.kwargs, writer, memory_limit_mb),
+                name=f"report-{report.name}",
+                # not daemonic, so the report may start its own section workers
+                daemon=False,
+            )
+            proc.start()
+            writer.close()
+            running[reader] = (index, report, proc, time.monotonic())
+            log.info("Report %s started (pid %s)", report.name, proc.pid)
+
+        for reader in wait(list(running), timeout=0.5):
+            index, report, proc, started = running.pop(reader)
+            try:
+                status, path, error, max_rss = reader.recv()
+            except EOFError:  # died without reporting (segfault, OOM kill, ...)
+                proc.join()
+                status, path, error, max_rss = "crashed", None, "child exited without a result", None
+            reader.close()
+            proc.join(5)
+            results[index] = ReportResult(
+                name=report.name, status=status, path=path, error=error,
+                seconds=round(time.monotonic() - started, 2), max_rss_mb=max_rss,
+                exitcode=proc.exitcode,
+            )
+
+        now = time.monotonic()
+        for reader, (index, report, proc, started) in list(running.items()):
+            limit = report.timeout_s if report.timeout_s is not None else cfg_timeout
+            if limit and now - started > limit:
+                _stop(proc)
+                del running[reader]
+                reader.close()
+                results[index] = ReportResult(
+                    name=report.name, status="timeout", seconds=round(now - started, 2),
+                    error=f"exceeded {limit}s timeout", exitcode=proc.exitcode,
+                )
+
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+    args = sys.argv[1:]
+    force = "--force" in args
+    names = [a for a in args if a != "--force"] or list(REPORTS)
+    out = run_reports([job(n, force=True) if force else job(n) for n in names])
+    print(json.dumps(msgspec.to_builtins(out), indent=2))
+    sys.exit(0 if all(r.status in ("ok", "skipped") for r in out) else 1)
@@ -0,0 +1,121 @@
+"""
+app/reports/sections.py
+
+Sectioned rendering for large weekly PDFs.
+
+A week with hundreds of delinquent loans made WeasyPrint lay out the whole
+Take Action or CEO document in one pass, and that pass's time and memory grow
+with the report. Above SECTION_CFG["MIN_ROWS"] rows, a report is instead split
+into independent parts:
+- Take Action: the summary, then High Risk and Critical, each as contacted and
+  not contacted chunks
+- CEO: High Risk and Critical chunks
+
+Each part holds at most CHUNK_ROWS rows. The parts render in a pool of spawned
+worker processes, each with its own warm ReportEngine, and are then merged in
+order into the final PDF with PyPDF2. Peak layout memory per worker is
+therefore bounded by the chunk size, not the report size. Each part starts on
+a new page.
+
+The report templates take an optional `sections` list naming the parts to
+show (all of them when it is absent), so one template serves both paths.
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PyPDF2 import PdfMerger
+
+from app.reports.engine import get_engine
+
+SECTION_CFG = {
+    "MIN_ROWS": int(os.getenv("REPORT_SECTION_MIN_ROWS", 300)),  # smaller reports render in one pass
+    "CHUNK_ROWS": int(os.getenv("REPORT_SECTION_CHUNK_ROWS", 150)),
+    "MAX_WORKERS": int(os.getenv("REPORT_SECTION_WORKERS", min(4, os.cpu_count() or 1))),
+}
+
+
+def _chunks(rows: list, size: int) -> list[list]:
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def take_action_parts(context: dict, chunk_rows: int | None = None) -> list[dict]:
+    """Summary, then one part per chunk of each High Risk / Critical contacted / not-contacted list."""
+    chunk_rows = chunk_rows or SECTION_CFG["CHUNK_ROWS"]
+    empty = {"contacted": [], "not_contacted": []}
+    base = {**context, "high_risk": empty, "critical": empty}
+    parts = [{**base, "sections": ["summary"]}]
+    for key in ("high_risk", "critical"):
+        for bucket in ("contacted", "not_contacted"):
+            for rows in _chunks(context[key][bucket], chunk_rows):
+                parts.append({**base, "sections": [key], key: {**empty, bucket: rows}})
+    return parts
+
+
+def ceo_parts(context: dict, chunk_rows: int | None = None) -> list[dict]:
+    """One part per chunk of High Risk and Critical rows; the first part carries the heading."""
+    chunk_rows = chunk_rows or SECTION_CFG["CHUNK_ROWS"]
+    base = {**context, "high_rows": [], "critical_rows": []}
+    parts = []
+    for key, section in (("high_rows", "high"), ("critical_rows", "critical")):
+        for rows in _chunks(context[key], chunk_rows):
+            parts.append({**base, "sections": [section], key: rows})
+    if parts:
+        parts[0]["sections"] = ["summary", *parts[0]["sections"]]
+    return parts
+
+
+def _render_part(template_name: str, stylesheet: str, pdf_path: str, context: dict) -> str:
+    return get_engine().render_pdf(template_name, stylesheet, pdf_path, **context)
+
+
+def _merge(paths: list[str], pdf_path: str) -> None:
+    merger = PdfMerger()
+    try:
+        for path in paths:
+            merger.append(path)
+        tmp_path = f"{pdf_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            merger.write(f)
+    finally:
+        merger.close()
+    os.replace(tmp_path, pdf_path)
+
+
+def render_sections(template_name: str, stylesheet: str, pdf_path: str, parts: list[dict],
+                    max_workers: int | None = None) -> str:
+    """Render each part to its own PDF (in parallel when possible) and merge them into `pdf_path`."""
+    workers = min(max_workers or SECTION_CFG["MAX_WORKERS"], len(parts))
+    tmp_dir = tempfile.mkdtemp(prefix=".sections-", dir=os.path.dirname(os.path.abspath(pdf_path)))
+    try:
+        paths = [os.path.join(tmp_dir, f"{i:04d}.pdf") for i in range(len(parts))]
+        n = len(parts)
+        # Daemonic processes may not start children; render in-process there (still chunk-bounded).
+        if workers > 1 and not mp.current_process().daemon:
+            with ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn")) as pool:
+                list(pool.map(_render_part, [template_name] * n, [stylesheet] * n, paths, parts))
+        else:
+            for path, part in zip(paths, parts):
+                _render_part(template_name, stylesheet, path, part)
+        _merge(paths, pdf_path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return pdf_path
+
+
+def render_report(template_name: str, stylesheet: str, pdf_path: str, context: dict,
+                  split, rows: int) -> str:
+    """
+    Render `context` into `pdf_path`: in one pass for up to MIN_ROWS rows,
+    otherwise as the parts returned by split(context).
+    """
+    if rows <= SECTION_CFG["MIN_ROWS"]:
+        return get_engine().render_pdf(template_name, stylesheet, pdf_path, **context)
+    parts = split(context)
+    print(f"[Sections] {os.path.basename(pdf_path)}: {rows} rows in {len(parts)} parts")
+    return render_sections(template_name, stylesheet, pdf_path, parts)
@@ -0,0 +1,89 @@
+from math import ceil
+
+from flask import Blueprint, jsonify, request, session
+from app.models.schema import MONEY_COLUMNS
+from app.models.segments import LIST_SEGMENTS, get_segment_index
+from app.caching import PRIVATE_REVALIDATE, data_etag, render_cache
+
+api_bp = Blueprint("api", __name__, url_prefix="/api")
+
+# Columns exposed by /api/loans (anything the drill-down tables display)
+API_COLUMNS = [
+    "Borrower", "Principal Balance", "Group", "Status", "Days Late",
+    "Contract", "Title Ownership", "Guarantor", "Activity Status",
+    "Has Contract", "Has Title", "Has Guarantor", "Risk Level", "Dashboard Risk",
+]
+
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+
+
+def hidden_columns() -> set:
+    """Columns left out for the current user: the money columns unless they may see amounts."""
+    return set() if session.get("show_amounts", False) else set(MONEY_COLUMNS)
+
+
+def _records(page_df):
+    """JSON-safe rows: NaN -> null."""
+    page_df = page_df.astype(object).where(page_df.notna(), None)
+    return page_df.to_dict(orient="records")
+
+
+@api_bp.route("/loans")
+@data_etag(cache_control=PRIVATE_REVALIDATE)
+def loans():
+    """
+    One page of loans.
+    Query: segment (repeatable, AND-ed; default "all"), page (1-based),
+           per_page (<= MAX_PER_PAGE), sort (column), order (asc|desc).
+    Money columns are left out for users without show_amounts, and sorting
+    by one is refused (403).
+    """
+    segments = request.args.getlist("segment") or ["all"]
+    unknown = [s for s in segments if s not in LIST_SEGMENTS]
+    if unknown:
+        return jsonify(error=f"Unknown segment: {unknown[0]}", segments=sorted(LIST_SEGMENTS)), 400
+
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", DEFAULT_PER_PAGE, type=int), 1), MAX_PER_PAGE)
+    order = "desc" if request.args.get("order") == "desc" else "asc"
+    sort = request.args.get("sort")
+    hidden = hidden_columns()
+    if sort in hidden:
+        return jsonify(error=f"Not allowed to sort by {sort}"), 403
+    if sort not in API_COLUMNS:
+        sort = None
+
+    index = get_segment_index()
+    df = index.frame
+    if df.empty:
+        return jsonify(segment=segments, page=1, per_page=per_page, total=0, pages=1,
+                       sort=sort, order=order, columns=[], rows=[])
+
+    columns = [c for c in API_COLUMNS if c in df.columns and c not in hidden]
+    if sort not in df.columns:
+        sort = None
+    positions = index.positions_for(segments, sort=sort, ascending=(order == "asc"))
+
+    total = len(positions)
+    pages = max(ceil(total / per_page), 1)
+    page = min(page, pages)
+    page_positions = positions[(page - 1) * per_page: page * per_page]
+
+    return jsonify(
+        segment=segments,
+        page=page,
+        per_page=per_page,
+        total=total,
+        pages=pages,
+        sort=sort,
+        order=order,
+        columns=columns,
+        rows=_records(df[columns].iloc[page_positions]),
+    )
+
+
+@api_bp.route("/render-cache")
+def render_cache_stats():
+    """Hit/miss/eviction counters and size of this worker's render cache."""
+    return jsonify(render_cache.stats())
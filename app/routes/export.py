@@ -0,0 +1,139 @@
+import csv
+import io
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+from flask import Blueprint, Response, abort, jsonify, make_response, request, send_file, stream_with_context
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+
+from app.models.schema import MONEY_COLUMNS
+from app.models.segments import LIST_SEGMENTS, get_segment_index
+from app.routes.api import API_COLUMNS, hidden_columns
+from app.tables import default_formatters, iter_html_table
+
+export_bp = Blueprint("export", __name__, url_prefix="/export")
+
+# Rows pulled from the frame per generator step / write batch
+EXPORT_CHUNK_ROWS = 2_000
+
+MONEY_FORMAT = '"$"#,##0.00'
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _export_request():
+    """
+    Parse segment/column/sort query args shared by both formats.
+    Returns (frame, positions, filename_stem); aborts with 400 on unknown names
+    and 403 on money columns requested by users without show_amounts.
+    """
+    segments = request.args.getlist("segment") or ["all"]
+    unknown = [s for s in segments if s not in LIST_SEGMENTS]
+    if unknown:
+        abort(make_response(jsonify(error=f"Unknown segment: {unknown[0]}", segments=sorted(LIST_SEGMENTS)), 400))
+
+    hidden = hidden_columns()
+    requested = request.args.getlist("column") or [c for c in API_COLUMNS if c not in hidden]
+    bad = [c for c in requested if c not in API_COLUMNS]
+    if bad:
+        abort(make_response(jsonify(error=f"Unknown column: {bad[0]}", columns=API_COLUMNS), 400))
+    sort = request.args.get("sort")
+    denied = [c for c in [*requested, sort] if c in hidden]
+    if denied:
+        abort(make_response(jsonify(error=f"Not allowed to export {denied[0]}"), 403))
+
+    index = get_segment_index()
+    df = index.frame
+    columns = [c for c in dict.fromkeys(requested) if c in df.columns]
+
+    if sort not in columns:
+        sort = None
+    ascending = request.args.get("order") != "desc"
+    positions = index.positions_for(segments, sort=sort, ascending=ascending)
+
+    stem = f"loans_{'_'.join(segments)}_{datetime.now().strftime('%Y%m%d')}"
+    return df[columns], positions, stem
+
+
+def _chunks(positions):
+    for start in range(0, len(positions), EXPORT_CHUNK_ROWS):
+        yield positions[start:start + EXPORT_CHUNK_ROWS]
+
+
+def _cell(value):
+    """Plain Python value for csv/openpyxl (missing -> None, numpy scalars unwrapped)."""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, "item") else value
+
+
+@export_bp.route("/loans.csv")
+def loans_csv():
+    """
+    Stream a segment as CSV.
+    Query: segment (repeatable, AND-ed), column (repeatable, default all), sort, order.
+    """
+    frame, positions, stem = _export_request()
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(frame.columns)
+        for chunk in _chunks(positions):
+            for row in frame.iloc[chunk].itertuples(index=False, name=None):
+                writer.writerow(["" if (v := _cell(x)) is None else v for x in row])
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+        if buf.tell():
+            yield buf.getvalue()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{stem}.csv"'},
+    )
+
+
+@export_bp.route("/loans.xlsx")
+def loans_xlsx():
+    """
+    Segment as an .xlsx, written row by row with openpyxl's write-only workbook
+    (constant memory) into a temporary file that is then streamed back.
+    """
+    frame, positions, stem = _export_request()
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Loans")
+    ws.append(list(frame.columns))
+    money = [c in MONEY_COLUMNS for c in frame.columns]
+    for chunk in _chunks(positions):
+        for row in frame.iloc[chunk].itertuples(index=False, name=None):
+            cells = []
+            for value, is_money in zip(row, money):
+                value = _cell(value)
+                if is_money and value is not None:
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.number_format = MONEY_FORMAT
+                    value = cell
+                cells.append(value)
+            ws.append(cells)
+
+    out = tempfile.TemporaryFile()
+    wb.save(out)
+    out.seek(0)
+    return send_file(out, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=f"{stem}.xlsx")
+
+
+@export_bp.route("/loans.html")
+def loans_html():
+    """Segment as a printable HTML table, streamed in escaped row chunks."""
+    frame, positions, stem = _export_request()
+    rows = frame.iloc[positions]
+    title = f"Loans: {', '.join(request.args.getlist('segment') or ['all'])}"
+    return Response(
+        stream_with_context(iter_html_table(rows, title, default_formatters(rows))),
+        mimetype="text/html",
+    )
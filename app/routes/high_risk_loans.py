@@ -1,11 +1,11 @@
 from flask import Blueprint, render_template
-from utils import load_latest_loans
+from app.caching import cached_page, data_etag
 
 high_risk_bp = Blueprint("high-risk", __name__, url_prefix="/dashboard/high-risk")
 
 @high_risk_bp.route("/")
+@data_etag
+@cached_page
 def show_high_risk_loans():
-    df = load_latest_loans()
-    # Only include "High Risk"
-    high_df = df[df["Risk Level"] == "High Risk"]
-    return render_template("dashboardsidebar/high_risk_loans.html", loans=high_df.to_dict(orient="records"))
\ No newline at end of file
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/high_risk_loans.html")
\ No newline at end of file
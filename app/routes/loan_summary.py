@@ -1,46 +1,42 @@
 from flask import Blueprint, render_template, session, redirect, url_for
-from utils import load_latest_loans
+from app.models.segments import get_segment_index
+from app.caching import cached_page, data_etag
 
 loan_summary_bp = Blueprint("loan_summary", __name__)
 
 @loan_summary_bp.route("/loan-summary")
+@data_etag
+@cached_page
 def loan_summary():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-
-    def determine_risk(row):
-        if row.get("Days Late", 0) >= 21:
-            return "Critical"
-        elif row.get("Days Late", 0) >= 7:
-            return "Medium"
-        elif not row.get("Has Title", True) or not row.get("Has Contract", True):
-            return "Medium"
-        else:
-            return "Low"
-
-    df["Risk Level"] = df.apply(determine_risk, axis=1)
+    # Card counts come from the same per-version segment index as the drill-down lists
+    index = get_segment_index()
 
     stats = {
-        "total_loans": len(df),
-        "active_borrowers": len(df[df["Activity Status"] == "Active"]),
-        "inactive_borrowers": len(df[df["Activity Status"] == "Inactive"]),
-        "critical_loans": len(df[df["Risk Level"] == "Critical"]),
-        "missing_contract": len(df[df["Has Contract"] == False]),
-        "title_loans": len(df[df["Has Title"] == True]),
-        "with_guarantor": len(df[df["Has Guarantor"] == True]),
-        "no_title_no_guarantor": len(df[(df["Has Title"] == False) & (df["Has Guarantor"] == False)])
+        "total_loans": index.count("all"),
+        "active_borrowers": index.count("active"),
+        "inactive_borrowers": index.count("inactive"),
+        "critical_loans": index.count("critical"),
+        "missing_contract": index.count("missing-contracts"),
+        "title_loans": index.count("with-title"),
+        "with_guarantor": index.count("with-guarantor"),
+        "no_title_no_guarantor": index.count("no-title-guarantor")
     }
 
     total_loans = stats["total_loans"]
-    stats["critical_percentage"] = round(stats["critical_loans"] / total_loans * 100, 1) if total_loans else 0
-    stats["active_percentage"] = round(stats["active_borrowers"] / total_loans * 100, 1) if total_loans else 0
-    stats["inactive_percentage"] = round(stats["inactive_borrowers"] / total_loans * 100, 1) if total_loans else 0
-    stats["missing_contract_percentage"] = round(stats["missing_contract"] / total_loans * 100, 1) if total_loans else 0
-    stats["title_percentage"] = round(stats["title_loans"] / total_loans * 100, 1) if total_loans else 0
-    stats["guarantor_percentage"] = round(stats["with_guarantor"] / total_loans * 100, 1) if total_loans else 0
-    stats["no_title_guarantor_percentage"] = round(stats["no_title_no_guarantor"] / total_loans * 100, 1) if total_loans else 0
+
+    def pct(count):
+        return round(count / total_loans * 100, 1) if total_loans else 0
+
+    stats["critical_percentage"] = pct(stats["critical_loans"])
+    stats["active_percentage"] = pct(stats["active_borrowers"])
+    stats["inactive_percentage"] = pct(stats["inactive_borrowers"])
+    stats["missing_contract_percentage"] = pct(stats["missing_contract"])
+    stats["title_percentage"] = pct(stats["title_loans"])
+    stats["guarantor_percentage"] = pct(stats["with_guarantor"])
+    stats["no_title_guarantor_percentage"] = pct(stats["no_title_no_guarantor"])
 
     links = {
         "total_loans": "/loan-summary/all",
@@ -53,12 +49,10 @@ def loan_summary():
         "no_title_guarantor": "/loan-summary/no-title-guarantor"
     }
 
-    # Top 10 critical loans by principal balance
-    top_critical = df[df["Risk Level"] == "Critical"].nlargest(10, "Principal Balance").to_dict(orient="records")
-    # Top 10 loans missing contracts by principal balance
-    top_missing_contracts = df[df["Has Contract"] == False].nlargest(10, "Principal Balance").to_dict(orient="records")
-    # Top 10 loans with no title and no guarantor by principal balance
-    top_no_title_guarantor = df[(df["Has Title"] == False) & (df["Has Guarantor"] == False)].nlargest(10, "Principal Balance").to_dict(orient="records")
+    # Top 10 lists by principal balance, cached per data version in the segment index
+    top_critical = index.top("critical")
+    top_missing_contracts = index.top("missing-contracts")
+    top_no_title_guarantor = index.top("no-title-guarantor")
 
     return render_template(
         "dashboardsidebar/loan_summary.html",
@@ -72,93 +66,89 @@ def loan_summary():
 
 # Additional routes for loan summary details
 @loan_summary_bp.route("/loan-summary/all")
+@data_etag
+@cached_page
 def all_loans():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    loans = df.to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/all_loans.html", loans=loans)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/all_loans.html")
 
 @loan_summary_bp.route("/loan-summary/active")
+@data_etag
+@cached_page
 def active_borrowers():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[df["Activity Status"] == "Active"].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/active_borrowers.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/active_borrowers.html")
 
 
 @loan_summary_bp.route("/loan-summary/missing-contracts")
+@data_etag
+@cached_page
 def missing_contracts():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[df["Has Contract"] == False].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/missing_contracts.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/missing_contracts.html")
 
 
 @loan_summary_bp.route("/loan-summary/critical-loans")
+@data_etag
+@cached_page
 def critical_loans():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-
-    def determine_risk(row):
-        if row.get("Days Late", 0) >= 21:
-            return "Critical"
-        elif row.get("Days Late", 0) >= 7:
-            return "Medium"
-        elif not row.get("Has Title", True) or not row.get("Has Contract", True):
-            return "Medium"
-        else:
-            return "Low"
-
-    df["Risk Level"] = df.apply(determine_risk, axis=1)
-    filtered = df[df["Risk Level"] == "Critical"].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/critical_loans.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/critical_loans.html")
 
 
 @loan_summary_bp.route("/loan-summary/no-title-guarantor")
+@data_etag
+@cached_page
 def no_title_guarantor():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[(df["Has Title"] == False) & (df["Has Guarantor"] == False)].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/no_title_guarantor.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/no_title_guarantor.html")
 
 
 # Route for loans with guarantor
 @loan_summary_bp.route("/loan-summary/with-guarantor")
+@data_etag
+@cached_page
 def with_guarantor():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[df["Has Guarantor"] == True].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/with_guarantor.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/with_guarantor.html")
 
 
 # Route for loans with title
 @loan_summary_bp.route("/loan-summary/with-title")
+@data_etag
+@cached_page
 def with_title():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[df["Has Title"] == True].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/with_title.html", loans=filtered)
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/with_title.html")
 
 # Route for inactive borrowers
 @loan_summary_bp.route("/loan-summary/inactive-borrowers")
+@data_etag
+@cached_page
 def inactive_borrowers():
     if not session.get("logged_in"):
         return redirect(url_for("login.login"))
 
-    df = load_latest_loans()
-    filtered = df[df["Activity Status"] == "Inactive"].to_dict(orient="records")
-    return render_template("dashboardsidebar/loansummary/inactive_borrowers.html", loans=filtered)
\ No newline at end of file
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/loansummary/inactive_borrowers.html")
\ No newline at end of file
@@ -8,20 +8,56 @@ login_bp = Blueprint("login", __name__)
 # Simple in-process cache (disable by setting LOGIN_USERS_CACHE_TTL=0)
 _secret_cache = None
 
+def _parse_users(payload):
+    """
+    Users dict from either secret shape:
+      {"users":[{"username":"full_access","password":"...","show_amounts":true}, ...]}
+    or:
+      {"full_access":{"password":"...","show_amounts":true}, "team_member":{...}}
+    """
+    users = {}
+    # Shape 1: {"users":[{username,..}, ...]}
+    if isinstance(payload, dict) and "users" in payload and isinstance(payload["users"], list):
+        for u in payload["users"]:
+            name = (u.get("username") or "").strip()
+            if name:
+                users[name] = {
+                    "password": str(u.get("password", "")),
+                    "show_amounts": bool(u.get("show_amounts", False)),
+                }
+    # Shape 2: {"full_access":{...}, "team_member":{...}}
+    elif isinstance(payload, dict):
+        for name, u in payload.items():
+            if isinstance(u, dict):
+                users[str(name)] = {
+                    "password": str(u.get("password", "")),
+                    "show_amounts": bool(u.get("show_amounts", False)),
+                }
+    return users
+
 def _load_users_from_secret():
     """
     Load users from AWS Secrets Manager.
     - Secret name from env LOGIN_USERS_SECRET (default: 'samxtrack/app-users')
     - Region from env AWS_REGION or current boto3 session region (fallback 'us-east-2')
-    Supports both:
-      {"users":[{"username":"full_access","password":"...","show_amounts":true}, ...]}
-    and:
-      {"full_access":{"password":"...","show_amounts":true}, "team_member":{...}}
+    - Local stand-in: if env LOGIN_USERS_FILE names a JSON file, users are read
+      from it instead (same shapes as the secret; used by benchmarks/loadtest.py
+      and local runs without AWS)
+    See _parse_users() for the accepted shapes.
     """
     global _secret_cache
     if _secret_cache is not None:
         return _secret_cache
 
+    users_file = os.getenv("LOGIN_USERS_FILE")
+    if users_file:
+        try:
+            with open(users_file, "r", encoding="utf-8") as f:
+                _secret_cache = _parse_users(json.load(f))
+        except (OSError, ValueError):
+            _secret_cache = {}
+        return _secret_cache
+
     secret_name = os.getenv("LOGIN_USERS_SECRET", "samxtrack/app-users")
     region_name = os.getenv("AWS_REGION") or boto3.session.Session().region_name or "us-east-2"
 
@@ -35,26 +71,7 @@ def _load_users_from_secret():
         else:
             raw = base64.b64decode(resp["SecretBinary"]).decode("utf-8")
 
-        payload = json.loads(raw)
-
-        users = {}
-        # Shape 1: {"users":[{username,..}, ...]}
-        if isinstance(payload, dict) and "users" in payload and isinstance(payload["users"], list):
-            for u in payload["users"]:
-                name = (u.get("username") or "").strip()
-                if name:
-                    users[name] = {
-                        "password": str(u.get("password", "")),
-                        "show_amounts": bool(u.get("show_amounts", False)),
-                    }
-        # Shape 2: {"full_access":{...}, "team_member":{...}}
-        elif isinstance(payload, dict):
-            for name, u in payload.items():
-                if isinstance(u, dict):
-                    users[str(name)] = {
-                        "password": str(u.get("password", "")),
-                        "show_amounts": bool(u.get("show_amounts", False)),
-                    }
+        users = _parse_users(json.loads(raw))
 
         _secret_cache = users
         return users
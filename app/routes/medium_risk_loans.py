@@ -1,11 +1,11 @@
 from flask import Blueprint, render_template
-from utils import load_latest_loans
+from app.caching import cached_page, data_etag
 
 medium_risk_bp = Blueprint("medium_risk", __name__, url_prefix="/dashboard/medium-risk")
 
 @medium_risk_bp.route("/")
+@data_etag
+@cached_page
 def show_medium_risk_loans():
-    df = load_latest_loans()
-    # Only include "At Risk" (exclude "High Risk")
-    medium_df = df[df["Risk Level"] == "At Risk"]
-    return render_template("dashboardsidebar/medium_risk_loans.html", loans=medium_df.to_dict(orient="records"))
\ No newline at end of file
+    # Rows are fetched a page at a time from /api/loans
+    return render_template("dashboardsidebar/medium_risk_loans.html")
\ No newline at end of file
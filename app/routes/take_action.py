@@ -1,78 +1,111 @@
-from flask import Blueprint, render_template, request, redirect
-import os, json
+from flask import Blueprint, flash, jsonify, render_template, request, redirect
 from datetime import datetime, timedelta
-import pandas as pd
+from math import ceil
 from utils import load_latest_loans
+from app.models import action_ledger as ledger
+from app.models.action_history import get_action_index, loan_ids
 
 take_action_bp = Blueprint("take_action", __name__, url_prefix="/dashboard/actions")
 
-@take_action_bp.route("/", methods=["GET", "POST"])
-def show_take_action():
+HISTORY_PER_PAGE = 50
+
+def _current_week_tag():
     today = datetime.today()
     friday = today + timedelta(days=(4 - today.weekday()) % 7)
-    week_tag = friday.strftime("%Y-%m-%d")
-
-    # Ensure folder exists and define JSON file path
-    os.makedirs("data/weekly_actions", exist_ok=True)
-    json_path = os.path.join("data", "weekly_actions", f"{week_tag}.json")
-
-    # Load past incomplete actions (from all previous weeks)
-    past_entries = []
-    if os.path.exists("data/weekly_actions"):
-        for fname in os.listdir("data/weekly_actions"):
-            fpath = os.path.join("data/weekly_actions", fname)
-            with open(fpath, "r") as f:
-                for entry in json.load(f):
-                    if not entry.get("contacted") or not entry.get("note"):
-                        past_entries.append(entry)
-
-    # Handle form submission
+    return friday.strftime("%Y-%m-%d")
+
+
+def _version(value):
+    """Record version sent back by the page (see action_ledger.upsert_actions); None if missing."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _action_record(loans_by_key, loan_key, contacted, note, version=None):
+    """Ledger entry for one loan of the current file, or None if the loan is unknown."""
+    if loan_key not in loans_by_key.index:
+        return None
+    loan = loans_by_key.loc[loan_key]
+    return {
+        "loan_key": loan_key,
+        "borrower": str(loan["Borrower"]),
+        "loan_name": str(loan["Loan Name"]),
+        "balance": float(loan["Principal Balance"]),
+        "category": str(loan["Risk Level"]),
+        "contacted": bool(contacted),
+        "note": str(note or "").strip(),
+        "version": _version(version),
+    }
+
+
+def _conflict_message(conflicts):
+    names = ", ".join(sorted({c["borrower"] for c in conflicts}))
+    return f"Not saved, changed by someone else since the page loaded: {names}. Review and save again."
+
+
+def _loans_by_key():
+    df = load_latest_loans()
+    df["Loan Key"] = loan_ids(df)
+    return df.drop_duplicates("Loan Key").set_index("Loan Key")
+
+
+@take_action_bp.route("/", methods=["GET", "POST"])
+def show_take_action():
+    week_tag = _current_week_tag()
+
+    # Load current loans; form keys are the stable loan id (Borrower|Loan Name)
+    df = load_latest_loans()
+    df["Loan Key"] = loan_ids(df)
+
+    # Plain form submission (no JS): upsert the rows whose inputs differ from the
+    # orig_* values they were rendered with, in one transaction
     if request.method == "POST":
         form_data = request.form.to_dict()
-        submitted = []
+        loans_by_key = df.drop_duplicates("Loan Key").set_index("Loan Key")
+        updates = []
         for key in form_data:
-            if key.startswith("check_"):
-                loan_key = key.replace("check_", "")
-                note = form_data.get(f"note_{loan_key}", "").strip()
-                submitted.append({
-                    "week": week_tag,
-                    "loan_key": loan_key,
-                    "borrower": loan_key.split("|")[0],
-                    "balance": float(loan_key.split("|")[1]),
-                    "contacted": True,
-                    "note": note
-                })
-        with open(json_path, "w") as f:
-            json.dump(submitted, f, indent=2)
+            if key.startswith("note_"):
+                loan_key = key.replace("note_", "", 1)
+                contacted = f"check_{loan_key}" in form_data
+                note = form_data[key].strip()
+                if (contacted == (form_data.get(f"orig_check_{loan_key}") == "1")
+                        and note == form_data.get(f"orig_note_{loan_key}", "").strip()):
+                    continue  # untouched row
+                record = _action_record(loans_by_key, loan_key, contacted, note,
+                                        form_data.get(f"version_{loan_key}"))
+                if record is not None:
+                    updates.append(record)
+        with ledger.connect() as conn:
+            _, conflicts = ledger.upsert_actions(conn, week_tag, updates)
+        if conflicts:
+            flash(_conflict_message(conflicts), "warning")
         return redirect("/dashboard/actions")
 
-    # Load current loans and filter
-    df = load_latest_loans()
-    df["Loan Key"] = df["Borrower"].astype(str) + "|" + df["Principal Balance"].astype(str)
+    # Latest history entry per loan, indexed once per history version: this
+    # week's saved entry, else an older one that still needs follow-up
+    history = get_action_index()
 
     def row_entry(row, category):
         key = row["Loan Key"]
-        match = next((x for x in past_entries if x.get("loan_key") == key), {})
+        match, version = history.for_week(key, row["Borrower"], week_tag)
         return {
             "loan_key": key,
             "borrower": row["Borrower"],
             "balance": row["Principal Balance"],
             "category": category,
             "note": match.get("note", ""),
-            "contacted": match.get("contacted", False)
+            "contacted": match.get("contacted", False),
+            "version": version,
         }
 
-    # High Risk: >21 days late
-    high_risk = df[(df["Risk Level"] == "High Risk") & (df["Days Late"] > 21)]
+    # High Risk: >21 days late (collections rule set, see app/models/risk.py)
+    high_risk = df[df["Risk Level"] == "High Risk"]
     high_risk_entries = [row_entry(row, "High Risk") for _, row in high_risk.iterrows()]
 
     # Critical: >21 days late, no title, no guarantor
-    critical = df[
-        (df["Risk Level"] == "Critical") &
-        (df["Days Late"] > 21) &
-        (df["Has Guarantor"] == False) &
-        (df["Has Title"] == False)
-    ]
+    critical = df[df["Risk Level"] == "Critical"]
     critical_entries = [row_entry(row, "Critical") for _, row in critical.iterrows()]
 
     return render_template(
@@ -81,14 +114,115 @@ def show_take_action():
         critical_loans=critical_entries,
         week=week_tag
     )
+@take_action_bp.route("/save", methods=["POST"])
+def save_action():
+    """
+    Upsert one loan's action for this week.
+    JSON body: {"loan_key": "...", "contacted": bool, "note": "...", "version": int}
+    409 with the stored entry when someone else saved the loan since `version`.
+    """
+    payload = request.get_json(silent=True) or {}
+    loan_key = payload.get("loan_key")
+    if not isinstance(loan_key, str) or not loan_key:
+        return jsonify(ok=False, error="loan_key is required"), 400
+
+    record = _action_record(_loans_by_key(), loan_key, payload.get("contacted"), payload.get("note"),
+                            payload.get("version"))
+    if record is None:
+        return jsonify(ok=False, error=f"Unknown loan: {loan_key}"), 404
+
+    week_tag = _current_week_tag()
+    with ledger.connect() as conn:
+        saved, conflicts = ledger.upsert_actions(conn, week_tag, [record])
+    if conflicts:
+        return jsonify(ok=False, error=_conflict_message(conflicts), week=week_tag, conflict=conflicts[0]), 409
+    return jsonify(ok=True, week=week_tag, entry=saved[0] if saved else None)
+
+
+@take_action_bp.route("/save-batch", methods=["POST"])
+def save_actions_batch():
+    """
+    Upsert many loans' actions for this week in one transaction.
+    JSON body: {"updates": [{"loan_key": ..., "contacted": ..., "note": ..., "version": ...}, ...]}
+    Unknown loan keys are skipped and reported back. Rows someone else saved
+    since their `version` are not written; the response is then a 409 that
+    still lists what was saved, plus the stored entries under "conflicts".
+    """
+    payload = request.get_json(silent=True) or {}
+    updates = payload.get("updates")
+    if not isinstance(updates, list):
+        return jsonify(ok=False, error="updates must be a list"), 400
+
+    loans_by_key = _loans_by_key()
+    records, unknown = [], []
+    for item in updates:
+        loan_key = item.get("loan_key") if isinstance(item, dict) else None
+        record = _action_record(loans_by_key, loan_key, item.get("contacted"), item.get("note"),
+                                item.get("version")) if loan_key else None
+        if record is None:
+            unknown.append(loan_key)
+        else:
+            records.append(record)
+
+    week_tag = _current_week_tag()
+    with ledger.connect() as conn:
+        saved, conflicts = ledger.upsert_actions(conn, week_tag, records)
+    body = dict(week=week_tag, saved=len(saved), entries=saved, unknown=unknown, conflicts=conflicts)
+    if conflicts:
+        return jsonify(ok=False, error=_conflict_message(conflicts), **body), 409
+    return jsonify(ok=True, **body)
+
+
 @take_action_bp.route("/history")
 def take_action_history():
-    history = []
-    base_path = "data/weekly_actions"
-    if os.path.exists(base_path):
-        for fname in sorted(os.listdir(base_path)):
-            with open(os.path.join(base_path, fname), "r") as f:
-                entries = json.load(f)
-                history.extend(entries)
-
-    return render_template("dashboardsidebar/takeaction/take_action_history.html", history=history)
\ No newline at end of file
+    """
+    Contact history, newest week first, one page at a time.
+    Query: page, per_page, start / end (week, YYYY-MM-DD), borrower (substring),
+           uncontacted=1, ceo=1.
+    """
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", HISTORY_PER_PAGE, type=int), 1), 500)
+    filters = {
+        "start": _week_arg("start"),
+        "end": _week_arg("end"),
+        "borrower": request.args.get("borrower", "").strip(),
+        "uncontacted": request.args.get("uncontacted") == "1",
+        "ceo": request.args.get("ceo") == "1",
+    }
+
+    with ledger.connect() as conn:
+        history, total = ledger.query_history(
+            conn,
+            start=filters["start"],
+            end=filters["end"],
+            borrower=filters["borrower"] or None,
+            uncontacted=filters["uncontacted"],
+            ceo_only=filters["ceo"],
+            limit=per_page,
+            offset=(page - 1) * per_page,
+        )
+
+    pages = max(ceil(total / per_page), 1)
+    # Active filters as query args, carried over by the pager links
+    filter_args = {k: ("1" if v is True else v) for k, v in filters.items() if v}
+    if per_page != HISTORY_PER_PAGE:
+        filter_args["per_page"] = per_page
+    return render_template(
+        "dashboardsidebar/takeaction/take_action_history.html",
+        history=history,
+        filters=filters,
+        filter_args=filter_args,
+        page=page,
+        pages=pages,
+        per_page=per_page,
+        total=total,
+    )
+
+
+def _week_arg(name):
+    """YYYY-MM-DD query arg, or None when missing or malformed."""
+    value = request.args.get(name, "").strip()
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        return None
@@ -8,9 +8,10 @@ from pathlib import Path
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 
-import json
 import pandas as pd
 from utils import load_latest_loans
+from app.models import action_ledger as ledger
+from app.models.action_history import loan_id
 
 try:
     from zoneinfo import ZoneInfo  # py39+
@@ -21,11 +22,8 @@ except ImportError:  # pragma: no cover
 # Bryt downloader: must expose `download_latest(headless: bool = True) -> Path | None`
 from bryt_downloader import download_latest
 
-# Report generators (already added earlier)
-from app.reports.generate_report import (
-    generate_take_action_report,
-    generate_ceo_must_contact_report,
-)
+# Report generators run in isolated child processes (see app/reports/runner.py)
+from app.reports.runner import job, run_reports
 
 # -----------------------------
 # Logging
@@ -58,62 +56,55 @@ def _current_friday_tag(now: datetime | None = None) -> str:
     friday = now + timedelta(days=delta)
     return friday.strftime("%Y-%m-%d")
 
-def _weekly_actions_dir() -> Path:
-    return Path(__file__).resolve().parents[2] / "data" / "weekly_actions"
-
-def ensure_weekly_json_from_latest() -> Path | None:
+def ensure_weekly_actions_from_latest() -> str | None:
     """
-    If the weekly_actions JSON for this week is missing, create it from latest_loans.xlsx.
+    If the action ledger has no rows for this week, seed it from latest_loans.xlsx.
     We pre-populate entries with contacted=False and empty notes, keeping the order:
     High Risk first, then Critical (so existing report splitter works by halving the list).
+    Returns the week tag when the week is present afterwards, else None.
     """
     try:
         week_tag = _current_friday_tag()
-        out_dir = _weekly_actions_dir()
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / f"{week_tag}.json"
-
-        if out_path.exists():
-            log.info("Weekly JSON already exists; leaving as-is: %s", out_path)
-            return out_path
-
-        # Load latest loans
-        df = load_latest_loans()
-        if df.empty:
-            log.warning("Cannot build weekly JSON: latest_loans.xlsx is empty.")
-            return None
-
-        # Normalize booleans if needed
-        df["Has Title"] = df.get("Has Title", pd.Series([False]*len(df))).astype(bool)
-        df["Has Guarantor"] = df.get("Has Guarantor", pd.Series([False]*len(df))).astype(bool)
-        df["Days Late"] = pd.to_numeric(df.get("Days Late", 0), errors="coerce").fillna(0).astype(int)
-
-        # Classification consistent with dashboard/utils:
-        is_critical = (df["Days Late"] > 21) & (~df["Has Title"]) & (~df["Has Guarantor"])
-        is_high_risk = (df["Days Late"] > 21) & ~is_critical
-
-        high_df = df[is_high_risk].copy()
-        crit_df = df[is_critical].copy()
-
-        def to_entries(frame: pd.DataFrame) -> list[dict]:
-            rows = []
-            for _, r in frame.iterrows():
-                rows.append({
-                    "borrower": str(r.get("Borrower", "")).strip(),
-                    "balance": float(r.get("Principal Balance", 0) or 0.0),
-                    "days_late": int(r.get("Days Late", 0) or 0),
-                    "contacted": False,
-                    "note": ""
-                })
-            return rows
-
-        entries = to_entries(high_df) + to_entries(crit_df)
-        with out_path.open("w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=2)
-        log.info("Weekly JSON created: %s (entries=%d)", out_path, len(entries))
-        return out_path
+
+        with ledger.connect() as conn:
+            if conn.execute("SELECT 1 FROM actions WHERE week = ? LIMIT 1", (week_tag,)).fetchone():
+                log.info("Weekly actions already exist; leaving as-is: %s", week_tag)
+                return week_tag
+
+            # Load latest loans
+            df = load_latest_loans()
+            if df.empty:
+                log.warning("Cannot build weekly actions: latest_loans.xlsx is empty.")
+                return None
+
+            # Classification from the shared risk engine (collections rule set)
+            is_critical = df["Risk Level"] == "Critical"
+            is_high_risk = df["Risk Level"] == "High Risk"
+
+            high_df = df[is_high_risk].copy()
+            crit_df = df[is_critical].copy()
+
+            def to_entries(frame: pd.DataFrame, category: str) -> list[dict]:
+                rows = []
+                for _, r in frame.iterrows():
+                    rows.append({
+                        "loan_key": loan_id(r.get("Borrower", ""), r.get("Loan Name", "")),
+                        "borrower": str(r.get("Borrower", "")).strip(),
+                        "loan_name": str(r.get("Loan Name", "")).strip(),
+                        "balance": float(r.get("Principal Balance", 0) or 0.0),
+                        "days_late": int(r.get("Days Late", 0) or 0),
+                        "category": category,
+                        "contacted": False,
+                        "note": ""
+                    })
+                return rows
+
+            entries = to_entries(high_df, "High Risk") + to_entries(crit_df, "Critical")
+            if ledger.add_week_if_missing(conn, week_tag, entries):
+                log.info("Weekly actions created: %s (entries=%d)", week_tag, len(entries))
+        return week_tag
     except Exception as e:
-        log.exception("Failed to create weekly JSON: %s", e)
+        log.exception("Failed to create weekly actions: %s", e)
         return None
 
 
@@ -136,28 +127,29 @@ def daily_download_job():
 def friday_reports_job():
     """
     Run Fridays shortly after the daily pull.
-    - Generate Take Action report (if weekly JSON exists)
+    - Generate Take Action report (if the week has ledger entries)
     - Generate CEO Must-Contact report (safe; skips if no matches)
     """
     log.info("Friday reports job started")
     try:
-        built = ensure_weekly_json_from_latest()
+        built = ensure_weekly_actions_from_latest()
         if built:
-            log.info("Weekly JSON ensured: %s", built)
+            log.info("Weekly actions ensured: %s", built)
     except Exception as e:
-        log.exception("Weekly JSON ensure step failed: %s", e)
+        log.exception("Weekly actions ensure step failed: %s", e)
     try:
-        take = generate_take_action_report()
-        if take:
-            log.info("TakeAction report generated: %s", take)
-        else:
-            log.info("TakeAction not generated (likely no weekly JSON).")
-
-        ceo = generate_ceo_must_contact_report(send_notifications=False)
-        if ceo:
-            log.info("CEO report generated: %s", ceo)
-        else:
-            log.info("CEO report skipped or no matches.")
+        # Independent reports render in parallel, each with its own timeout and memory cap
+        results = run_reports([
+            job("take_action"),
+            job("ceo_must_contact", send_notifications=False),
+        ])
+        for result in results:
+            if result.ok:
+                log.info("%s report generated: %s (%.1fs)", result.name, result.path, result.seconds)
+            elif result.status == "skipped":
+                log.info("%s report skipped (no weekly actions or no matches).", result.name)
+            else:
+                log.error("%s report %s: %s", result.name, result.status, result.error)
     except Exception as e:
         log.exception("Friday reports failed: %s", e)
 
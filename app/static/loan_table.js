@@ -0,0 +1,103 @@
+// Paginated, sortable loan tables backed by /api/loans.
+// Markup comes from templates/dashboardsidebar/loansummary/_loan_table.html.
+(function () {
+  function formatCell(value, kind, badge) {
+    if (kind === "bool") {
+      return document.createTextNode(value ? "Yes" : "No");
+    }
+    if (kind === "money") {
+      const span = document.createElement("span");
+      span.className = "badge " + badge;
+      span.textContent = value === null || value === undefined
+        ? "—"
+        : "$" + Number(value).toLocaleString("en-US", { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+      return span;
+    }
+    return document.createTextNode(value === null || value === undefined ? "" : String(value));
+  }
+
+  function initTable(root) {
+    const columns = JSON.parse(root.dataset.columns);
+    const tbody = root.querySelector("tbody");
+    const info = root.querySelector(".loan-table-info");
+    const prev = root.querySelector("[data-page='prev']");
+    const next = root.querySelector("[data-page='next']");
+    const state = { page: 1, pages: 1, sort: null, order: "asc" };
+
+    function message(text) {
+      tbody.replaceChildren();
+      const tr = document.createElement("tr");
+      const td = document.createElement("td");
+      td.colSpan = columns.length;
+      td.className = "text-muted fst-italic";
+      td.textContent = text;
+      tr.appendChild(td);
+      tbody.appendChild(tr);
+    }
+
+    function load() {
+      const params = new URLSearchParams({ segment: root.dataset.segment, page: state.page, per_page: root.dataset.perPage });
+      if (state.sort) {
+        params.set("sort", state.sort);
+        params.set("order", state.order);
+      }
+      fetch(root.dataset.endpoint + "?" + params.toString(), { credentials: "same-origin" })
+        .then(function (resp) {
+          if (resp.redirected || !(resp.headers.get("Content-Type") || "").includes("json")) {
+            // Expired session: the API redirected to the login page
+            window.location.reload();
+            return null;
+          }
+          if (!resp.ok) {
+            throw new Error("HTTP " + resp.status);
+          }
+          return resp.json();
+        })
+        .then(function (data) {
+          if (!data) {
+            return;
+          }
+          state.page = data.page;
+          state.pages = data.pages;
+          tbody.replaceChildren();
+          if (!data.rows.length) {
+            message("No data available.");
+          }
+          data.rows.forEach(function (row) {
+            const tr = document.createElement("tr");
+            columns.forEach(function (col) {
+              const td = document.createElement("td");
+              td.appendChild(formatCell(row[col[0]], col[2], root.dataset.badge));
+              tr.appendChild(td);
+            });
+            tbody.appendChild(tr);
+          });
+          info.textContent = data.total + " loans · page " + data.page + " of " + data.pages;
+          prev.disabled = data.page <= 1;
+          next.disabled = data.page >= data.pages;
+        })
+        .catch(function () {
+          message("Could not load loans. Please try again.");
+        });
+    }
+
+    prev.addEventListener("click", function () { state.page -= 1; load(); });
+    next.addEventListener("click", function () { state.page += 1; load(); });
+    root.querySelectorAll("th[data-sort]").forEach(function (th) {
+      th.style.cursor = "pointer";
+      th.addEventListener("click", function () {
+        const key = th.dataset.sort;
+        state.order = state.sort === key && state.order === "asc" ? "desc" : "asc";
+        state.sort = key;
+        state.page = 1;
+        load();
+      });
+    });
+
+    load();
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    document.querySelectorAll(".loan-table[data-endpoint]").forEach(initTable);
+  });
+})();
@@ -0,0 +1,161 @@
+// Take Action form: saves each row as it changes (POST /dashboard/actions/save)
+// and, on submit, every row edited since it was last saved in one request
+// (POST /dashboard/actions/save-batch). Untouched rows are never sent, and each
+// update carries the record version the row was rendered or last saved with,
+// so a colleague's newer save comes back as a 409 conflict instead of being
+// overwritten. Without JS the form still posts normally.
+(function () {
+  function inputs(tr) {
+    return {
+      check: tr.querySelector("input[type='checkbox']"),
+      note: tr.querySelector("input[type='text']"),
+    };
+  }
+
+  function current(tr) {
+    const el = inputs(tr);
+    return { contacted: el.check.checked, note: el.note.value.trim() };
+  }
+
+  function rowUpdate(tr) {
+    const state = current(tr);
+    return {
+      loan_key: tr.dataset.loanKey,
+      contacted: state.contacted,
+      note: state.note,
+      version: Number(tr.dataset.version || 0),
+    };
+  }
+
+  function postJSON(url, body) {
+    return fetch(url, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+    }).then(function (resp) {
+      if (resp.redirected || !(resp.headers.get("Content-Type") || "").includes("json")) {
+        // Expired session: the endpoint redirected to the login page
+        window.location.reload();
+        return null;
+      }
+      return resp.json().then(function (data) {
+        if (resp.status === 409) {
+          return data; // conflicts are handled per row by the caller
+        }
+        if (!resp.ok || !data.ok) {
+          throw new Error(data.error || "HTTP " + resp.status);
+        }
+        return data;
+      });
+    });
+  }
+
+  document.addEventListener("DOMContentLoaded", function () {
+    const form = document.getElementById("take-action-form");
+    if (!form) {
+      return;
+    }
+    const status = document.getElementById("take-action-status");
+    const rows = {};
+    const saved = {}; // loan_key -> state as last rendered / saved
+
+    form.querySelectorAll("tr[data-loan-key]").forEach(function (tr) {
+      rows[tr.dataset.loanKey] = tr;
+      saved[tr.dataset.loanKey] = current(tr);
+    });
+
+    function show(text) {
+      status.textContent = text;
+    }
+
+    function isDirty(tr) {
+      const now = current(tr);
+      const was = saved[tr.dataset.loanKey];
+      return now.contacted !== was.contacted || now.note !== was.note;
+    }
+
+    function markSaved(entry) {
+      const tr = rows[entry.loan_key];
+      if (!tr) {
+        return;
+      }
+      tr.dataset.version = entry.version;
+      saved[entry.loan_key] = { contacted: entry.contacted, note: entry.note };
+      tr.classList.remove("table-warning");
+      tr.removeAttribute("title");
+    }
+
+    function markConflict(entry) {
+      // Keep what this user typed, but save against the colleague's version
+      // only once they have seen it and saved again.
+      const tr = rows[entry.loan_key];
+      if (!tr) {
+        return;
+      }
+      tr.dataset.version = entry.version;
+      saved[entry.loan_key] = { contacted: entry.contacted, note: entry.note };
+      tr.classList.add("table-warning");
+      tr.title = "Saved by someone else: " + (entry.contacted ? "contacted" : "not contacted") +
+        (entry.note ? ", “" + entry.note + "”" : "");
+    }
+
+    function conflictText(conflicts) {
+      return conflicts.length + " row(s) changed by someone else (highlighted); review and save again";
+    }
+
+    Object.keys(rows).forEach(function (key) {
+      const tr = rows[key];
+      tr.querySelectorAll("input:not([type='hidden'])").forEach(function (input) {
+        input.addEventListener("change", function () {
+          if (!isDirty(tr)) {
+            return;
+          }
+          show("Saving…");
+          postJSON(form.dataset.saveUrl, rowUpdate(tr))
+            .then(function (data) {
+              if (!data) {
+                return;
+              }
+              if (data.conflict) {
+                markConflict(data.conflict);
+                show(conflictText([data.conflict]));
+                return;
+              }
+              if (data.entry) {
+                markSaved(data.entry);
+              }
+              show("Saved " + new Date().toLocaleTimeString());
+            })
+            .catch(function (err) {
+              show("Save failed: " + err.message);
+            });
+        });
+      });
+    });
+
+    form.addEventListener("submit", function (event) {
+      event.preventDefault();
+      const dirty = Object.keys(rows).map(function (key) { return rows[key]; }).filter(isDirty);
+      if (!dirty.length) {
+        show("No changes to save");
+        return;
+      }
+      show("Saving " + dirty.length + " rows…");
+      postJSON(form.dataset.batchUrl, { updates: dirty.map(rowUpdate) })
+        .then(function (data) {
+          if (!data) {
+            return;
+          }
+          data.entries.forEach(markSaved);
+          data.conflicts.forEach(markConflict);
+          show(data.conflicts.length
+            ? "Saved " + data.saved + " rows; " + conflictText(data.conflicts)
+            : "Saved " + data.saved + " rows " + new Date().toLocaleTimeString());
+        })
+        .catch(function (err) {
+          show("Save failed: " + err.message);
+        });
+    });
+  });
+})();
@@ -0,0 +1,117 @@
+"""
+app/tables.py
+
+Streaming HTML tables for loan frames.
+
+iter_html_table() yields the markup in pieces (opening block, one string per
+chunk of rows, closing block) so a view can hand it to stream_with_context and
+start sending before the last row is formatted. Each column is formatted and
+HTML-escaped once per chunk with vectorized string operations instead of once
+per cell, and rows are assembled column-wise.
+
+Formatter hooks map a column name to a callable Series -> Series[str] that
+returns plain text (escaping happens afterwards). currency_formatter and
+bool_formatter cover the money and Has * columns; default_formatters() picks
+them from the frame's dtypes and the known money columns.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+import pandas as pd
+from markupsafe import escape
+
+from app.models.schema import MONEY_COLUMNS
+
+Formatter = Callable[[pd.Series], pd.Series]
+
+# Rows formatted and yielded per chunk
+TABLE_CHUNK_ROWS = 500
+
+_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&#34;"), ("'", "&#39;"))
+
+
+def text_formatter(s: pd.Series) -> pd.Series:
+    """str() of each value; missing values become empty cells."""
+    return s.astype(object).where(s.notna(), "").astype(str)
+
+
+def currency_formatter(s: pd.Series) -> pd.Series:
+    """$1,234.56; missing or non-numeric values become empty cells."""
+    num = pd.to_numeric(s, errors="coerce")
+    return num.map("${:,.2f}".format, na_action="ignore").fillna("").astype(str)
+
+
+def bool_formatter(s: pd.Series) -> pd.Series:
+    """Yes / No; missing values become empty cells."""
+    return s.map({True: "Yes", False: "No"}).fillna("").astype(str)
+
+
+def default_formatters(df: pd.DataFrame) -> dict[str, Formatter]:
+    """Currency for the known money columns, Yes/No for bool columns."""
+    hooks = {}
+    for col in df.columns:
+        if col in MONEY_COLUMNS:
+            hooks[col] = currency_formatter
+        elif pd.api.types.is_bool_dtype(df[col]):
+            hooks[col] = bool_formatter
+    return hooks
+
+
+def _escape_series(s: pd.Series) -> pd.Series:
+    for raw, entity in _ESCAPES:
+        s = s.str.replace(raw, entity, regex=False)
+    return s
+
+
+def _rows_html(chunk: pd.DataFrame, formatters: dict[str, Formatter]) -> str:
+    row_html = pd.Series("<tr>", index=chunk.index, dtype=object)
+    for col in chunk.columns:
+        text = formatters.get(col, text_formatter)(chunk[col])
+        row_html = row_html + "<td>" + _escape_series(text.astype(object)) + "</td>"
+    return "".join((row_html + "</tr>").tolist())
+
+
+def iter_html_table(
+    df: pd.DataFrame,
+    title: str = "Loan Details",
+    formatters: dict[str, Formatter] | None = None,
+    chunk_rows: int = TABLE_CHUNK_ROWS,
+) -> Iterator[str]:
+    """Yield the escaped HTML table for `df` in row chunks (see module docstring)."""
+    formatters = formatters or {}
+    heading = f"""
+    <div style='margin-top:20px'>
+        <h3 style='font-weight:bold;'>{escape(title)}</h3>
+        <a href='/loan-summary' style='display:inline-block;margin-bottom:10px;'>&larr; Back to Summary</a>"""
+
+    if df.empty:
+        yield heading + """
+            <div style='background:white;padding:15px;border-radius:5px;'>
+                <em>No data available.</em>
+            </div>
+        </div>
+        """
+        return
+
+    header_cells = "".join(f"<th>{escape(col)}</th>" for col in df.columns)
+    yield heading + f"""
+        <div style='overflow-x:auto;'>
+            <table border='1' cellpadding='6' cellspacing='0' style='border-collapse:collapse;width:100%;background:white;'>
+                <thead style='background:#f2f2f2;'>
+                    <tr>
+                        {header_cells}
+                    </tr>
+                </thead>
+                <tbody>
+"""
+    for start in range(0, len(df), chunk_rows):
+        yield _rows_html(df.iloc[start:start + chunk_rows], formatters)
+
+    yield """
+                </tbody>
+            </table>
+        </div>
+    </div>
+    """
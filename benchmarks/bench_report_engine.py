@@ -0,0 +1,135 @@
+"""
+benchmarks/bench_report_engine.py
+
+Per-PDF render time of the weekly reports: cold setup per PDF vs the warm
+ReportEngine (app/reports/engine.py).
+
+cold: what every report used to pay. That is a new Jinja Environment (the
+      template is compiled again), the stylesheet parsed again, and a new
+      FontConfiguration, for every PDF.
+warm: one ReportEngine reused for every PDF.
+
+Both render the same synthetic Take Action and CEO contexts into a temp dir:
+
+    python benchmarks/bench_report_engine.py [--pdfs 10] [--rows 40] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape  # noqa: E402
+from weasyprint import CSS, HTML  # noqa: E402
+from weasyprint.text.fonts import FontConfiguration  # noqa: E402
+
+from app.reports.engine import ENGINE_CFG, ReportEngine  # noqa: E402
+
+REPORTS = (
+    ("dashboardsidebar/takeaction/take_action_report.html", "take_action_report.css"),
+    ("ceo_must_contact.html", "ceo_must_contact.css"),
+)
+
+
+def _rows(n: int, rng: random.Random) -> list[dict]:
+    return [{
+        "borrower": f"Borrower {i:04d}",
+        "balance": f"${rng.uniform(500, 250_000):,.2f}",
+        "balance_fmt": f"${rng.uniform(500, 250_000):,.2f}",
+        "days_late": rng.randint(21, 180),
+        "note": rng.choice(["Left voicemail", "Promised payment Friday", "CEO must contact borrower"]),
+    } for i in range(n)]
+
+
+def _context(rows: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    half = _rows(rows // 2, rng)
+    other = _rows(rows - rows // 2, rng)
+    return {
+        "week": "2025-07-18",
+        "total": rows,
+        "contacted": rows // 2,
+        "not_contacted": rows - rows // 2,
+        "contacted_pct": "50%",
+        "not_contacted_pct": "50%",
+        "chart_data": "",
+        "high_risk": {"contacted": half[: len(half) // 2], "not_contacted": half[len(half) // 2:]},
+        "critical": {"contacted": other[: len(other) // 2], "not_contacted": other[len(other) // 2:]},
+        "expected_note": "CEO must contact borrower",
+        "high_rows": half,
+        "critical_rows": other,
+    }
+
+
+def _cold_render(template_name: str, stylesheet: str, pdf_path: str, context: dict) -> None:
+    env = Environment(
+        loader=FileSystemLoader(ENGINE_CFG["TEMPLATES_DIR"]),
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+    html = env.get_template(template_name).render(**context)
+    font_config = FontConfiguration()
+    css = CSS(filename=os.path.join(ENGINE_CFG["STYLES_DIR"], stylesheet), font_config=font_config)
+    HTML(string=html, base_url=ENGINE_CFG["TEMPLATES_DIR"]).write_pdf(
+        pdf_path, stylesheets=[css], font_config=font_config,
+    )
+
+
+def _time_renders(render, pdfs: int, out_dir: str) -> list[float]:
+    times = []
+    for i in range(pdfs):
+        template_name, stylesheet = REPORTS[i % len(REPORTS)]
+        started = time.perf_counter()
+        render(template_name, stylesheet, os.path.join(out_dir, f"bench_{i}.pdf"))
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _summary(times: list[float]) -> dict:
+    return {
+        "pdfs": len(times),
+        "first_ms": round(times[0] * 1000, 1),
+        "mean_ms": round(statistics.mean(times) * 1000, 1),
+        "median_ms": round(statistics.median(times) * 1000, 1),
+        "total_s": round(sum(times), 3),
+    }
+
+
+def run(pdfs: int = 10, rows: int = 40) -> dict:
+    context = _context(rows)
+    with tempfile.TemporaryDirectory() as out_dir:
+        cold = _time_renders(lambda t, s, p: _cold_render(t, s, p, context), pdfs, out_dir)
+
+        # A fresh bytecode dir so the warm numbers include the first compile.
+        engine = ReportEngine(bytecode_dir=os.path.join(out_dir, "jinja"))
+        warm = _time_renders(lambda t, s, p: engine.render_pdf(t, s, p, **context), pdfs, out_dir)
+
+    result = {"rows": rows, "cold": _summary(cold), "warm": _summary(warm)}
+    result["speedup_mean"] = round(result["cold"]["mean_ms"] / max(result["warm"]["mean_ms"], 1e-9), 2)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--pdfs", type=int, default=10, help="PDFs rendered per mode")
+    parser.add_argument("--rows", type=int, default=40, help="borrower rows per report")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    res = run(args.pdfs, args.rows)
+    if args.json:
+        print(json.dumps(res, indent=2))
+    else:
+        print(f"{args.pdfs} PDFs per mode, {args.rows} rows each")
+        for mode in ("cold", "warm"):
+            r = res[mode]
+            print(f"  {mode:<5} first {r['first_ms']:>8.1f} ms   mean {r['mean_ms']:>8.1f} ms   "
+                  f"median {r['median_ms']:>8.1f} ms   total {r['total_s']:>7.2f} s")
+        print(f"  mean speedup: {res['speedup_mean']}x")
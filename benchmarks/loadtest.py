@@ -0,0 +1,374 @@
+"""
+benchmarks/loadtest.py
+
+HTTP load test: N concurrent users working through the app at once (the
+collections team opening the dashboard at 8 AM).
+
+By default create_app() is served in-process by Werkzeug's threaded server
+on 127.0.0.1, inside a synthetic workspace from benchmarks/suite.py. Logins go
+through the real /login form. The users come from a local users file passed
+through LOGIN_USERS_FILE, standing in for Secrets Manager, so no outside
+service is needed. --url targets a server that is already running instead,
+which must accept the same users.
+
+Every simulated user logs in once and then loops until --duration runs out.
+Each loop picks a navigation flow by weight (FLOWS) and waits a random think
+time between requests. Drill-down flows fetch the shell and then its
+/api/loans pages, as loan_table.js does. Take Action flows save single rows
+and batches with the record versions the page rendered. Users share one
+ledger, so some saves hit 409 conflicts. Those are the expected answer and
+are counted under "statuses", not as errors. Each user keeps its own cookie
+jar (session). The report gives throughput, plus count, errors and
+p50/p90/p95/p99/max latency, for each route.
+
+    python benchmarks/loadtest.py [--users 20] [--duration 30] [--loans 10000]
+        [--think-ms 300] [--ramp-s 0] [--seed 0] [--url http://host:port] [--json out.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import http.cookiejar
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.suite import workspace  # noqa: E402
+
+LOAD_CFG = {
+    "USERS": 20,
+    "DURATION_S": 30,
+    "LOANS": 10_000,
+    "THINK_MS": 300,
+    "TIMEOUT_S": 60,
+}
+
+# Stand-in for the Secrets Manager user list (written to LOGIN_USERS_FILE)
+USERS = {
+    "full_access": {"password": "loadtest-full", "show_amounts": True},
+    "team_member": {"password": "loadtest-team", "show_amounts": False},
+}
+
+# drill-down page -> the /api/loans segment its table loads
+SUMMARY_PAGES = {
+    "/loan-summary/all": "all",
+    "/loan-summary/active": "active",
+    "/loan-summary/missing-contracts": "missing-contracts",
+    "/loan-summary/critical-loans": "critical",
+    "/loan-summary/no-title-guarantor": "no-title-guarantor",
+    "/loan-summary/with-guarantor": "with-guarantor",
+    "/loan-summary/with-title": "with-title",
+    "/loan-summary/inactive-borrowers": "inactive",
+}
+RISK_PAGES = {"/dashboard/high-risk/": "high-risk", "/dashboard/medium-risk/": "medium-risk"}
+API_SORTS = (None, "Borrower", "Principal Balance", "Days Late")
+
+_ROW_RE = re.compile(r'data-loan-key="([^"]+)" data-version="(\d+)"')
+
+# flow name -> weight; see SimUser for the steps of each
+FLOWS = {
+    "dashboard": 25,
+    "summary_drilldown": 35,
+    "risk_pages": 10,
+    "take_action_save": 15,
+    "take_action_batch": 10,
+    "take_action_history": 5,
+}
+
+
+class Recorder:
+    """Latencies and statuses per route label, shared by all user threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, label: str, ms: float, status: int, ok: bool) -> None:
+        with self._lock:
+            self.latencies[label].append(ms)
+            self.statuses[label][status] += 1
+            if not ok:
+                self.errors[label] += 1
+
+
+class SimUser(threading.Thread):
+    def __init__(self, index: int, base_url: str, username: str, recorder: Recorder,
+                 stop_at: float, think_ms: int, start_delay: float, seed: int):
+        super().__init__(name=f"user-{index}", daemon=True)
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.recorder = recorder
+        self.stop_at = stop_at
+        self.think_ms = think_ms
+        self.start_delay = start_delay
+        self.rng = random.Random(seed + index)
+        self.versions = {}  # Take Action loan_key -> record version last seen
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    # ---- HTTP ----
+    def request(self, label: str, path: str, data: bytes | None = None, headers: dict | None = None,
+                expect_json: bool = False, conflict_ok: bool = False) -> str:
+        """
+        Body of the response. expect_json: a 200 must carry "ok": true.
+        conflict_ok: a 409 (someone else saved first) is an answer, not an error.
+        """
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers or {})
+        started = time.perf_counter()
+        status, body, ok = 0, "", False
+        try:
+            with self.opener.open(req, timeout=LOAD_CFG["TIMEOUT_S"]) as resp:
+                body = resp.read().decode("utf-8", "replace")
+                status = resp.status
+                # bounced to the login page = not logged in (or a failed login)
+                landed_on_login = urllib.parse.urlsplit(resp.geturl()).path == "/login"
+            ok = (status == 200 and not landed_on_login
+                  and (not expect_json or json.loads(body).get("ok", False)))
+        except urllib.error.HTTPError as e:
+            status = e.code
+            if conflict_ok and status == 409:
+                body = e.read().decode("utf-8", "replace")
+                ok = True
+        except (urllib.error.URLError, OSError, ValueError):
+            status = 0
+        self.recorder.add(label, (time.perf_counter() - started) * 1000, status, ok)
+        return body
+
+    def post_json(self, label: str, path: str, payload: dict) -> dict:
+        body = self.request(label, path, data=json.dumps(payload).encode(),
+                            headers={"Content-Type": "application/json"}, expect_json=True, conflict_ok=True)
+        try:
+            return json.loads(body)
+        except ValueError:
+            return {}
+
+    def think(self) -> None:
+        if self.think_ms:
+            time.sleep(self.rng.uniform(0, self.think_ms) / 1000)
+
+    # ---- flows ----
+    def login(self) -> None:
+        form = urllib.parse.urlencode({"username": self.username,
+                                       "password": USERS[self.username]["password"]}).encode()
+        before = self.recorder.errors.get("POST /login", 0)
+        self.request("POST /login", "/login", data=form)
+        if self.recorder.errors.get("POST /login", 0) != before:
+            raise RuntimeError(f"login failed for {self.username}")
+
+    def dashboard(self) -> None:
+        self.request("GET /", "/")
+
+    def loan_table(self, segment: str) -> None:
+        """The /api/loans calls behind a drill-down table: first page, then maybe re-sort / page on."""
+        sort = None
+        for _ in range(self.rng.randint(1, 3)):
+            query = {"segment": segment, "page": 1, "per_page": 50}
+            if sort:
+                query.update(sort=sort, order=self.rng.choice(["asc", "desc"]))
+                query["page"] = self.rng.randint(1, 3)
+            self.request("GET /api/loans", f"/api/loans?{urllib.parse.urlencode(query)}")
+            sort = self.rng.choice(API_SORTS)
+            self.think()
+
+    def summary_drilldown(self) -> None:
+        self.request("GET /loan-summary", "/loan-summary")
+        for path in self.rng.sample(list(SUMMARY_PAGES), k=self.rng.randint(1, 3)):
+            self.think()
+            self.request(f"GET {path}", path)
+            self.loan_table(SUMMARY_PAGES[path])
+
+    def risk_pages(self) -> None:
+        for path, segment in RISK_PAGES.items():
+            self.request(f"GET {path}", path)
+            self.loan_table(segment)
+
+    def take_action_page(self) -> None:
+        body = self.request("GET /dashboard/actions/", "/dashboard/actions/")
+        rows = {html.unescape(k): int(v) for k, v in _ROW_RE.findall(body)}
+        self.versions = rows or self.versions
+
+    def _update(self, loan_key: str) -> dict:
+        return {
+            "loan_key": loan_key,
+            "contacted": self.rng.random() < 0.7,
+            "note": self.rng.choice(["Left voicemail", "Will pay Friday", "Wrong number", ""]),
+            "version": self.versions.get(loan_key, 0),
+        }
+
+    def _saw(self, entries) -> None:
+        for entry in entries:
+            if entry:
+                self.versions[entry["loan_key"]] = entry["version"]
+
+    def take_action_save(self) -> None:
+        """Autosave: one POST per edited row."""
+        self.take_action_page()
+        if not self.versions:
+            return
+        for _ in range(self.rng.randint(1, 3)):
+            self.think()
+            res = self.post_json("POST /dashboard/actions/save", "/dashboard/actions/save",
+                                 self._update(self.rng.choice(list(self.versions))))
+            self._saw([res.get("entry"), res.get("conflict")])
+
+    def take_action_batch(self) -> None:
+        """Save button: the rows edited since the page loaded, in one request."""
+        self.take_action_page()
+        if not self.versions:
+            return
+        self.think()
+        keys = self.rng.sample(list(self.versions), k=min(len(self.versions), self.rng.randint(1, 8)))
+        res = self.post_json("POST /dashboard/actions/save-batch", "/dashboard/actions/save-batch",
+                             {"updates": [self._update(k) for k in keys]})
+        self._saw(res.get("entries", []) + res.get("conflicts", []))
+
+    def take_action_history(self) -> None:
+        self.request("GET /dashboard/actions/history", "/dashboard/actions/history")
+
+    def run(self) -> None:
+        time.sleep(self.start_delay)
+        try:
+            self.login()
+        except RuntimeError:
+            return
+        names, weights = list(FLOWS), list(FLOWS.values())
+        while time.monotonic() < self.stop_at:
+            getattr(self, self.rng.choices(names, weights)[0])()
+            self.think()
+
+
+def _percentile(sorted_ms: list[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = min(len(sorted_ms) - 1, max(0, round(q / 100 * (len(sorted_ms) - 1))))
+    return sorted_ms[k]
+
+
+def summarize(recorder: Recorder, elapsed_s: float) -> dict:
+    routes = {}
+    for label, values in sorted(recorder.latencies.items()):
+        ms = sorted(values)
+        routes[label] = {
+            "requests": len(ms),
+            "errors": recorder.errors.get(label, 0),
+            "rps": round(len(ms) / elapsed_s, 2),
+            "mean_ms": round(statistics.mean(ms), 2),
+            **{f"p{q}_ms": round(_percentile(ms, q), 2) for q in (50, 90, 95, 99)},
+            "max_ms": round(ms[-1], 2),
+            "statuses": {str(k): v for k, v in sorted(recorder.statuses[label].items())},
+        }
+    total = sum(r["requests"] for r in routes.values())
+    return {
+        "elapsed_s": round(elapsed_s, 2),
+        "requests": total,
+        "errors": sum(r["errors"] for r in routes.values()),
+        "rps": round(total / elapsed_s, 2) if elapsed_s else 0.0,
+        "routes": routes,
+    }
+
+
+def _serve_app(loans: int, seed: int):
+    """Start create_app() on a free local port inside a synthetic workspace; returns (url, server)."""
+    path = workspace(loans, seed)
+    os.chdir(path)  # before importing app: utils and Flask-Session resolve paths from here
+    users_file = os.path.join(tempfile.mkdtemp(prefix="loadtest-"), "users.json")
+    with open(users_file, "w", encoding="utf-8") as f:
+        json.dump(USERS, f)
+    os.environ["LOGIN_USERS_FILE"] = users_file
+
+    import logging
+
+    from werkzeug.serving import make_server
+
+    from app import create_app
+    from utils import load_latest_loans
+
+    load_latest_loans()  # parse the workbook once up front, as a warmed-up worker would have
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)  # no per-request access log
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", server
+
+
+def run(users: int = LOAD_CFG["USERS"], duration_s: float = LOAD_CFG["DURATION_S"],
+        loans: int = LOAD_CFG["LOANS"], think_ms: int = LOAD_CFG["THINK_MS"], ramp_s: float = 0.0,
+        seed: int = 0, url: str | None = None) -> dict:
+    server = None
+    if url is None:
+        url, server = _serve_app(loans, seed)
+    print(f"[Load] {users} users for {duration_s}s against {url}", file=sys.stderr)
+
+    recorder = Recorder()
+    started = time.monotonic()
+    stop_at = started + ramp_s + duration_s
+    names = list(USERS)
+    threads = [
+        SimUser(i, url, names[i % len(names)], recorder, stop_at, think_ms,
+                start_delay=ramp_s * i / max(users, 1), seed=seed)
+        for i in range(users)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+
+    if server is not None:
+        server.shutdown()
+
+    return {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "url": url if server is None else "in-process create_app()",
+            "users": users, "duration_s": duration_s, "ramp_s": ramp_s, "think_ms": think_ms,
+            "loans": None if server is None else loans, "seed": seed, "flows": FLOWS,
+        },
+        **summarize(recorder, elapsed),
+    }
+
+
+def _print_report(res: dict) -> None:
+    print(f"{res['requests']} requests in {res['elapsed_s']}s = {res['rps']} req/s, {res['errors']} errors")
+    print(f"{'route':<36}{'reqs':>7}{'err':>5}{'rps':>8}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for label, r in res["routes"].items():
+        print(f"{label:<36}{r['requests']:>7}{r['errors']:>5}{r['rps']:>8}"
+              f"{r['p50_ms']:>9.1f}{r['p90_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}")
+    conflicts = {label: r["statuses"]["409"] for label, r in res["routes"].items() if "409" in r["statuses"]}
+    if conflicts:
+        print("save conflicts (409): " + ", ".join(f"{label} {n}" for label, n in conflicts.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-user HTTP load test for the Flask app.")
+    parser.add_argument("--users", type=int, default=LOAD_CFG["USERS"], help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=LOAD_CFG["DURATION_S"], help="seconds of load")
+    parser.add_argument("--loans", type=int, default=LOAD_CFG["LOANS"], help="synthetic loans to serve")
+    parser.add_argument("--think-ms", type=int, default=LOAD_CFG["THINK_MS"], help="max pause between requests")
+    parser.add_argument("--ramp-s", type=float, default=0.0, help="spread user start-up over this many seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="load an already running server instead of create_app()")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    result = run(args.users, args.duration, args.loans, args.think_ms, args.ramp_s, args.seed, args.url)
+    _print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    sys.exit(1 if result["errors"] else 0)
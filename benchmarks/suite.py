@@ -0,0 +1,334 @@
+"""
+benchmarks/suite.py
+
+Benchmark suite over synthetic Bryt exports (benchmarks/synth.py).
+
+For each size (default 1k, 10k and 100k loans) a clean spawned process
+chdirs into that size's workspace and times:
+
+    load.*       load_latest_loans from Excel, from the Parquet sidecar, and from the
+                 process cache; the raw column-projected Excel read
+    classify.*   _classify_loans, each risk rule set, compute_loan_stats, the SegmentIndex
+    route.*      GET of the dashboard, every /loan-summary* page and Take Action, through
+                 create_app()'s test client with the render cache cleared before each run;
+                 the /api/loans page every drill-down fetches (each segment, sorted, page 2)
+                 and the CSV / XLSX / HTML exports behind the drill-downs' download links
+    report.*     both report generators (force=True, rendered into the workspace)
+
+Workspaces are cached under benchmarks/.data/ and regenerated when synth.py
+changes. Results are written as JSON (default
+benchmarks/results/<commit>.json) and can be compared across commits:
+
+    python benchmarks/suite.py run [--sizes 1000,10000] [--repeat 5] [--out results.json]
+    python benchmarks/suite.py compare base.json new.json [--threshold 1.25]
+
+compare exits 1 when any benchmark's median is slower than base by more
+than the threshold ratio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import urlencode
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from benchmarks import synth  # noqa: E402
+
+SUITE_CFG = {
+    "SIZES": (1_000, 10_000, 100_000),
+    "REPEAT": 5,
+    "DATA_DIR": os.path.join(BENCH_DIR, ".data"),
+    "RESULTS_DIR": os.path.join(BENCH_DIR, "results"),
+    "THRESHOLD": 1.25,
+}
+
+RESULTS_FORMAT = 1
+
+
+# ========== Workspaces ==========
+def _synth_digest() -> str:
+    with open(synth.__file__, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def workspace(n: int, seed: int = 0) -> str:
+    """Workspace with n synthetic loans, generated on first use and when synth.py changes."""
+    path = os.path.join(SUITE_CFG["DATA_DIR"], f"{n}-s{seed}")
+    marker = os.path.join(path, "synth.json")
+    try:
+        with open(marker, "r", encoding="utf-8") as f:
+            if json.load(f).get("synth") == _synth_digest():
+                return path
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(path, ignore_errors=True)
+    started = time.perf_counter()
+    # In a child: synth imports app, which would pin Flask-Session's folder to our cwd
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+        info = pool.submit(synth.generate, n, path, seed).result()
+    info.update(synth=_synth_digest(), seconds=round(time.perf_counter() - started, 1))
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(info, f)
+    return path
+
+
+def _reset_workspace(path: str) -> None:
+    """Drop state earlier runs left behind (ledger, sidecar, snapshot, sessions, PDFs)."""
+    data = os.path.join(path, "data")
+    for name in os.listdir(data):
+        if name.startswith("actions.db") or name in ("latest_loans.parquet", "dashboard_snapshot.json"):
+            os.remove(os.path.join(data, name))
+    for name in ("reports", "flask_session", os.path.join("data", ".jinja_cache")):
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+# ========== Timing ==========
+def _timed(fn, repeat: int, setup=None) -> dict:
+    runs = []
+    try:
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            fn()
+            runs.append((time.perf_counter() - started) * 1000)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    return {
+        "runs": len(runs),
+        "min_ms": round(min(runs), 3),
+        "median_ms": round(statistics.median(runs), 3),
+        "mean_ms": round(statistics.mean(runs), 3),
+        "max_ms": round(max(runs), 3),
+    }
+
+
+def _loader_benchmarks(repeat: int) -> dict:
+    import utils
+    from app.models.ingest import LOANS_COLUMNS, read_excel_columns
+
+    sidecar = utils.sidecar_path_for(utils.LATEST_LOANS_PATH)
+
+    def no_sidecar():
+        if os.path.exists(sidecar):
+            os.remove(sidecar)
+        utils.invalidate_loans_cache()
+
+    out = {
+        "load.read_excel_columns": _timed(
+            lambda: read_excel_columns(utils.LATEST_LOANS_PATH, LOANS_COLUMNS), repeat),
+        "load.latest_loans.excel": _timed(utils.load_latest_loans, repeat, setup=no_sidecar),
+    }
+    utils.write_loans_sidecar()
+    out["load.latest_loans.sidecar"] = _timed(utils.load_latest_loans, repeat, setup=utils.invalidate_loans_cache)
+    out["load.latest_loans.cached"] = _timed(utils.load_latest_loans, repeat)
+    return out
+
+
+def _classify_benchmarks(repeat: int) -> dict:
+    import utils
+    from app.models import risk
+    from app.models.ingest import LOANS_COLUMNS, read_excel_columns
+    from app.models.segments import SegmentIndex
+    from app.models.stats import compute_loan_stats
+
+    raw = read_excel_columns(utils.LATEST_LOANS_PATH, LOANS_COLUMNS)
+    df = utils.load_latest_loans()
+    version = utils.loans_data_version()
+    out = {"classify.full": _timed(lambda: utils._classify_loans(raw.copy()), repeat)}
+    for rule_set in risk.RISK_CFG:
+        out[f"classify.risk.{rule_set}"] = _timed(lambda r=rule_set: risk.classify(df, [r]), repeat)
+    out["classify.loan_stats"] = _timed(lambda: compute_loan_stats(df), repeat)
+    out["classify.segment_index"] = _timed(lambda: SegmentIndex(df, version), repeat)
+    return out
+
+
+# /api/loans page as loan_table.js requests it, and the columns its export links pass
+API_QUERY = {"page": 2, "per_page": 50, "sort": "Principal Balance", "order": "desc"}
+EXPORT_COLUMNS = ("Borrower", "Principal Balance", "Activity Status", "Has Contract", "Has Title")
+EXPORT_SEGMENTS = ("all", "critical")
+
+
+def _route_paths(app) -> list[str]:
+    from app.models.segments import LIST_SEGMENTS
+
+    summary = sorted(r.rule for r in app.url_map.iter_rules()
+                     if r.rule.startswith("/loan-summary") and "GET" in r.methods and not r.arguments)
+    api = [f"/api/loans?{urlencode({'segment': name, **API_QUERY})}" for name in LIST_SEGMENTS]
+    exports = [f"/export/loans.{fmt}?{urlencode({'segment': name, 'column': EXPORT_COLUMNS}, doseq=True)}"
+               for name in EXPORT_SEGMENTS for fmt in ("csv", "xlsx", "html")]
+    return ["/", *summary, "/dashboard/actions/", *api, *exports]
+
+
+def _route_benchmarks(repeat: int) -> dict:
+    from app import create_app
+    from app.caching import render_cache
+
+    app = create_app()
+    app.config["TESTING"] = True
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["logged_in"] = True
+        s["show_amounts"] = True
+        s["username"] = "bench"
+
+    def get(path):
+        resp = client.get(path)
+        resp.get_data()  # drain streamed bodies
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+
+    out = {}
+    for path in _route_paths(app):
+        get(path)  # first hit builds the per-version indexes, sort orders and snapshot
+        out[f"route.GET {path}"] = _timed(lambda p=path: get(p), repeat, setup=render_cache.clear)
+    return out
+
+
+def _report_benchmarks(repeat: int, path: str) -> dict:
+    try:
+        from app.reports import generate_report as gr
+    except Exception as e:  # WeasyPrint / matplotlib (or their system libraries) missing
+        error = {"error": f"{type(e).__name__}: {e}"}
+        return {"report.take_action": error, "report.ceo_must_contact": error}
+
+    gr._project_root = lambda: path  # ledger + reports/ of the workspace, not the repo
+
+    def check(result):
+        if result is None:
+            raise RuntimeError("report generator found nothing to report (see its output)")
+
+    return {
+        "report.take_action": _timed(lambda: check(gr.generate_take_action_report(force=True)), repeat),
+        "report.ceo_must_contact": _timed(
+            lambda: check(gr.generate_ceo_must_contact_report(send_notifications=False, force=True)), repeat),
+    }
+
+
+def run_size(path: str, repeat: int) -> dict:
+    """Child process: every benchmark against one workspace."""
+    _reset_workspace(path)
+    os.chdir(path)  # utils and the routes use data/... relative to the working directory
+    os.environ["REPORT_BYTECODE_DIR"] = os.path.join(path, "data", ".jinja_cache")
+    out = {}
+    out.update(_loader_benchmarks(repeat))
+    out.update(_classify_benchmarks(repeat))
+    out.update(_route_benchmarks(repeat))
+    out.update(_report_benchmarks(repeat, path))
+    return out
+
+
+# ========== Results ==========
+def _git(*args) -> str | None:
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(sizes, repeat) -> dict:
+    import numpy
+    import pandas
+
+    return {
+        "format": RESULTS_FORMAT,
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": list(sizes),
+        "repeat": repeat,
+    }
+
+
+def run(sizes=SUITE_CFG["SIZES"], repeat: int = SUITE_CFG["REPEAT"], seed: int = 0) -> dict:
+    results = {"meta": _meta(sizes, repeat), "results": {}}
+    for n in sizes:
+        path = workspace(n, seed)
+        print(f"[Bench] {n} loans ({path})", file=sys.stderr)
+        # a fresh interpreter per size: no caches or memory carried between sizes
+        with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+            timings = pool.submit(run_size, path, repeat).result()
+        results["results"][str(n)] = timings
+        for name, t in timings.items():
+            shown = f"{t['median_ms']:>10.2f} ms" if "median_ms" in t else f"  {t['error']}"
+            print(f"[Bench]   {name:<42}{shown}", file=sys.stderr)
+    return results
+
+
+def compare(base: dict, new: dict, threshold: float = SUITE_CFG["THRESHOLD"]) -> list[dict]:
+    """One row per benchmark present in both runs; regression when new/base median > threshold."""
+    rows = []
+    for size, benches in new.get("results", {}).items():
+        for name, t in benches.items():
+            b = base.get("results", {}).get(size, {}).get(name)
+            if not b or "median_ms" not in b or "median_ms" not in t:
+                continue
+            ratio = t["median_ms"] / b["median_ms"] if b["median_ms"] else float("inf")
+            rows.append({"size": size, "name": name, "base_ms": b["median_ms"], "new_ms": t["median_ms"],
+                         "ratio": round(ratio, 3), "regression": ratio > threshold})
+    return rows
+
+
+def _load(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SamXTrack benchmark suite.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="run the suite and write a results JSON")
+    p_run.add_argument("--sizes", default=",".join(str(n) for n in SUITE_CFG["SIZES"]),
+                       help="comma-separated loan counts")
+    p_run.add_argument("--repeat", type=int, default=SUITE_CFG["REPEAT"])
+    p_run.add_argument("--seed", type=int, default=0)
+    p_run.add_argument("--out", help="results file (default benchmarks/results/<commit>.json)")
+
+    p_cmp = sub.add_parser("compare", help="compare two results files")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=SUITE_CFG["THRESHOLD"],
+                       help="new/base median ratio counted as a regression")
+    args = parser.parse_args()
+
+    if args.cmd == "run":
+        res = run([int(s) for s in args.sizes.split(",") if s], args.repeat, args.seed)
+        out = args.out or os.path.join(
+            SUITE_CFG["RESULTS_DIR"],
+            f"{res['meta']['commit'] or 'nogit'}{'-dirty' if res['meta']['dirty'] else ''}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+        print(out)
+    else:
+        rows = compare(_load(args.base), _load(args.new), args.threshold)
+        for r in rows:
+            flag = "  REGRESSION" if r["regression"] else ""
+            print(f"{r['size']:>7} {r['name']:<42} {r['base_ms']:>10.2f} -> {r['new_ms']:>10.2f} ms"
+                  f"  x{r['ratio']:<6}{flag}")
+        regressions = [r for r in rows if r["regression"]]
+        print(f"{len(rows)} compared, {len(regressions)} regressions (threshold x{args.threshold})")
+        sys.exit(1 if regressions else 0)
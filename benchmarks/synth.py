@@ -0,0 +1,182 @@
+"""
+benchmarks/synth.py
+
+Synthetic Bryt exports for benchmarks, no Bryt login needed.
+
+generate() writes a workspace shaped like the app's data folder:
+
+    <out>/data/latest_loans.xlsx              Bryt "Loans" export (all ingest columns + a few unused ones)
+    <out>/data/weekly_actions/<Friday>.json   Take Action weeks, seeded the way the scheduler does
+
+The distributions follow what real exports look like:
+- most loans are current and a long tail is late
+- Status follows Days Late, and Finished loans are paid off
+- Group has inconsistent casing
+- roughly half the loans have a guarantor and/or a SAM title
+
+Output is deterministic for a given (loans, seed, weeks).
+
+    python benchmarks/synth.py 10000 /tmp/bench-10k [--seed 0] [--weeks 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Newest generated week (a Friday); earlier weeks step back 7 days
+LAST_WEEK = date(2025, 7, 18)
+
+COLUMNS = (
+    "Loan ID", "Loan Name", "Borrower", "Status", "State", "Group", "Principal Balance",
+    "Days Late", "Next Payment Amount", "Remaining Payments", "Contract", "Guarantor",
+    "Title Ownership", "Last W Collected", "Start Date", "Phone",
+)
+
+NOTES = ("Left voicemail", "Promised to pay Friday", "Paid partially", "Wrong number", "Will pay next week")
+
+
+def _days_late(rng, n: int) -> np.ndarray:
+    """0 for ~62% of loans, then a tail from a few days to a year."""
+    bands = rng.choice(6, size=n, p=[0.62, 0.12, 0.08, 0.06, 0.08, 0.04])
+    lo = np.array([0, 1, 8, 15, 22, 61])[bands]
+    hi = np.array([0, 7, 14, 21, 60, 365])[bands]
+    return lo + (rng.random(n) * (hi - lo + 1)).astype(int).clip(max=hi - lo)
+
+
+def loans(n: int, seed: int = 0) -> dict[str, np.ndarray]:
+    """Column name -> values for n synthetic loans."""
+    rng = np.random.default_rng(seed)
+    days = _days_late(rng, n)
+
+    # ~15% of borrowers have a second loan
+    borrower_ids = rng.integers(0, max(1, int(n * 0.85)), size=n)
+    borrowers = np.char.add("Borrower ", borrower_ids.astype(str))
+    original = rng.integers(2, 60, size=n) * 500
+
+    current = rng.choice(["Ongoing", "New", "Finished"], size=n, p=[0.75, 0.10, 0.15])
+    status = np.select(
+        [days > 14, days > 7, days > 0],
+        ["3+W Critical", "2W Behind", "1W Behind"],
+        default=current,
+    )
+    finished = status == "Finished"
+
+    balance = np.round(np.minimum(rng.lognormal(8.8, 0.8, size=n), original), 2)
+    balance[finished] = 0.0
+    remaining = np.where(finished, 0, rng.integers(1, 104, size=n))
+    next_payment = np.round(np.where(remaining > 0, balance / np.maximum(remaining, 1), 0.0), 2)
+
+    group = rng.choice(["Active", "active", "ACTIVE ", "Inactive", "inactive"], size=n,
+                       p=[0.60, 0.15, 0.07, 0.14, 0.04])
+    contract = rng.choice(["Yes", "No", ""], size=n, p=[0.88, 0.08, 0.04])
+    guarantor = np.where(rng.random(n) < 0.45, np.char.add("Guarantor ", borrower_ids.astype(str)),
+                         rng.choice(["NA", ""], size=n, p=[0.45, 0.55]))
+    title = rng.choice(["SAM", "Own", "Customer", ""], size=n, p=[0.50, 0.15, 0.20, 0.15])
+    start = np.datetime64("2022-01-03") + rng.integers(0, 1200, size=n).astype("timedelta64[D]")
+
+    return {
+        "Loan ID": np.arange(100_000, 100_000 + n),
+        "Loan Name": np.char.add(np.char.add(borrowers, " - $"), original.astype(str)),
+        "Borrower": borrowers,
+        "Status": status,
+        "State": np.where(finished, "Paid Off", "In Service"),
+        "Group": group,
+        "Principal Balance": balance,
+        "Days Late": days,
+        "Next Payment Amount": next_payment,
+        "Remaining Payments": remaining,
+        "Contract": contract,
+        "Guarantor": guarantor,
+        "Title Ownership": title,
+        "Last W Collected": np.char.add("W", rng.integers(1, 53, size=n).astype(str)),
+        "Start Date": start.astype(str),
+        "Phone": np.char.add("+1-555-", rng.integers(1_000_000, 9_999_999, size=n).astype(str)),
+    }
+
+
+def write_workbook(cols: dict[str, np.ndarray], path: str) -> None:
+    """Write the columns as a single-sheet .xlsx the way Bryt exports it (write-only, streamed)."""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Loans")
+    ws.append(list(COLUMNS))
+    values = [cols[c].tolist() for c in COLUMNS]
+    for row in zip(*values):
+        ws.append([None if v == "" else v for v in row])
+    tmp_path = f"{path}.tmp"
+    wb.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def weekly_actions(cols: dict[str, np.ndarray], week_index: int, seed: int = 0) -> list[dict]:
+    """
+    One Take Action week as the scheduler seeds it (High Risk, then Critical;
+    21+ days late), with roughly half already contacted and some CEO escalations.
+    """
+    # imported here: importing app pins Flask-Session's folder to the current directory
+    from app.models.action_ledger import EXPECTED_NOTE
+
+    rng = np.random.default_rng(seed + 1 + week_index)
+    days = cols["Days Late"]
+    no_title = ~np.isin(cols["Title Ownership"], ["SAM", "Own"])
+    no_guarantor = np.isin(cols["Guarantor"], ["", "NA"])
+    late = days > 21
+    critical = late & no_title & no_guarantor
+    order = np.concatenate([np.flatnonzero(late & ~critical), np.flatnonzero(critical)])
+
+    entries = []
+    for i in order.tolist():
+        contacted = bool(rng.random() < 0.55)
+        note = ""
+        if contacted:
+            note = EXPECTED_NOTE if rng.random() < 0.12 else str(rng.choice(NOTES))
+        borrower, loan_name = str(cols["Borrower"][i]), str(cols["Loan Name"][i])
+        entries.append({
+            "loan_key": f"{borrower}|{loan_name}",
+            "borrower": borrower,
+            "loan_name": loan_name,
+            "balance": float(cols["Principal Balance"][i]),
+            "days_late": int(days[i]),
+            "category": "Critical" if critical[i] else "High Risk",
+            "contacted": contacted,
+            "note": note,
+        })
+    return entries
+
+
+def generate(n: int, out_dir: str, seed: int = 0, weeks: int = 1) -> dict:
+    """Write the workspace for n loans under out_dir; returns what was written."""
+    data_dir = os.path.join(out_dir, "data")
+    actions_dir = os.path.join(data_dir, "weekly_actions")
+    os.makedirs(actions_dir, exist_ok=True)
+
+    cols = loans(n, seed)
+    xlsx_path = os.path.join(data_dir, "latest_loans.xlsx")
+    write_workbook(cols, xlsx_path)
+
+    week_tags = []
+    for k in range(weeks):
+        tag = (LAST_WEEK - timedelta(weeks=k)).isoformat()
+        with open(os.path.join(actions_dir, f"{tag}.json"), "w", encoding="utf-8") as f:
+            json.dump(weekly_actions(cols, k, seed), f)
+        week_tags.append(tag)
+
+    return {"loans": n, "seed": seed, "xlsx": xlsx_path, "weeks": sorted(week_tags)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Bryt export + weekly actions.")
+    parser.add_argument("loans", type=int, help="number of loans (e.g. 1000, 10000, 100000)")
+    parser.add_argument("out", help="workspace directory (data/ is created inside)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--weeks", type=int, default=1, help="Take Action weeks to write")
+    args = parser.parse_args()
+    print(json.dumps(generate(args.loans, args.out, args.seed, args.weeks), indent=2))
@@ -4,6 +4,8 @@ app/bryt_downloader.py
 Headless Bryt export → puts fresh Excel in:
 - data/_tmp_download.xlsx
 - data/latest_loans.xlsx   (always updated)
+- data/latest_loans.parquet  (typed columnar copy with derived columns; needs pyarrow)
+- data/dashboard_snapshot.json  (dashboard aggregates for this data version)
 - data/weekly_backups/<YYYY-MM-DD>-Wxx.xlsx  (Fridays, America/Chicago)
 
 Credentials:
@@ -19,7 +21,6 @@ This module can be:
 from __future__ import annotations
 
 import os
-import re
 import json
 import base64
 import hashlib
@@ -27,9 +28,11 @@ from pathlib import Path
 from datetime import datetime, timedelta
 
 import boto3
-import pandas as pd
 from playwright.sync_api import sync_playwright
 
+from app.models.ingest import WEEK_TAG_COLUMNS, iter_excel_chunks
+from utils import write_loans_sidecar
+
 # ---------------------------
 # Selectors (stable, low risk)
 # ---------------------------
@@ -67,26 +70,22 @@ def _sha256(path: Path) -> str:
     return h.hexdigest()
 
 def _extract_max_week_tag(xlsx_path: Path) -> str | None:
-    """Read 'Last W Collected' column and return the largest tag like 'W34'."""
+    """Stream 'Last W Collected' (only that column) and return the largest tag like 'W34'."""
     try:
-        df = pd.read_excel(xlsx_path)
-        col = None
-        for candidate in ("Last W Collected", "Last W collected", "LastWCollected", "Last_W_Collected"):
-            if candidate in df.columns:
-                col = candidate
-                break
-        if not col:
-            return None
-
-        week_nums = []
-        for val in df[col].dropna().astype(str):
-            m = re.search(r"[Ww]\s*-?\s*(\d+)", val)
-            if m:
-                week_nums.append(int(m.group(1)))
-
-        if not week_nums:
+        max_week = None
+        for chunk in iter_excel_chunks(xlsx_path, WEEK_TAG_COLUMNS):
+            col = next((c for c in WEEK_TAG_COLUMNS if c in chunk.columns), None)
+            if not col:
+                return None
+
+            nums = chunk[col].dropna().astype(str).str.extract(r"[Ww]\s*-?\s*(\d+)", expand=False).dropna()
+            if not nums.empty:
+                top = int(nums.astype(int).max())
+                max_week = top if max_week is None else max(max_week, top)
+
+        if max_week is None:
             return None
-        return f"W{max(week_nums)}"
+        return f"W{max_week}"
     except Exception:
         return None
 
@@ -145,6 +144,8 @@ def run_download(headless: bool = True, echo: bool = True, also_run_reports_on_f
     out = {
         "tmp": None,
         "latest": None,
+        "sidecar": None,
+        "dashboard_snapshot": None,
         "weekly": None,
         "friday": False,
     }
@@ -285,6 +286,21 @@ def run_download(headless: bool = True, echo: bool = True, also_run_reports_on_f
         LATEST_XLSX.write_bytes(TMP_XLSX.read_bytes())
         out["latest"] = LATEST_XLSX.as_posix()
 
+        # 6b) Columnar sidecar so the web app can skip Excel parsing entirely
+        try:
+            out["sidecar"] = write_loans_sidecar(LATEST_XLSX)
+            if echo:
+                print(f"ℹ️  Parquet sidecar  : {out['sidecar'] or '(skipped, pyarrow not installed)'}")
+        except Exception as e:
+            print("[sidecar] write failed:", e)
+
+        # 6c) Dashboard aggregates for this data version
+        try:
+            from app.models.dashboard_snapshot import build_dashboard_snapshot
+            out["dashboard_snapshot"] = build_dashboard_snapshot(LATEST_XLSX)
+        except Exception as e:
+            print("[snapshot] dashboard snapshot failed:", e)
+
         if echo:
             old_hash = _sha256(LATEST_XLSX) if LATEST_XLSX.exists() else "(none)"
             new_hash = _sha256(TMP_XLSX)
@@ -312,8 +328,12 @@ def run_download(headless: bool = True, echo: bool = True, also_run_reports_on_f
                         generate_ceo_must_contact_report,
                     )
                     print("[Weekly] Generating PDFs…")
-                    generate_take_action_report()
-                    generate_ceo_must_contact_report(send_notifications=False)
+                    for name, build in (("Take Action", generate_take_action_report),
+                                        ("CEO", lambda: generate_ceo_must_contact_report(send_notifications=False))):
+                        try:
+                            build()
+                        except Exception as e:
+                            print(f"[Weekly] {name} report failed:", e)
                 except Exception as e:
                     print("[Weekly] Report generation failed:", e)
 
@@ -0,0 +1,89 @@
+"""
+tests/test_risk.py
+
+The rule-set engine (app/models/risk.py) must label loans exactly like the
+row-by-row classifiers it replaced: utils.classify_risk (collections view)
+and the dashboard's determine_risk.
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.risk import RISK_CFG, apply_risk_levels, classify  # noqa: E402
+
+# Days Late, Has Title, Has Guarantor, Has Contract -> collections, dashboard
+CASES = [
+    (30, False, False, True, "Critical", "Critical"),
+    (30, True, False, True, "High Risk", "Critical"),
+    (22, False, True, True, "High Risk", "Critical"),
+    (21, False, False, True, "At Risk", "Critical"),    # > 21 vs >= 21
+    (15, True, True, True, "At Risk", "Medium"),
+    (14, True, True, True, "Low Risk", "Medium"),
+    (8, True, True, False, "Low Risk", "Medium"),
+    (7, True, True, True, "Healthy", "Medium"),         # > 7 vs >= 7
+    (6, True, True, False, "Healthy", "Medium"),        # no contract
+    (0, False, True, True, "Healthy", "Medium"),        # no title
+    (0, True, True, True, "Healthy", "Low"),
+]
+
+
+def _frame():
+    return pd.DataFrame(
+        [case[:4] for case in CASES],
+        columns=["Days Late", "Has Title", "Has Guarantor", "Has Contract"],
+    )
+
+
+def _baseline_collections(row):
+    days = int(row.get("Days Late", 0))
+    if days > 21 and not row.get("Has Title") and not row.get("Has Guarantor"):
+        return "Critical"
+    elif days > 21:
+        return "High Risk"
+    elif days > 14:
+        return "At Risk"
+    elif days > 7:
+        return "Low Risk"
+    return "Healthy"
+
+
+def _baseline_dashboard(row):
+    if row.get("Days Late", 0) >= 21:
+        return "Critical"
+    elif row.get("Days Late", 0) >= 7:
+        return "Medium"
+    elif row.get("Has Title") == False or row.get("Has Contract") == False:  # noqa: E712
+        return "Medium"
+    return "Low"
+
+
+def test_every_level_matches_the_expected_label():
+    labels = classify(_frame())
+    assert labels["collections"].tolist() == [case[4] for case in CASES]
+    assert labels["dashboard"].tolist() == [case[5] for case in CASES]
+
+
+def test_matches_the_row_by_row_baseline():
+    df = _frame()
+    labels = classify(df)
+    assert labels["collections"].tolist() == df.apply(_baseline_collections, axis=1).tolist()
+    assert labels["dashboard"].tolist() == df.apply(_baseline_dashboard, axis=1).tolist()
+
+
+def test_every_rule_label_is_covered():
+    labels = classify(_frame())
+    for name, rule_set in RISK_CFG.items():
+        expected = {label for label, _ in rule_set["rules"]} | {rule_set["default"]}
+        assert set(labels[name]) == expected
+
+
+def test_apply_writes_the_configured_columns():
+    df = apply_risk_levels(_frame())
+    assert df["Risk Level"].tolist() == [case[4] for case in CASES]
+    assert df["Dashboard Risk"].tolist() == [case[5] for case in CASES]
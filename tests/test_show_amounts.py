@@ -0,0 +1,76 @@
+"""
+tests/test_show_amounts.py
+
+Users without show_amounts get no money columns from /api/loans or the
+exports, and cannot ask for them by name (app/routes/api.py, app/routes/export.py).
+
+    python -m pytest tests
+"""
+
+import csv
+import io
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    from benchmarks import synth
+
+    workspace = tmp_path_factory.mktemp("show_amounts")
+    synth.generate(200, str(workspace), weeks=0)
+    cwd = os.getcwd()
+    os.chdir(workspace)  # before create_app(): data/ and Flask-Session resolve from here
+    try:
+        from app import create_app
+
+        flask_app = create_app()
+        flask_app.testing = True
+        yield flask_app
+    finally:
+        os.chdir(cwd)
+
+
+def _login(app, show_amounts):
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["logged_in"] = True
+        s["username"] = "full_access" if show_amounts else "team_member"
+        s["show_amounts"] = show_amounts
+    return client
+
+
+def _csv_header(resp):
+    return next(csv.reader(io.StringIO(resp.get_data(as_text=True))))
+
+
+def test_api_drops_money_columns_without_show_amounts(app):
+    body = _login(app, False).get("/api/loans?segment=all").get_json()
+    assert "Principal Balance" not in body["columns"]
+    assert all("Principal Balance" not in row for row in body["rows"])
+    assert _login(app, False).get("/api/loans?sort=Principal%20Balance").status_code == 403
+
+    body = _login(app, True).get("/api/loans?sort=Principal%20Balance&order=desc").get_json()
+    assert "Principal Balance" in body["columns"] and body["sort"] == "Principal Balance"
+
+
+def test_exports_drop_and_refuse_money_columns(app):
+    team, full = _login(app, False), _login(app, True)
+    assert "Principal Balance" not in _csv_header(team.get("/export/loans.csv?segment=all"))
+    assert "Principal Balance" in _csv_header(full.get("/export/loans.csv?segment=all"))
+
+    assert team.get("/export/loans.csv?column=Borrower&column=Principal%20Balance").status_code == 403
+    assert team.get("/export/loans.xlsx?column=Borrower&sort=Principal%20Balance").status_code == 403
+    assert team.get("/export/loans.html?column=Principal%20Balance").status_code == 403
+
+
+def test_drill_down_links_only_offer_allowed_columns(app):
+    page = _login(app, False).get("/loan-summary/all").get_data(as_text=True)
+    assert "Principal Balance" not in page
+    page = _login(app, True).get("/loan-summary/all").get_data(as_text=True)
+    assert "Principal+Balance" in page or "Principal%20Balance" in page
@@ -0,0 +1,106 @@
+"""
+tests/test_stats.py
+
+compute_loan_stats (app/models/stats.py) must produce the same numbers as the
+per-view pandas filters the dashboard used to run (baseline dashboard_home).
+
+    python -m pytest tests
+"""
+
+import os
+import re
+import sys
+
+import msgspec
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.models.risk import apply_risk_levels  # noqa: E402
+from app.models.stats import LoanStats, compute_loan_stats  # noqa: E402
+
+COLUMNS = ["Loan Name", "Principal Balance", "Days Late", "Next Payment Amount", "Remaining Payments",
+           "Status", "State", "Group", "Activity Status", "Has Title", "Has Contract", "Has Guarantor"]
+
+ROWS = [
+    ("Ann - $5,000", 1200.0, 30, 100.0, 12, "3+W Critical", "In Service", "Active", "Active", False, True, False),
+    ("Bob - $2,500", 800.0, 25, 50.0, 16, "3+W Critical", "In Service", "active", "Active", True, False, False),
+    ("Cy - $1,000", 400.0, 10, 40.0, 10, "2W Behind", "In Service", "Inactive", "Inactive", False, False, True),
+    ("Di - $3,000", 2000.0, 3, 75.5, 27, "1W Behind", "In Service", "Active", "Active", True, True, True),
+    ("Ed - $4,000", 3500.0, 0, 0.0, 40, "Ongoing", "In Service", "Active", "Active", True, True, False),
+    ("Fay - $1,500", 0.0, 0, 0.0, 0, "Finished", "Paid Off", "Inactive", "Inactive", True, True, True),
+    ("Gus - $12,345.50", 0.0, 0, 0.0, 0, "Finished", "Paid Off", "Active", "Active", False, True, False),
+    ("Hal - $900", 650.0, 22, 25.0, 26, "New", "In Service", "Active", "Active", False, False, False),
+]
+
+
+def _frame():
+    df = pd.DataFrame(ROWS, columns=COLUMNS)
+    return apply_risk_levels(df)  # adds Risk Level / Dashboard Risk
+
+
+def _baseline(df):
+    """The numbers dashboard_home computed with one filter per stat."""
+    def determine_risk(row):
+        if row.get("Days Late", 0) >= 21:
+            return "Critical"
+        elif row.get("Days Late", 0) >= 7:
+            return "Medium"
+        elif row.get("Has Title") == False or row.get("Has Contract") == False:  # noqa: E712
+            return "Medium"
+        return "Low"
+
+    def paid_off_amount(name):
+        match = re.search(r"\$\s*([\d,\.]+)", name)
+        return float(match.group(1).replace(",", "")) if match else 0
+
+    risk = df.apply(determine_risk, axis=1)
+    return {
+        "total_loans": len(df),
+        "critical_loans": len(df[risk == "Critical"]),
+        "active_borrowers": len(df[df["Activity Status"] == "Active"]),
+        "inactive_borrowers": len(df[df["Activity Status"] == "Inactive"]),
+        "title_loans": len(df[df["Has Title"]]),
+        "missing_contract": len(df[df["Has Contract"] == False]),  # noqa: E712
+        "with_guarantor": len(df[df["Has Guarantor"]]),
+        "no_title_guarantor": len(df[(df["Has Title"] == False) & (df["Has Guarantor"] == False)]),  # noqa: E712
+        "paid_off": len(df[df["Principal Balance"] == 0]),
+        "remaining": len(df[df["Principal Balance"] > 0]),
+        "past_due_count": len(df[df["Days Late"] > 0]),
+        "critical_late_count": len(df[df["Days Late"] > 21]),
+        "unsecured_loans": len(df[(df["Has Contract"] == False) | (df["Has Title"] == False)]),  # noqa: E712
+        "unique_borrowers": df["Group"].nunique(),
+        "total_outstanding": round(df["Principal Balance"].sum(), 2),
+        "total_weekly_due": round(df["Next Payment Amount"].sum(), 2),
+        "avg_weekly_payment": round(df[df["Next Payment Amount"] > 0]["Next Payment Amount"].mean(), 2),
+        "avg_weeks_remaining": int(df["Remaining Payments"].mean()),
+        "paid_off_amt": df[df["State"] == "Paid Off"]["Loan Name"].apply(paid_off_amount).sum(),
+        "good_amt": df[df["Status"].isin(["1W Behind", "Ongoing"])]["Principal Balance"].sum(),
+        "past_due_amt": df[(df["Status"] == "3+W Critical") | (df["Days Late"] > 21)]["Principal Balance"].sum(),
+        "payment_status": df["Status"].value_counts().to_dict(),
+    }
+
+
+def test_every_field_matches_the_baseline():
+    df = _frame()
+    stats = msgspec.structs.asdict(compute_loan_stats(df))
+    expected = _baseline(df)
+    assert set(stats) == set(expected) == set(LoanStats.__struct_fields__)
+    for field, value in expected.items():
+        assert stats[field] == value, field
+
+
+def test_hand_counted_values():
+    stats = compute_loan_stats(_frame())
+    assert (stats.critical_loans, stats.missing_contract, stats.no_title_guarantor) == (3, 3, 3)
+    assert (stats.paid_off, stats.remaining, stats.past_due_count, stats.critical_late_count) == (2, 6, 5, 3)
+    assert stats.unique_borrowers == 3  # "Active", "active", "Inactive": Group is not normalized
+    assert stats.paid_off_amt == 1500.0 + 12345.5
+    assert stats.past_due_amt == 1200.0 + 800.0 + 650.0
+    assert stats.good_amt == 2000.0 + 3500.0
+    assert stats.avg_weekly_payment == round((100 + 50 + 40 + 75.5 + 25) / 5, 2)
+
+
+def test_empty_book():
+    stats = compute_loan_stats(_frame().iloc[0:0])
+    assert stats.total_loans == 0 and stats.avg_weekly_payment is None and stats.payment_status == {}
@@ -0,0 +1,129 @@
+"""
+tests/test_take_action_conflicts.py
+
+Two collectors working the Take Action page at the same time must not wipe
+each other's saved rows (app/routes/take_action.py, action_ledger.upsert_actions).
+
+    python -m pytest tests
+"""
+
+import html
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+_ROW_RE = re.compile(r'<tr data-loan-key="([^"]+)" data-version="(\d+)">')
+
+
+@pytest.fixture(scope="module")
+def app(tmp_path_factory):
+    from benchmarks import synth
+
+    workspace = tmp_path_factory.mktemp("take_action")
+    synth.generate(400, str(workspace), weeks=0)
+    cwd = os.getcwd()
+    os.chdir(workspace)  # before create_app(): data/ and Flask-Session resolve from here
+    try:
+        from app import create_app
+
+        flask_app = create_app()
+        flask_app.testing = True
+        yield flask_app
+    finally:
+        os.chdir(cwd)
+
+
+def _login(app, username):
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["logged_in"] = True
+        s["username"] = username
+        s["show_amounts"] = True
+    return client
+
+
+def _rows(client):
+    """loan_key -> rendered version for every row of the Take Action page."""
+    page = client.get("/dashboard/actions/").get_data(as_text=True)
+    return {html.unescape(key): int(version) for key, version in _ROW_RE.findall(page)}
+
+
+def _stored(loan_key):
+    from app.models import action_ledger as ledger
+    from app.routes.take_action import _current_week_tag
+
+    with ledger.connect() as conn:
+        entries = ledger.week_entries(conn, _current_week_tag())
+    return next((e for e in entries if e["loan_key"] == loan_key), None)
+
+
+def test_second_user_does_not_clobber_first_users_save(app):
+    alice, bob = _login(app, "alice"), _login(app, "bob")
+    bob_rows = _rows(bob)  # Bob opens the page before Alice saves
+    loan_x, loan_y = sorted(bob_rows)[:2]
+
+    resp = alice.post("/dashboard/actions/save", json={
+        "loan_key": loan_x, "contacted": True, "note": "called, will pay", "version": bob_rows[loan_x],
+    })
+    assert resp.status_code == 200 and resp.get_json()["ok"]
+
+    # A reload shows Alice's save instead of a blank row
+    page = alice.get("/dashboard/actions/").get_data(as_text=True)
+    assert "called, will pay" in page
+    assert _rows(alice)[loan_x] == resp.get_json()["entry"]["version"]
+
+    # Bob's page only sends the row he edited
+    resp = bob.post("/dashboard/actions/save-batch", json={"updates": [
+        {"loan_key": loan_y, "contacted": True, "note": "left voicemail", "version": bob_rows[loan_y]},
+    ]})
+    assert resp.status_code == 200 and resp.get_json()["saved"] == 1
+
+    # A stale client that still sends X blank gets a conflict, not an overwrite
+    resp = bob.post("/dashboard/actions/save-batch", json={"updates": [
+        {"loan_key": loan_x, "contacted": False, "note": "", "version": bob_rows[loan_x]},
+    ]})
+    assert resp.status_code == 409
+    assert [c["loan_key"] for c in resp.get_json()["conflicts"]] == [loan_x]
+
+    x, y = _stored(loan_x), _stored(loan_y)
+    assert (x["contacted"], x["note"]) == (True, "called, will pay")
+    assert (y["contacted"], y["note"]) == (True, "left voicemail")
+
+
+def test_plain_form_post_only_writes_changed_rows(app):
+    alice, bob = _login(app, "alice"), _login(app, "bob")
+    bob_rows = _rows(bob)
+    keys = sorted(bob_rows)
+    loan_x, loan_y = keys[2], keys[3]
+
+    alice.post("/dashboard/actions/save", json={
+        "loan_key": loan_x, "contacted": True, "note": "promised Friday", "version": bob_rows[loan_x],
+    })
+
+    # Bob submits the whole (stale) form without JS, having ticked only Y
+    form = {}
+    for key, version in bob_rows.items():
+        form.update({f"note_{key}": "", f"orig_note_{key}": "", f"orig_check_{key}": "",
+                     f"version_{key}": str(version)})
+    form[f"check_{loan_y}"] = "on"
+    assert bob.post("/dashboard/actions/", data=form).status_code == 302
+
+    x, y = _stored(loan_x), _stored(loan_y)
+    assert (x["contacted"], x["note"]) == (True, "promised Friday")
+    assert y["contacted"] is True
+
+    # Deliberately clearing a row saved by someone else needs the current version
+    resp = bob.post("/dashboard/actions/save", json={
+        "loan_key": loan_x, "contacted": False, "note": "", "version": bob_rows[loan_x],
+    })
+    assert resp.status_code == 409 and resp.get_json()["conflict"]["note"] == "promised Friday"
+    resp = bob.post("/dashboard/actions/save", json={
+        "loan_key": loan_x, "contacted": False, "note": "", "version": _rows(bob)[loan_x],
+    })
+    assert resp.status_code == 200
+    assert _stored(loan_x)["note"] == ""
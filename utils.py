@@ -1,72 +1,210 @@
 import pandas as pd
 import os
+import io
+import hashlib
+import threading
+
+from app.models.ingest import LOANS_COLUMNS, read_excel_columns
+from app.models.risk import apply_risk_levels, rules_digest
+from app.models.schema import normalize_dtypes
+from app.tables import iter_html_table
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # the Parquet sidecar is an optimisation; Excel stays the source of truth
+    pa = pq = None
+
+LATEST_LOANS_PATH = os.path.join("data", "latest_loans.xlsx")
+
+# Columnar copy of latest_loans.xlsx with the derived columns already computed.
+# It records the sha256 of the workbook it was built from and a format tag;
+# bump SIDECAR_FORMAT whenever _classify_loans() changes so old files go stale.
+SIDECAR_FORMAT = "4"
+# What the derived columns depend on besides the workbook: the sidecar format
+# and the risk thresholds. Stored in the sidecar and the dashboard snapshot.
+CLASSIFICATION_TAG = f"{SIDECAR_FORMAT}-{rules_digest()}"
+_SIDECAR_SOURCE_KEY = b"samxtrack.source_sha256"
+_SIDECAR_FORMAT_KEY = b"samxtrack.sidecar_format"
+
+# Process-wide loan-frame cache. Each Gunicorn worker keeps one parsed copy of
+# latest_loans.xlsx, keyed on the file's identity:
+#   - every call does a cheap os.stat(); an unchanged (mtime_ns, size) is a hit
+#   - a changed stat re-reads the bytes and hashes them; an identical sha256
+#     (e.g. the downloader re-promoted the same export) keeps the frame
+#   - a different sha256 re-parses the workbook and replaces the entry
+#   - a missing file drops the entry; invalidate_loans_cache() forces a reload
+_LOANS_CACHE = {"stat": None, "sha256": None, "frame": None}
+_LOANS_LOCK = threading.Lock()
+# path -> ((mtime_ns, size), sha256) for loans_data_version() before a full load
+_VERSION_MEMO = {}
+
+
+def _copy_on_write_enabled():
+    """pandas 3 always uses Copy-on-Write; pandas 2 only when opted in."""
+    if int(pd.__version__.split(".")[0]) >= 3:
+        return True
+    return pd.get_option("mode.copy_on_write") is True
+
+
+def _handout(df):
+    """
+    Give callers their own view of the cached frame so routes that add or
+    overwrite columns (e.g. "Risk Level", "Loan Key") never touch the cache.
+    Under Copy-on-Write a shallow copy is enough; otherwise copy the data.
+    """
+    return df.copy(deep=not _copy_on_write_enabled())
+
+
+def invalidate_loans_cache():
+    """Drop the cached loan frame; the next load re-reads the workbook."""
+    with _LOANS_LOCK:
+        _LOANS_CACHE.update(stat=None, sha256=None, frame=None)
+
+
+def loans_data_version(path=LATEST_LOANS_PATH):
+    """
+    Return the sha256 of the loan workbook (None if it is missing) without
+    parsing it. Reuses the cached frame's digest while the file's stat matches.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    stat_key = (st.st_mtime_ns, st.st_size)
+    with _LOANS_LOCK:
+        if path == LATEST_LOANS_PATH and _LOANS_CACHE["stat"] == stat_key:
+            return _LOANS_CACHE["sha256"]
+        if _VERSION_MEMO.get(path, (None,))[0] == stat_key:
+            return _VERSION_MEMO[path][1]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with _LOANS_LOCK:
+        _VERSION_MEMO[path] = (stat_key, digest)
+    return digest
+
+
+def read_loans_file(xlsx_path=LATEST_LOANS_PATH):
+    """
+    Uncached load of any loan workbook (e.g. a weekly backup): returns
+    (classified frame, sha256 of the workbook). Uses a fresh sidecar if present.
+    """
+    with open(xlsx_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    return _frame_from_bytes(raw, digest, xlsx_path), digest
+
+
+def _frame_from_bytes(raw, digest, xlsx_path):
+    frame = _read_loans_sidecar(sidecar_path_for(xlsx_path), digest)
+    if frame is None:
+        frame = _classify_loans(read_excel_columns(io.BytesIO(raw), LOANS_COLUMNS))
+    return frame
+
 
 def load_latest_loans():
-    path = os.path.join("data", "latest_loans.xlsx")
-    if not os.path.exists(path):
+    path = LATEST_LOANS_PATH
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        invalidate_loans_cache()
         return pd.DataFrame()
 
-    df = pd.read_excel(path)
+    stat_key = (st.st_mtime_ns, st.st_size)
+    with _LOANS_LOCK:
+        if _LOANS_CACHE["frame"] is None or _LOANS_CACHE["stat"] != stat_key:
+            # Hash and parse the same bytes so the key always matches the frame,
+            # even if the downloader replaces the file mid-read.
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if _LOANS_CACHE["frame"] is None or digest != _LOANS_CACHE["sha256"]:
+                _LOANS_CACHE["frame"] = _frame_from_bytes(raw, digest, path)
+                _LOANS_CACHE["sha256"] = digest
+            _LOANS_CACHE["stat"] = stat_key
+        frame = _LOANS_CACHE["frame"]
 
+    return _handout(frame)
 
-    # Activity from group
-    def classify_activity(group):
-        return "Active" if str(group).strip().lower() == "active" else "Inactive"
-
-    df["Activity Status"] = df["Group"].apply(classify_activity)
-    df["Has Contract"] = df["Contract"].apply(lambda x: str(x).strip().lower() == "yes" if pd.notna(x) else False)
-    df["Has Guarantor"] = df["Guarantor"].apply(lambda x: str(x).strip().lower() not in ["", "na", "nan"])
-    df["Has Title"] = df["Title Ownership"].apply(lambda x: str(x).strip().lower() in ["sam", "own"])
-
-    # Apply risk after title/guarantor
-    def classify_risk(row):
-        days = int(row.get("Days Late", 0))
-        has_title = row.get("Has Title")
-        has_guarantor = row.get("Has Guarantor")
-        if days > 21 and not has_title and not has_guarantor:
-            return "Critical"
-        elif days > 21:
-            return "High Risk"
-        elif days > 14:
-            return "At Risk"
-        elif days > 7:
-            return "Low Risk"
-        else:
-            return "Healthy"
-
-    df["Risk Level"] = df.apply(classify_risk, axis=1)
-
-    return df
-
-# Reusable method for table
-def dataframe_to_html_table(df, title="Loan Details"):
-    if df.empty:
-        return f"""
-        <div style='margin-top:20px'>
-            <h3 style='font-weight:bold;'>{title}</h3>
-            <a href='/loan-summary' style='display:inline-block;margin-bottom:10px;'>&larr; Back to Summary</a>
-            <div style='background:white;padding:15px;border-radius:5px;'>
-                <em>No data available.</em>
-            </div>
-        </div>
-        """
-
-    html = f"""
-    <div style='margin-top:20px'>
-        <h3 style='font-weight:bold;'>{title}</h3>
-        <a href='/loan-summary' style='display:inline-block;margin-bottom:10px;'>&larr; Back to Summary</a>
-        <div style='overflow-x:auto;'>
-            <table border='1' cellpadding='6' cellspacing='0' style='border-collapse:collapse;width:100%;background:white;'>
-                <thead style='background:#f2f2f2;'>
-                    <tr>
-                        {''.join(f'<th>{col}</th>' for col in df.columns)}
-                    </tr>
-                </thead>
-                <tbody>
-                    {''.join('<tr>' + ''.join(f'<td>{val}</td>' for val in row) + '</tr>' for row in df.values)}
-                </tbody>
-            </table>
-        </div>
-    </div>
+
+def sidecar_path_for(xlsx_path):
+    """data/latest_loans.xlsx -> data/latest_loans.parquet"""
+    return os.path.splitext(str(xlsx_path))[0] + ".parquet"
+
+
+def _arrow_safe(df):
+    """Stringify object columns that mix types (e.g. 'W34' next to 12) so Arrow can store them."""
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == object and pd.api.types.infer_dtype(out[col], skipna=True).startswith("mixed"):
+            out[col] = out[col].map(lambda v: v if pd.isna(v) else str(v))
+    return out
+
+
+def write_loans_sidecar(xlsx_path=LATEST_LOANS_PATH):
     """
-    return html
\ No newline at end of file
+    Parse the workbook once, compute the derived columns and write them next to it
+    as Parquet (atomically, via a temp file). Returns the sidecar path, or None
+    when pyarrow is not installed.
+    """
+    if pq is None:
+        return None
+
+    with open(xlsx_path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    df = _arrow_safe(_classify_loans(read_excel_columns(io.BytesIO(raw), LOANS_COLUMNS)))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[_SIDECAR_SOURCE_KEY] = digest.encode()
+    meta[_SIDECAR_FORMAT_KEY] = CLASSIFICATION_TAG.encode()
+    table = table.replace_schema_metadata(meta)
+
+    out_path = sidecar_path_for(xlsx_path)
+    tmp_path = out_path + ".tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _read_loans_sidecar(sidecar_path, digest):
+    """Return the sidecar frame if it exists and was built from `digest`, else None."""
+    if pq is None or not os.path.exists(sidecar_path):
+        return None
+    try:
+        meta = pq.read_schema(sidecar_path).metadata or {}
+        if (meta.get(_SIDECAR_SOURCE_KEY) != digest.encode()
+                or meta.get(_SIDECAR_FORMAT_KEY) != CLASSIFICATION_TAG.encode()):
+            return None  # stale: built from another export, format or rule set
+        return pq.read_table(sidecar_path).to_pandas()
+    except Exception:
+        return None
+
+
+def _classify_loans(df):
+    """Add the derived activity / contract / guarantor / title / risk columns."""
+    def _norm(col):
+        # Trimmed lower-case text; missing cells become "" (i.e. "no")
+        return df[col].fillna("").astype(str).str.strip().str.lower()
+
+    # Activity from group
+    df["Activity Status"] = _norm("Group").eq("active").map({True: "Active", False: "Inactive"})
+
+    # Contract / guarantor / title flags, vectorized
+    df["Has Contract"] = _norm("Contract").eq("yes")
+    df["Has Guarantor"] = ~_norm("Guarantor").isin(["", "na", "nan"])
+    df["Has Title"] = _norm("Title Ownership").isin(["sam", "own"])
+
+    # Apply risk after title/guarantor (collections + dashboard views, one pass)
+    apply_risk_levels(df)
+
+    # Compact dtypes: categories, real bools, downcast integers
+    return normalize_dtypes(df)
+
+# Reusable method for table. Kept for callers that want one string; views that
+# can stream should pass app.tables.iter_html_table(...) to stream_with_context.
+def dataframe_to_html_table(df, title="Loan Details", formatters=None):
+    return "".join(iter_html_table(df, title, formatters))
\ No newline at end of file